@@ -1,6 +1,19 @@
+import time
+_IMPORT_START = time.perf_counter()
 import dearpygui.dearpygui as dpg
+_DPG_IMPORT_MS = (time.perf_counter() - _IMPORT_START) * 1000.0
+import bisect
 import ctypes
+import csv
+import hashlib
+import json
+import mmap
 import os
+import struct
+import sys
+import threading
+from array import array
+from collections import deque
 from ctypes import wintypes
 
 #=========================================================================
@@ -13,6 +26,98 @@ CUSTOMWINDOW_DEBUG = False
 
 # Height of the custom title bar
 CUSTOMWINDOW_TITLEBAR_HEIGHT = 30
+
+# Refresh rate (Hz) of the debug coordinate HUD created by UIHandle.add_debug_hud()
+CUSTOMWINDOW_DEBUG_HUD_RATE = 10
+
+# Brief: Frame-phase profiler (opt-in)
+# True:  Time every frame phase into a ring buffer; F9 toggles a live plot window
+# CUSTOMWINDOW_PROFILE_EXPORT: ".json" or ".csv" path written on exit ("" = no export)
+CUSTOMWINDOW_PROFILE = False
+CUSTOMWINDOW_PROFILE_FRAMES = 1024
+CUSTOMWINDOW_PROFILE_EXPORT = ""
+
+# Brief: Resource loading (opt-in: the first frames show text placeholder buttons)
+# True:  Find the font and decode images/icon on a worker thread; the title bar starts with text
+#        placeholder buttons that are swapped for image buttons when the textures are ready
+# False: Load everything before the viewport is created
+CUSTOMWINDOW_ASYNC_RESOURCES = False
+
+# Brief: Title-bar texture atlas
+# "" = pack images/*.png and the icon into one texture at startup
+# Path to an atlas .json written by TextureAtlas.save() = load that prebuilt atlas instead
+CUSTOMWINDOW_ATLAS_FILE = ""
+
+# Brief: Decoded image cache (opt-in: writes files outside the application directory)
+# True: Keep decoded RGBA (float32) of images/icon on disk, keyed by path + mtime + size, and memory-map it
+#       on later starts instead of decoding the PNG again
+# CUSTOMWINDOW_IMAGE_CACHE_DIR: "" = per-user cache directory (%LOCALAPPDATA% or $XDG_CACHE_HOME / ~/.cache,
+#                               under customwindow/images)
+CUSTOMWINDOW_IMAGE_CACHE = False
+CUSTOMWINDOW_IMAGE_CACHE_DIR = ""
+
+# Brief: Font glyph ranges
+# "full":   Load mvFontRangeHint_Default + mvFontRangeHint_Chinese_Full (every CJK glyph, large font atlas)
+# "subset": Load only the characters actually used: title/button labels, item labels after create_layout,
+#           UserUI.ui_strings() and CUSTOMWINDOW_FONT_CORPUS (UTF-8 text file, "" = none)
+# CUSTOMWINDOW_FONT_TOPUP: True = rebuild the subset font on the next frame when new characters appear
+#                          (ui.fonts.ensure(text), strings posted through ui.dispatch)
+CUSTOMWINDOW_FONT_GLYPHS = "full"
+CUSTOMWINDOW_FONT_CORPUS = ""
+CUSTOMWINDOW_FONT_TOPUP = True
+
+# Brief: Live-resize mode (per app; ui.live_resize can also be changed at runtime)
+# "live":    Relayout content_window, the layout engine and call UserUI.resize_callback on every resize step
+# "outline": While resizing the viewport stays at its start rect and only an outline of the target rect (clamped to
+#            the viewport when growing) follows the pointer; the viewport is resized, relaid out and
+#            UserUI.resize_callback runs once on mouse release
+# "hybrid":  The viewport and the chrome follow the pointer, content is relaid out (and UserUI.resize_callback
+#            called) at most CUSTOMWINDOW_RESIZE_RELAYOUT_HZ times per second and once more on mouse release
+CUSTOMWINDOW_LIVE_RESIZE = "live"
+CUSTOMWINDOW_RESIZE_RELAYOUT_HZ = 10
+
+# Brief: Multi-monitor topology (MonitorTopology, ui.sys.topology)
+# CUSTOMWINDOW_SPAN_MONITORS: True = clamping lets the window span adjacent monitors as long as it stays on
+#                             their work areas; False = clamp to the single monitor it overlaps most
+# CUSTOMWINDOW_MONITOR_POLL: Seconds between cheap display-configuration checks (0 = only ui.invalidate_work_area())
+CUSTOMWINDOW_SPAN_MONITORS = True
+CUSTOMWINDOW_MONITOR_POLL = 2.0
+
+# Brief: Theme palette (ThemeRegistry, ui.themes; switch at runtime with ui.themes.set_palette(...))
+# "dark":  Dear PyGui default colors with the dark title bar
+# "light": Light window/title bar colors
+CUSTOMWINDOW_PALETTE = "dark"
+
+# Brief: Frame pacing
+# CUSTOMWINDOW_FPS_CAP: Hard frame-rate cap while active (0 = uncapped, vsync only)
+# CUSTOMWINDOW_IDLE_MODE: True = drop to CUSTOMWINDOW_IDLE_FPS after CUSTOMWINDOW_IDLE_AFTER seconds without
+#                         input, geometry change or ui.invalidate(); any event restores the full rate
+CUSTOMWINDOW_FPS_CAP = 0
+CUSTOMWINDOW_IDLE_MODE = False
+CUSTOMWINDOW_IDLE_FPS = 4
+CUSTOMWINDOW_IDLE_AFTER = 0.5
+# Frame budget (seconds) of the asyncio driver UIHandle.run(); time left in the budget goes to other tasks
+CUSTOMWINDOW_ASYNC_FRAME_BUDGET = 1 / 60
+# With vsync on, run() yields until the next vsync minus this reserve (ms) for render; grows after a missed vsync
+CUSTOMWINDOW_ASYNC_RENDER_RESERVE_MS = 3.0
+
+# Brief: UI mutation queue (UIHandle.dispatch) for worker threads
+# CUSTOMWINDOW_DISPATCH_BUDGET_MS: Max time per frame spent applying queued mutations (rest waits for next frame)
+# CUSTOMWINDOW_DISPATCH_MAX_PENDING: Distinct pending value/configure items beyond this are dropped (counted in
+#                                    stats); post(func) calls are never dropped
+CUSTOMWINDOW_DISPATCH_BUDGET_MS = 2.0
+CUSTOMWINDOW_DISPATCH_MAX_PENDING = 10000
+CUSTOMWINDOW_WORKER_THREADS = 4
+
+# Brief: Startup profiler (UIHandle.startup, always recorded; see StartupProfiler)
+# True:  Print per-phase wall time of initialize_gui / first frame and the import cost after the first frame
+# CUSTOMWINDOW_STARTUP_EXPORT: ".json" or ".csv" path written after the first frame ("" = no export)
+CUSTOMWINDOW_STARTUP_PROFILE = False
+CUSTOMWINDOW_STARTUP_EXPORT = ""
+
+# Brief: Input trace recording (see InputRecorder / TraceReplayer)
+# Non-empty path: record pointer samples, button events and viewport geometry to this binary trace
+CUSTOMWINDOW_TRACE_RECORD = ""
 #=========================================================================
 
 
@@ -31,243 +136,1807 @@ class MONITORINFO(ctypes.Structure):
         ("dwFlags", wintypes.DWORD),
     ]
 
-class SystemUtils:
-    """封裝系統相關工具：工作區座標與滑鼠座標查詢。"""
-    def get_screen_work_area(self):
-        rect = RECT()
-        ctypes.windll.user32.SystemParametersInfoW(48, 0, ctypes.byref(rect), 0)
-        return {"x": rect.left, "y": rect.top, "w": rect.right - rect.left, "h": rect.bottom - rect.top}
+def _rect_to_area(rect):
+    return {"x": rect.left, "y": rect.top, "w": rect.right - rect.left, "h": rect.bottom - rect.top}
 
-    def get_viewport_work_area(self):
+class NullBackend:
+    """空平台後端：不支援的平台使用，所有呼叫直接回傳而不觸發例外。
+
+    同時實作螢幕資訊來源介面（screen_work_area / enumerate_monitors / topology_signature）。
+    """
+    available = False
+
+    def set_dpi_awareness(self):
+        return False
+
+    def get_cursor_pos(self):
+        return None
+
+    def load_cursor(self, cursor_id):
+        return None
+
+    def set_cursor(self, hcursor):
+        return None
+
+    def get_cursor(self):
+        return None
+
+    def minimize_window(self, hwnd):
+        return False
+
+    def screen_work_area(self):
+        return None
+
+    def enumerate_monitors(self):
+        return None
+
+    def topology_signature(self):
+        return None
+
+class Win32Backend(NullBackend):
+    """WinAPI 平台後端：建立時一次綁定所有原生函式並設定正確的函式原型。"""
+    available = True
+
+    def __init__(self):
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        HCURSOR = wintypes.HICON
+        self._GetCursorPos = self._bind(user32.GetCursorPos, wintypes.BOOL, ctypes.POINTER(wintypes.POINT))
+        # LoadCursorW 以 MAKEINTRESOURCE 傳遞系統游標 ID，因此第二參數為指標大小的整數
+        self._LoadCursorW = self._bind(user32.LoadCursorW, HCURSOR, wintypes.HINSTANCE, ctypes.c_void_p)
+        self._SetCursor = self._bind(user32.SetCursor, HCURSOR, HCURSOR)
+        self._GetCursor = self._bind(user32.GetCursor, HCURSOR)
+        self._GetMonitorInfoW = self._bind(user32.GetMonitorInfoW, wintypes.BOOL,
+                                           wintypes.HMONITOR, ctypes.POINTER(MONITORINFO))
+        self._SystemParametersInfoW = self._bind(user32.SystemParametersInfoW, wintypes.BOOL,
+                                                 wintypes.UINT, wintypes.UINT, ctypes.c_void_p, wintypes.UINT)
+        self._SendMessageW = self._bind(user32.SendMessageW, wintypes.LPARAM,
+                                        wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+        self._IsIconic = self._bind(user32.IsIconic, wintypes.BOOL, wintypes.HWND)
+        self._ShowWindow = self._bind(user32.ShowWindow, wintypes.BOOL, wintypes.HWND, ctypes.c_int)
+        self._SetProcessDPIAware = self._bind(user32.SetProcessDPIAware, wintypes.BOOL)
+        self._MONITORENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HMONITOR, wintypes.HDC,
+                                                   ctypes.POINTER(RECT), wintypes.LPARAM)
+        self._EnumDisplayMonitors = self._bind(user32.EnumDisplayMonitors, wintypes.BOOL, wintypes.HDC,
+                                               ctypes.POINTER(RECT), self._MONITORENUMPROC, wintypes.LPARAM)
+        self._GetSystemMetrics = self._bind(user32.GetSystemMetrics, ctypes.c_int, ctypes.c_int)
         try:
-            hwnd = dpg.get_viewport_platform_handle()
-            hmon = ctypes.windll.user32.MonitorFromWindow(hwnd, 2)  # MONITOR_DEFAULTTONEAREST
+            shcore = ctypes.WinDLL("shcore")
+            self._SetProcessDpiAwareness = self._bind(shcore.SetProcessDpiAwareness, ctypes.c_long, ctypes.c_int)
+            self._GetDpiForMonitor = self._bind(shcore.GetDpiForMonitor, ctypes.c_long, wintypes.HMONITOR,
+                                                ctypes.c_int, ctypes.POINTER(wintypes.UINT),
+                                                ctypes.POINTER(wintypes.UINT))
+        except OSError:
+            # 舊版 Windows（如 7）沒有 shcore
+            self._SetProcessDpiAwareness = None
+            self._GetDpiForMonitor = None
+        # 重複使用的輸出緩衝，避免每幀配置
+        self._pt = wintypes.POINT()
+        self._pt_ref = ctypes.byref(self._pt)
+
+    @staticmethod
+    def _bind(func, restype, *argtypes):
+        func.restype = restype
+        func.argtypes = list(argtypes)
+        return func
+
+    def set_dpi_awareness(self):
+        # System-DPI aware：支援度高，邏輯簡單；後備為舊版 API
+        if self._SetProcessDpiAwareness is not None and self._SetProcessDpiAwareness(1) == 0:
+            return True
+        return bool(self._SetProcessDPIAware())
+
+    def get_cursor_pos(self):
+        if not self._GetCursorPos(self._pt_ref):
+            return None
+        return [self._pt.x, self._pt.y]
+
+    def load_cursor(self, cursor_id):
+        return self._LoadCursorW(None, cursor_id)
+
+    def set_cursor(self, hcursor):
+        return self._SetCursor(hcursor)
+
+    def get_cursor(self):
+        return self._GetCursor()
+
+    def minimize_window(self, hwnd):
+        WM_SYSCOMMAND = 0x0112
+        SC_MINIMIZE = 0xF020
+        self._SendMessageW(hwnd, WM_SYSCOMMAND, SC_MINIMIZE, 0)
+        if not self._IsIconic(hwnd):
+            self._ShowWindow(hwnd, 6)  # SW_MINIMIZE
+        return True
+
+    def screen_work_area(self):
+        rect = RECT()
+        if not self._SystemParametersInfoW(48, 0, ctypes.byref(rect), 0):  # SPI_GETWORKAREA
+            return None
+        return _rect_to_area(rect)
+
+    def monitor_dpi(self, hmon):
+        # MDT_EFFECTIVE_DPI；System-DPI aware 行程取得的是系統 DPI
+        if self._GetDpiForMonitor is None:
+            return 96
+        dx, dy = wintypes.UINT(), wintypes.UINT()
+        if self._GetDpiForMonitor(hmon, 0, ctypes.byref(dx), ctypes.byref(dy)) != 0:
+            return 96
+        return int(dx.value)
+
+    def enumerate_monitors(self):
+        handles = []
+
+        def collect(hmon, hdc, rect, data):
+            handles.append(hmon)
+            return True
+        if not self._EnumDisplayMonitors(None, None, self._MONITORENUMPROC(collect), 0):
+            return None
+        monitors = []
+        for hmon in handles:
             mi = MONITORINFO()
             mi.cbSize = ctypes.sizeof(MONITORINFO)
-            ok = ctypes.windll.user32.GetMonitorInfoW(hmon, ctypes.byref(mi))
-            if ok:
-                return {
-                    "x": mi.rcWork.left,
-                    "y": mi.rcWork.top,
-                    "w": mi.rcWork.right - mi.rcWork.left,
-                    "h": mi.rcWork.bottom - mi.rcWork.top,
-                }
+            if not self._GetMonitorInfoW(hmon, ctypes.byref(mi)):
+                continue
+            monitors.append({"handle": hmon, "monitor": _rect_to_area(mi.rcMonitor), "work": _rect_to_area(mi.rcWork),
+                             "dpi": self.monitor_dpi(hmon), "primary": bool(mi.dwFlags & 1)})  # MONITORINFOF_PRIMARY
+        return monitors
+
+    def topology_signature(self):
+        # 螢幕數量、虛擬桌面矩形（SM_XVIRTUALSCREEN..SM_CMONITORS）與主螢幕工作區：便宜的變更偵測
+        metrics = tuple(self._GetSystemMetrics(i) for i in (76, 77, 78, 79, 80))
+        area = self.screen_work_area()
+        return metrics + ((area["x"], area["y"], area["w"], area["h"]) if area else ())
+
+class FakeBackend(NullBackend):
+    """測試用平台後端：游標座標可由外部設定，螢幕資訊委派給 FakeMonitorSource。"""
+    available = True
+
+    def __init__(self, cursor_pos=(0, 0), monitors=None):
+        self.cursor_pos = [cursor_pos[0], cursor_pos[1]]
+        self.monitors = monitors
+        self.cursor = None
+        self.set_cursor_calls = 0
+
+    def get_cursor_pos(self):
+        return [self.cursor_pos[0], self.cursor_pos[1]]
+
+    def load_cursor(self, cursor_id):
+        return cursor_id
+
+    def set_cursor(self, hcursor):
+        prev, self.cursor = self.cursor, hcursor
+        self.set_cursor_calls += 1
+        return prev
+
+    def get_cursor(self):
+        return self.cursor
+
+    def screen_work_area(self):
+        return self.monitors.screen_work_area() if self.monitors else None
+
+    def enumerate_monitors(self):
+        return self.monitors.enumerate_monitors() if self.monitors else None
+
+    def topology_signature(self):
+        return self.monitors.topology_signature() if self.monitors else None
+
+def create_platform_backend():
+    """依平台建立後端；Windows 綁定失敗或其他平台時使用 NullBackend。"""
+    if sys.platform == "win32":
+        try:
+            return Win32Backend()
+        except Exception:
+            pass
+    return NullBackend()
+
+class FakeMonitorSource:
+    """測試用螢幕資訊來源：以矩形清單模擬多螢幕，可在非 Windows 環境使用。
+
+    monitors: [(monitor_area, work_area), ...]，area 為 {"x", "y", "w", "h"}；螢幕代號即索引，第一個為主螢幕。
+    dpis: 各螢幕 DPI（省略為 96）。修改 monitors 後 topology_signature() 隨之改變，模擬顯示設定變更。
+    """
+    def __init__(self, monitors, dpis=None):
+        self.monitors = list(monitors)
+        self.dpis = list(dpis) if dpis else [96] * len(self.monitors)
+        self.calls = 0
+
+    def screen_work_area(self):
+        self.calls += 1
+        return self.monitors[0][1]
+
+    def enumerate_monitors(self):
+        self.calls += 1
+        return [{"handle": i, "monitor": dict(mon), "work": dict(work),
+                 "dpi": self.dpis[i] if i < len(self.dpis) else 96, "primary": i == 0}
+                for i, (mon, work) in enumerate(self.monitors)]
+
+    def topology_signature(self):
+        self.calls += 1
+        return (tuple((tuple(mon.values()), tuple(work.values())) for mon, work in self.monitors), tuple(self.dpis))
+
+class MonitorTopology:
+    """記憶體內的螢幕拓撲：所有螢幕矩形、工作區與 DPI，一次載入，顯示設定變更時才重新載入。
+
+    來源需提供 enumerate_monitors()（[{"handle", "monitor", "work", "dpi", "primary"}, ...]）與
+    topology_signature()（便宜的變更偵測）；來源不提供螢幕清單時 available 為 False，工作區查詢回傳 None。
+    """
+    def __init__(self, source, poll=None):
+        self.source = source
+        self.poll = CUSTOMWINDOW_MONITOR_POLL if poll is None else poll
+        self.monitors = []
+        self._bounds = []    # 每個螢幕的 (x0, y0, x1, y1) 與工作區 (x0, y0, x1, y1)，查詢時免重算
+        self._loaded = False
+        self._signature = None
+        self._next_check = 0.0
+        self._last = None    # 上次 work_area_for 命中的螢幕索引
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _edges(area):
+        return area["x"], area["y"], area["x"] + area["w"], area["y"] + area["h"]
+
+    def load(self):
+        """向來源重新列舉螢幕。"""
+        self._loaded = True
+        self._last = None
+        try:
+            monitors = self.source.enumerate_monitors()
+        except Exception:
+            monitors = None
+        self.monitors = list(monitors or [])
+        self._bounds = [self._edges(m["monitor"]) + self._edges(m["work"]) for m in self.monitors]
+        self.loads += 1
+        self._signature = self._read_signature()
+        return self.available
+
+    def _read_signature(self):
+        try:
+            return self.source.topology_signature()
+        except Exception:
+            return None
+
+    def invalidate(self):
+        """下次查詢時重新載入（顯示設定變更時呼叫）。"""
+        self._loaded = False
+
+    def check(self, now=None):
+        """尚未載入時載入；之後每 poll 秒比對一次來源簽章，變更時重新載入。回傳是否重新載入。"""
+        if not self._loaded:
+            self.load()
+            return True
+        if self.poll <= 0:
+            return False
+        now = time.perf_counter() if now is None else now
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.poll
+        signature = self._read_signature()
+        if signature is not None and signature != self._signature:
+            self.load()
+            return True
+        return False
+
+    @property
+    def available(self):
+        return bool(self.monitors)
+
+    # ------------------------------------------------------------------ 查詢
+    def overlapping(self, rect, work=False):
+        """與矩形 [x, y, w, h] 重疊的螢幕索引（work=True 時比對工作區），依重疊面積由大到小。"""
+        x0, y0, w, h = rect
+        x1, y1 = x0 + w, y0 + h
+        found = []
+        for i, b in enumerate(self._bounds):
+            bx0, by0, bx1, by1 = b[4:] if work else b[:4]
+            ox = min(x1, bx1) - max(x0, bx0)
+            oy = min(y1, by1) - max(y0, by0)
+            if ox > 0 and oy > 0:
+                found.append((-ox * oy, i))
+        found.sort()
+        return [i for _, i in found]
+
+    def monitor_at(self, x, y):
+        """包含螢幕座標 (x, y) 的螢幕索引；不在任何螢幕上時為 None。"""
+        for i, (x0, y0, x1, y1) in enumerate(b[:4] for b in self._bounds):
+            if x0 <= x < x1 and y0 <= y < y1:
+                return i
+        return None
+
+    def nearest(self, rect):
+        """與 MONITOR_DEFAULTTONEAREST 相同：重疊面積最大者，否則邊緣距離最近者。"""
+        hits = self.overlapping(rect)
+        if hits:
+            return hits[0]
+        x0, y0, w, h = rect
+        best, best_d = None, None
+        for i, b in enumerate(self._bounds):
+            dx = max(b[0] - (x0 + w), x0 - b[2], 0)
+            dy = max(b[1] - (y0 + h), y0 - b[3], 0)
+            d = dx * dx + dy * dy
+            if best_d is None or d < best_d:
+                best, best_d = i, d
+        return best
+
+    def work_area_for(self, rect):
+        """矩形所在螢幕的工作區；中心仍在上次的螢幕內時直接命中。"""
+        last = self._last
+        if last is not None:
+            b = self._bounds[last]
+            cx, cy = rect[0] + rect[2] // 2, rect[1] + rect[3] // 2
+            if b[0] <= cx < b[2] and b[1] <= cy < b[3]:
+                self.hits += 1
+                return self.monitors[last]["work"]
+        self.misses += 1
+        self._last = self.nearest(rect)
+        return self.monitors[self._last]["work"]
+
+    def work_area_at(self, x, y):
+        """螢幕座標 (x, y) 所在（或最近）螢幕的工作區。"""
+        i = self.monitor_at(x, y)
+        if i is None:
+            i = self.nearest([x, y, 1, 1])
+        return self.monitors[i]["work"]
+
+    def dpi_for(self, rect):
+        return self.monitors[self.nearest(rect)]["dpi"]
+
+    def _covered(self, rect, indices):
+        # 工作區彼此不重疊：交集面積總和等於矩形面積即完全落在工作區上
+        x0, y0, w, h = rect
+        total = 0
+        for i in indices:
+            bx0, by0, bx1, by1 = self._bounds[i][4:]
+            ox = min(x0 + w, bx1) - max(x0, bx0)
+            oy = min(y0 + h, by1) - max(y0, by0)
+            if ox > 0 and oy > 0:
+                total += ox * oy
+        return total >= w * h
+
+    def clamp(self, rect, span=True):
+        """將矩形夾入工作區。span=True 時完全落在相鄰螢幕工作區上的跨螢幕矩形保持不動，
+        否則夾入重疊工作區的外接矩形；仍有部分落在工作區外（例如高度不同的螢幕）時退回重疊最多的單一螢幕。
+        """
+        hits = self.overlapping(rect, work=True)
+        if not hits:
+            return clamp_rect_to_area(rect, self.monitors[self.nearest(rect)]["work"])
+        main = self.monitors[hits[0]]["work"]
+        if not span or len(hits) == 1:
+            return clamp_rect_to_area(rect, main)
+        if self._covered(rect, hits):
+            return [int(v) for v in rect]
+        x0 = min(self._bounds[i][4] for i in hits)
+        y0 = min(self._bounds[i][5] for i in hits)
+        x1 = max(self._bounds[i][6] for i in hits)
+        y1 = max(self._bounds[i][7] for i in hits)
+        clamped = clamp_rect_to_area(rect, {"x": x0, "y": y0, "w": x1 - x0, "h": y1 - y0})
+        if self._covered(clamped, self.overlapping(clamped, work=True)):
+            return clamped
+        return clamp_rect_to_area(rect, main)
+
+    def get_stats(self):
+        return {"monitors": len(self.monitors), "loads": self.loads, "hits": self.hits, "misses": self.misses,
+                "dpi": [m["dpi"] for m in self.monitors]}
+
+class SystemUtils:
+    """封裝系統相關工具：工作區座標與滑鼠座標查詢（經由平台後端）。"""
+    def __init__(self, platform=None):
+        self.platform = platform or NullBackend()
+        self.topology = MonitorTopology(self.platform)
+
+    def set_monitor_source(self, source):
+        """替換螢幕資訊來源（例如 FakeMonitorSource），並清除快取。"""
+        self.topology = MonitorTopology(source)
+
+    def invalidate_work_area(self):
+        self.topology.invalidate()
+
+    def get_screen_work_area(self):
+        return self.topology.source.screen_work_area()
+
+    def get_viewport_work_area(self, rect=None):
+        """rect: viewport 的 [x, y, w, h]；省略時向 Dear PyGui 查詢。無螢幕拓撲時回傳 None。"""
+        if rect is None:
+            cfg = dpg.get_viewport_configuration(0)
+            rect = [cfg["x_pos"], cfg["y_pos"], cfg["width"], cfg["height"]]
+        topology = self.topology
+        topology.check()
+        if topology.available:
+            return topology.work_area_for(rect)
+        return None
+
+    def get_work_area_at(self, x, y):
+        """螢幕座標所在螢幕的工作區；無螢幕拓撲時回傳 None。"""
+        topology = self.topology
+        topology.check()
+        return topology.work_area_at(x, y) if topology.available else None
+
+    def clamp_rect(self, rect, span=True):
+        """以螢幕拓撲夾取矩形（可跨螢幕）；無螢幕拓撲時回傳 None。"""
+        topology = self.topology
+        topology.check()
+        return topology.clamp(rect, span) if topology.available else None
+
+    def get_real_mouse_pos(self, cfg=None):
+        """cfg: 本幀已取得的 viewport 設定（平台不提供游標座標時用來換算，免再查詢一次）。"""
+        pos = self.platform.get_cursor_pos()
+        if pos is None:
+            # 平台不提供時以 Dear PyGui 的 viewport 座標換算螢幕座標
+            if cfg is None:
+                cfg = dpg.get_viewport_configuration(0)
+            m = dpg.get_mouse_pos(local=False)
+            pos = [int(cfg["x_pos"] + m[0]), int(cfg["y_pos"] + m[1])]
+        return pos
+
+class PlatformCursorBackend:
+    """游標後端（平台後端的系統游標）：Windows 在滑鼠移動時會以 WM_SETCURSOR 重設游標。"""
+    IDS = {
+        "std": 32512,   # IDC_ARROW
+        "we": 32644,    # IDC_SIZEWE
+        "ns": 32645,    # IDC_SIZENS
+        "nwse": 32642,  # IDC_SIZENWSE
+        "nesw": 32643,  # IDC_SIZENESW
+    }
+
+    def __init__(self, platform):
+        self.platform = platform
+
+    def load_shapes(self):
+        return {key: self.platform.load_cursor(cid) for key, cid in self.IDS.items()}
+
+    def set(self, handle):
+        self.platform.set_cursor(handle)
+
+    def current(self):
+        return self.platform.get_cursor()
+
+class NullCursorBackend:
+    """游標後端（不支援）：不載入任何形狀。
+
+    Dear PyGui 1.x 沒有游標 API，GLFW 又在每幀的 NewFrame 重設游標，Python 端無法在其後套用，
+    因此 Windows 以外的平台維持 Dear PyGui 自己的游標。
+    """
+
+    def load_shapes(self):
+        return {}
+
+    def set(self, handle):
+        pass
+
+    def current(self):
+        return None
+
+def create_cursor_backend(platform):
+    """依平台選擇游標後端：平台後端可用時使用系統游標，否則不切換游標。"""
+    if platform.available:
+        return PlatformCursorBackend(platform)
+    return NullCursorBackend()
+
+class CursorManager:
+    """游標管理：持有預載的游標形狀，只在需求形狀改變或系統重設游標時才套用。"""
+    # 縮放方向 -> 游標形狀
+    RESIZE_CURSORS = {
+        "left": "we",
+        "right": "we",
+        "top": "ns",
+        "bottom": "ns",
+        "corner": "nwse",
+        "corner_left": "nesw",
+        "corner_top_left": "nwse",
+    }
+
+    def __init__(self, backend=None):
+        self.backend = backend or NullCursorBackend()
+        self.shapes = {}
+        self.current_key = None
+        self.switches = 0
+        self.reapplies = 0
+        self.switches_per_second = 0.0
+        self._window_start = 0.0
+        self._window_switches = 0
+
+    def set_shapes(self, shapes):
+        """設定已載入的游標形狀並重設目前狀態。"""
+        self.shapes = {k: v for k, v in shapes.items() if v}
+        self.current_key = None
+
+    def apply(self, key, pointer_moved, now):
+        """套用需求形狀；形狀未變且未被重設時不做任何平台呼叫。"""
+        if now - self._window_start >= 1.0:
+            elapsed = now - self._window_start
+            self.switches_per_second = self._window_switches / elapsed if self._window_start else 0.0
+            self._window_start, self._window_switches = now, 0
+        handle = self.shapes.get(key)
+        if not handle:
+            return
+        if key == self.current_key:
+            # 預設箭頭由系統/Dear PyGui 自行維持；其他形狀僅在被重設時重套
+            if key == "std":
+                return
+            if not pointer_moved or self.backend.current() == handle:
+                return
+            self.backend.set(handle)
+            self.reapplies += 1
+            return
+        self.backend.set(handle)
+        self.current_key = key
+        self.switches += 1
+        self._window_switches += 1
+
+    def get_stats(self):
+        return {
+            "current": self.current_key,
+            "switches": self.switches,
+            "reapplies": self.reapplies,
+            "switches_per_second": self.switches_per_second,
+        }
+
+class DecodedImage:
+    """解碼後的影像：可解包為 (w, h, c, data)（與 dpg.load_image 相同）；close()（或 with）於上傳後立即
+    釋放 data 的 memoryview 與其下的 mmap，不依賴 GC。"""
+    __slots__ = ("width", "height", "channels", "data", "_views", "_mm")
+
+    def __init__(self, width, height, channels, data, views=(), mm=None):
+        self.width, self.height, self.channels, self.data = width, height, channels, data
+        self._views = list(views)   # 由外而內建立的 memoryview，關閉時反向釋放
+        self._mm = mm
+
+    def __iter__(self):
+        return iter((self.width, self.height, self.channels, self.data))
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __len__(self):
+        return 4
+
+    @property
+    def closed(self):
+        return self.data is None
+
+    def close(self):
+        self.data = None
+        try:
+            for view in reversed(self._views):
+                view.release()
+            if self._mm is not None:
+                self._mm.close()
+        except BufferError:
+            # 仍有外部 export（呼叫端保留了 memoryview）：交由 GC 釋放
+            return
+        self._views, self._mm = [], None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @classmethod
+    def wrap(cls, image):
+        """把 dpg.load_image 的結果包成 DecodedImage（None 不變）。"""
+        if image is None or isinstance(image, cls):
+            return image
+        return cls(*image)
+
+
+def close_image(image):
+    """關閉 DecodedImage；dpg.load_image 的一般 tuple 不需關閉。"""
+    close = getattr(image, "close", None)
+    if close is not None:
+        close()
+
+
+class ImageCache:
+    """解碼後影像的磁碟快取：float32 RGBA + 小檔頭，以 mmap 載入，上傳貼圖時直接使用緩衝區（不建立 Python list）。"""
+    MAGIC = b"CWIC"
+    HEADER = struct.Struct("<4sIII")   # magic, width, height, channels
+
+    def __init__(self, cache_dir=None):
+        """cache_dir 省略時使用 CUSTOMWINDOW_IMAGE_CACHE_DIR，否則為每位使用者的快取目錄
+        （見 default_dir()；第一次未命中時才建立並寫入）。"""
+        self.cache_dir = cache_dir or CUSTOMWINDOW_IMAGE_CACHE_DIR or self.default_dir()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def default_dir():
+        if sys.platform.startswith("win"):
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "customwindow", "images")
+
+    def entry_path(self, path):
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}".encode("utf-8")
+        return os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + ".rgba")
+
+    def load(self, path):
+        """回傳可解包為 (w, h, c, data) 的 DecodedImage；命中時 data 為 mmap 上的 float32 memoryview，
+        上傳貼圖後需 close()（或以 with 使用）釋放映射。"""
+        try:
+            entry = self.entry_path(path)
+        except OSError:
+            return None
+        cached = self._map(entry)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        # 未命中：解碼後寫入快取（先寫暫存檔再置換，避免讀到寫一半的檔案）
+        self.misses += 1
+        image = dpg.load_image(path)
+        if image is None:
+            return None
+        w, h, c, data = image
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{entry}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, w, h, c))
+                f.write(memoryview(data).cast("B"))
+            os.replace(tmp, entry)
+        except (OSError, TypeError):
+            self.errors += 1
+        return DecodedImage.wrap(image)
+
+    def _map(self, entry):
+        """mmap 一個快取檔並驗證檔頭；不存在回傳 None，損毀（截斷、檔頭不符）則刪除後回傳 None。"""
+        try:
+            with open(entry, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # 不存在或空檔（mmap 無法映射長度 0）
+            if os.path.exists(entry):
+                self._discard(entry)
+            return None
+        try:
+            magic, w, h, c = self.HEADER.unpack_from(mm, 0)
+            if magic == self.MAGIC and len(mm) == self.HEADER.size + 4 * w * h * c:
+                base = memoryview(mm)
+                pixels = base[self.HEADER.size:]
+                data = pixels.cast("f")
+                image = DecodedImage(w, h, c, data, (base, pixels, data), mm)
+                mm = None   # 由 DecodedImage 持有，貼圖上傳後 close() 釋放
+                return image
+        except (ValueError, struct.error):
+            pass
+        finally:
+            if mm is not None:
+                mm.close()
+        self._discard(entry)
+        return None
+
+    def _discard(self, entry):
+        self.errors += 1
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def clear(self):
+        try:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".rgba"):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+    def get_stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "dir": self.cache_dir}
+
+
+class GlyphSubset:
+    """字型字元子集：只把實際用到的字元（標題、按鈕標籤、UserUI 宣告字串、語料檔）以 add_font_chars 加入字型，
+    取代 mvFontRangeHint_Chinese_Full 的數萬個字元，縮小字型貼圖集並縮短建置時間。
+
+    出現新字元時（ensure()、dispatch 寫入的字串）可延遲補字：下一幀以聯集重建字型並重新綁定。
+    """
+    # Dear PyGui 一律載入 ImGui 預設範圍（Basic Latin + Latin-1）
+    BASE_RANGE = (0x20, 0xFF)
+    # mvFontRangeHint_Default + mvFontRangeHint_Chinese_Full 對應的 ImGui 範圍（含端點），供 full 模式的估算
+    FULL_RANGES = ((0x0020, 0x00FF), (0x2000, 0x206F), (0x3000, 0x30FF), (0x31F0, 0x31FF),
+                   (0xFF00, 0xFFEF), (0xFFFD, 0xFFFD), (0x4E00, 0x9FAF))
+    PADDING = 1
+
+    def __init__(self, topup=True):
+        self.topup = topup
+        self.chars = set(range(self.BASE_RANGE[0], self.BASE_RANGE[1] + 1))
+        self.chars.add(0xFFFD)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.font_path = None
+        self.size = 18
+        self.font = None
+        self.build_pending = False
+        self.rebuilds = 0
+        self.topups = 0
+        self.register_ms = 0.0
+        self.first_frame_ms = None
+        self._font_cmap = None
+
+    # ------------------------------------------------------------ 字元收集
+    def add_text(self, *texts):
+        """加入字串中的字元（任何執行緒皆可呼叫）；回傳是否有新字元。"""
+        new = set()
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            for ch in text:
+                cp = ord(ch)
+                if cp >= 0x20 and cp not in self.chars:
+                    new.add(cp)
+        if not new:
+            return False
+        with self._lock:
+            new -= self._pending
+            self._pending |= new
+        return bool(new)
+
+    def add_file(self, path):
+        """加入語料檔（UTF-8 文字）中的所有字元。"""
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                return self.add_text(f.read())
+        except OSError:
+            return False
+
+    def ensure(self, text):
+        """確保 text 的字元可顯示；缺字時於下一幀 flush() 補字（topup 關閉時只記錄）。"""
+        return self.add_text(text)
+
+    @property
+    def missing(self):
+        return len(self._pending)
+
+    # ------------------------------------------------------------ 建立字型
+    def build(self, font_path=None, size=None):
+        """以目前字元集合（含待補字元）建立字型並綁定；舊字型於新字型綁定後刪除。"""
+        if font_path is not None:
+            self.font_path = font_path
+        if size is not None:
+            self.size = size
+        if not self.font_path:
+            return None
+        with self._lock:
+            self.chars |= self._pending
+            self._pending.clear()
+        t0 = time.perf_counter()
+        old = self.font
+        with dpg.font_registry():
+            with dpg.font(self.font_path, self.size) as font:
+                # 預設範圍由 Dear PyGui 自動載入，只補其餘字元
+                # ImWchar 為 16 位元：BMP 以外的字元無法加入
+                extra = sorted(cp for cp in self.chars if self.BASE_RANGE[1] < cp <= 0xFFFF)
+                if extra:
+                    dpg.add_font_chars(extra)
+        dpg.bind_font(font)
+        if old is not None:
+            try:
+                dpg.delete_item(old)
+            except Exception:
+                pass
+        self.font = font
+        self.rebuilds += 1
+        self.register_ms = (time.perf_counter() - t0) * 1000.0
+        # 字型貼圖集在下一次繪製時才實際點陣化（見 record_first_frame）
+        self.build_pending = True
+        return font
+
+    def flush(self):
+        """有待補字元時重建字型（主執行緒，每幀呼叫）。"""
+        if not self._pending or self.font is None or not self.topup:
+            return False
+        self.topups += 1
+        self.build()
+        return True
+
+    def record_first_frame(self, elapsed_s):
+        """記錄字型變更後第一幀的繪製時間（含字型貼圖集建置）。"""
+        self.build_pending = False
+        self.first_frame_ms = elapsed_s * 1000.0
+
+    # ------------------------------------------------------------ 報告
+    @staticmethod
+    def read_cmap(path):
+        """讀取 TrueType/OpenType cmap（format 4 / 12），回傳字型實際含有的 code point 集合；失敗回傳 None。"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            num_tables = struct.unpack_from(">H", data, 4)[0]
+            cmap = None
+            for i in range(num_tables):
+                tag, _, offset, _ = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+                if tag == b"cmap":
+                    cmap = offset
+            if cmap is None:
+                return None
+            subtables = []
+            for i in range(struct.unpack_from(">H", data, cmap + 2)[0]):
+                platform, encoding, offset = struct.unpack_from(">HHI", data, cmap + 4 + 8 * i)
+                fmt = struct.unpack_from(">H", data, cmap + offset)[0]
+                if platform in (0, 3) and fmt in (4, 12):
+                    subtables.append((fmt == 12, cmap + offset))
+            if not subtables:
+                return None
+            # 優先使用 format 12（含 BMP 以外的字元）
+            is12, base = max(subtables)
+            points = set()
+            if is12:
+                for i in range(struct.unpack_from(">I", data, base + 12)[0]):
+                    start, end, _ = struct.unpack_from(">III", data, base + 16 + 12 * i)
+                    points.update(range(start, end + 1))
+                return points
+            seg_x2 = struct.unpack_from(">H", data, base + 6)[0]
+            ends = base + 14
+            starts = ends + seg_x2 + 2
+            for i in range(seg_x2 // 2):
+                end = struct.unpack_from(">H", data, ends + 2 * i)[0]
+                start = struct.unpack_from(">H", data, starts + 2 * i)[0]
+                if start != 0xFFFF:
+                    points.update(range(start, end + 1))
+            return points
+        except (OSError, struct.error, ValueError):
+            return None
+
+    @classmethod
+    def estimate_atlas(cls, glyphs, size):
+        """依 ImGui 的打包規則估算字型貼圖集尺寸，回傳 (width, height, RGBA bytes)。"""
+        if glyphs <= 0:
+            return 0, 0, 0
+        cell = size + cls.PADDING
+        surface = glyphs * cell * cell
+        side = int(surface ** 0.5) + 1
+        width = 4096 if side >= 4096 * 0.7 else 2048 if side >= 2048 * 0.7 else 1024 if side >= 1024 * 0.7 else 512
+        per_row = max(1, width // cell)
+        used = -(-glyphs // per_row) * cell
+        height = 1
+        while height < used:
+            height *= 2
+        return width, height, width * height * 4
+
+    def report(self):
+        """子集與完整範圍（Chinese_Full）的字元數、估算貼圖集大小，以及實測的建立/首幀時間。"""
+        if self._font_cmap is None and self.font_path:
+            self._font_cmap = self.read_cmap(self.font_path) or False
+        cmap = self._font_cmap or None
+        full = set()
+        for start, end in self.FULL_RANGES:
+            full.update(range(start, end + 1))
+        subset = self.chars | self._pending
+        if cmap is not None:
+            full &= cmap
+            subset = subset & cmap
+        full_w, full_h, full_bytes = self.estimate_atlas(len(full), self.size)
+        sub_w, sub_h, sub_bytes = self.estimate_atlas(len(subset), self.size)
+        return {
+            "font": self.font_path,
+            "size": self.size,
+            "glyphs": len(subset),
+            "full_glyphs": len(full),
+            "atlas": [sub_w, sub_h],
+            "atlas_bytes": sub_bytes,
+            "full_atlas": [full_w, full_h],
+            "full_atlas_bytes": full_bytes,
+            "register_ms": self.register_ms,
+            "first_frame_ms": self.first_frame_ms,
+            "rebuilds": self.rebuilds,
+            "topups": self.topups,
+            "missing": self.missing,
+        }
+
+
+class TextureAtlas:
+    """標題列貼圖集：把所有按鈕狀態圖與 icon 打包成單一貼圖，各 sprite 以 UV 矩形取用。"""
+    PADDING = 2
+
+    def __init__(self, width, height, data, rects, source=None):
+        self.width, self.height = width, height
+        self.data = data
+        self.rects = rects          # name -> (x, y, w, h)，像素
+        self.texture = None
+        self._source = source       # load() 解碼的影像（可能是快取 mmap），上傳後關閉
+        self._uvs = {name: ((x / width, y / height), ((x + w) / width, (y + h) / height))
+                     for name, (x, y, w, h) in rects.items()}
+
+    def __contains__(self, name):
+        return name in self.rects
+
+    @classmethod
+    def pack(cls, images, max_width=2048):
+        """images: name -> dpg.load_image() 結果 (w, h, c, data) 或 DecodedImage；以 shelf 演算法依高度排序打包。
+
+        複製完的圖會立即自 images 移除並關閉以釋放解碼資料，降低峰值記憶體（呼叫後 images 為空）。
+        """
+        pad = cls.PADDING
+        items = sorted(((name, img[0], img[1]) for name, img in images.items()), key=lambda it: (-it[2], it[0]))
+        area = sum((w + pad) * (h + pad) for _name, w, h in items)
+        widest = max((w + 2 * pad for _name, w, _h in items), default=1)
+        width = 1
+        while width * width < area or width < widest:
+            width *= 2
+        width = max(widest, min(width, max_width))
+
+        rects = {}
+        x = y = shelf_h = 0
+        for name, w, h in items:
+            if x + w + 2 * pad > width:
+                x, y, shelf_h = 0, y + shelf_h, 0
+            rects[name] = (x + pad, y + pad, w, h)
+            x += w + 2 * pad
+            shelf_h = max(shelf_h, h + 2 * pad)
+        height = max(1, y + shelf_h)
+
+        buf = array("f", bytes(16 * width * height))
+        dst = memoryview(buf)
+        for name, w, h in items:
+            image = images.pop(name)
+            data = image[3]
+            try:
+                src = memoryview(data).cast("B").cast("f")
+            except TypeError:
+                src = memoryview(array("f", data))
+            rx, ry, _w, _h = rects[name]
+            row = 4 * w
+            for r in range(h):
+                d = 4 * ((ry + r) * width + rx)
+                dst[d:d + row] = src[r * row:(r + 1) * row]
+            src.release()
+            del data
+            close_image(image)
+        return cls(width, height, buf, rects)
+
+    @classmethod
+    def load(cls, json_path, decode=None):
+        """載入 save() 產生的預建貼圖集（.json + .png）；decode 預設為 dpg.load_image。"""
+        with open(json_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        image_path = os.path.join(os.path.dirname(json_path), meta["image"])
+        image = (decode or dpg.load_image)(image_path)
+        w, h, _c, data = image
+        return cls(w, h, data, {name: tuple(rect) for name, rect in meta["sprites"].items()}, image)
+
+    def save(self, json_path):
+        """輸出預建貼圖集：同名 .png 與記錄 sprite 矩形的 .json。"""
+        image_name = os.path.splitext(os.path.basename(json_path))[0] + ".png"
+        # save_image 需要 0~255 的像素值（load_image/貼圖使用 0~1）
+        pixels = array("f", (round(v * 255.0) for v in self.data))
+        dpg.save_image(os.path.join(os.path.dirname(json_path), image_name), self.width, self.height,
+                       pixels, components=4)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"image": image_name, "size": [self.width, self.height],
+                       "sprites": {name: list(rect) for name, rect in self.rects.items()}}, f, indent=1)
+
+    def create_texture(self, keep_data=False):
+        """建立唯一的 static texture（主執行緒）。"""
+        with dpg.texture_registry():
+            self.texture = dpg.add_static_texture(self.width, self.height, self.data)
+        if not keep_data:
+            self.data = None
+            source, self._source = self._source, None
+            close_image(source)
+        return self.texture
+
+    def uv(self, name):
+        return self._uvs[name]
+
+    def image_args(self, name):
+        """add_image_button/add_image 所需的 texture_tag 與 UV。"""
+        uv_min, uv_max = self._uvs[name]
+        return {"texture_tag": self.texture, "uv_min": uv_min, "uv_max": uv_max}
+
+
+class HoverTracker:
+    """事件驅動的 hover 狀態：以 item hover handler 取代每幀輪詢 dpg.is_item_hovered。
+
+    hover handler 只在項目被 hover 的幀觸發；update() 依收到的 callback 判定進入，並檢查
+    「目前 hover 中的項目」是否沒有再收到 callback 來判定離開。每幀成本只與 hover 中的項目數（0 或 1）有關，
+    與註冊的按鈕數量無關。on_change(tag, hovered) 只在狀態轉換時呼叫。
+
+    Dear PyGui 預設在 callback 執行緒上執行 handler callback，可能晚一幀才到：callback 只在鎖內記下 tag，
+    所有狀態變更與 on_change（貼圖切換）都在主執行緒的 update() 中進行；離開與進入都以 dpg.is_item_hovered
+    對該單一項目確認後才切換，晚到的 callback 不會造成離開又進入的閃爍。
+    """
+    def __init__(self):
+        self.items = {}        # tag -> on_change
+        self.hovered = {}      # tag -> 最後一次收到 hover callback 的幀（僅主執行緒存取）
+        self.frame = 0
+        self.transitions = 0
+        self._events = []      # callback 執行緒收到、尚未處理的 tag
+        self._lock = threading.Lock()
+
+    def register(self, tag, on_change, bind=True):
+        """註冊項目；bind=True 時建立專屬 item handler registry 並綁定（項目已有其他 registry 時改用 add_handler）。"""
+        self.items[tag] = on_change
+        if bind:
+            self.bind(tag)
+
+    def add_handler(self, tag):
+        """在目前的 item_handler_registry 內加入 tag 的 hover handler（與點擊等 handler 共用 registry 時使用）。"""
+        return dpg.add_item_hover_handler(callback=self._on_hover, user_data=tag)
+
+    def bind(self, tag):
+        """（重新）建立並綁定 tag 的 hover registry，並重設其狀態（例如項目被刪除重建後）。"""
+        self.hovered.pop(tag, None)
+        registry = f"{tag}_hover_handlers"
+        try:
+            if not dpg.does_item_exist(registry):
+                with dpg.item_handler_registry(tag=registry):
+                    self.add_handler(tag)
+            if dpg.does_item_exist(tag):
+                dpg.bind_item_handler_registry(tag, registry)
         except Exception:
             pass
-        return self.get_screen_work_area()
 
-    def get_real_mouse_pos(self):
-        pt = wintypes.POINT()
-        ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-        return [pt.x, pt.y]
+    def _on_hover(self, sender, app_data, user_data):
+        # callback 執行緒：只記錄事件，狀態與貼圖切換留給主執行緒的 update()
+        with self._lock:
+            self._events.append(user_data)
+
+    @staticmethod
+    def _still_hovered(tag):
+        try:
+            return bool(dpg.is_item_hovered(tag))
+        except Exception:
+            return False
+
+    def _notify(self, tag, hovered):
+        self.transitions += 1
+        on_change = self.items.get(tag)
+        if on_change is not None:
+            try:
+                on_change(tag, hovered)
+            except Exception:
+                pass
+
+    def update(self):
+        """每幀呼叫一次（主執行緒，繪製前）：處理上一幀收到的 hover callback（進入），
+        上一幀沒有收到 callback 的項目視為離開。"""
+        frame = self.frame
+        self.frame = frame + 1
+        if self._events:
+            with self._lock:
+                events, self._events = self._events, []
+            for tag in events:
+                if tag in self.hovered:
+                    # hover callback 於上一幀繪製中觸發，屬於 frame 這一幀
+                    self.hovered[tag] = frame
+                elif tag in self.items and self._still_hovered(tag):
+                    self.hovered[tag] = frame
+                    self._notify(tag, True)
+                # 否則為項目已離開後才到達的舊 callback：不視為進入
+        if not self.hovered:
+            return
+        for tag, seen in list(self.hovered.items()):
+            if seen < frame:
+                if self._still_hovered(tag):
+                    # callback 晚到（仍在 callback 佇列中）：沿用 hover 狀態，不切換貼圖
+                    self.hovered[tag] = frame
+                    continue
+                del self.hovered[tag]
+                self._notify(tag, False)
+
+    def is_hovered(self, tag):
+        return tag in self.hovered
+
+
+class ThemeRegistry:
+    """主題登錄：相同規格（每個 component 的顏色 + 樣式）只建立一次，重複要求回傳快取的 theme id。
+
+    項目以「角色」綁定（bind(item, role)）；角色的規格由目前的調色盤（dark / light）與 debug 旗標決定。
+    set_palette() 只對主題有變的項目重新 bind_item_theme，不重建任何項目。
+    規格格式：{component: {"colors": {target: (r, g, b, a)}, "styles": {target: (x, y) 或 x}}}
+    """
+    PALETTES = {
+        "dark": {
+            "title_bg": (51, 51, 55, 255),
+            "title_button": None,         # None = 沿用 Dear PyGui 預設按鈕顏色
+            "title_button_hovered": None,
+            "title_text": None,           # None = 沿用預設文字顏色
+            "window_bg": None,
+            "child_bg": None,
+            "text": None,
+        },
+        "light": {
+            "title_bg": (225, 226, 230, 255),
+            "title_button": (225, 226, 230, 255),
+            "title_button_hovered": (205, 207, 214, 255),
+            "title_text": (30, 30, 34, 255),
+            "window_bg": (243, 243, 246, 255),
+            "child_bg": (250, 250, 252, 255),
+            "text": (25, 25, 28, 255),
+        },
+    }
+    DEBUG_BUTTON = ((60, 160, 255, 40), (60, 160, 255, 120), (60, 160, 255, 160))
+    DEBUG_RESIZE = ((120, 120, 120, 40), (60, 160, 255, 120), (60, 160, 255, 160))
+
+    def __init__(self, palette=None, debug=None):
+        self.palette = palette or CUSTOMWINDOW_PALETTE
+        self.debug = CUSTOMWINDOW_DEBUG if debug is None else debug
+        self._themes = {}      # 規格 key -> theme id
+        self._bound = {}       # item -> (role, theme id)；item 0 代表全域主題（bind_theme）
+        self.roles = {
+            "global": self._spec_global,
+            "title_table": self._spec_title_table,
+            "title_button": self._spec_title_button,
+            "title_text": self._spec_title_text,
+            "resize_bar": self._spec_resize_bar,
+            "panel_window": self._spec_panel_window,
+            "hud_highlight": self._spec_hud_highlight,
+        }
+        self.requests = 0
+        self.hits = 0
+        self.rebinds = 0
+
+    # ------------------------------------------------------------ 規格 -> theme
+    @staticmethod
+    def spec_key(spec):
+        """將規格正規化為可雜湊的 key（component 與屬性排序後比較）。"""
+        key = []
+        for component, parts in spec.items():
+            colors = tuple(sorted((t, tuple(v)) for t, v in (parts.get("colors") or {}).items() if v is not None))
+            styles = tuple(sorted((t, tuple(v) if isinstance(v, (list, tuple)) else (v,))
+                                  for t, v in (parts.get("styles") or {}).items()))
+            if colors or styles:
+                key.append((component, colors, styles))
+        return tuple(sorted(key))
+
+    def get(self, spec):
+        """回傳符合規格的 theme id；相同規格只建立一次。"""
+        key = self.spec_key(spec)
+        self.requests += 1
+        theme = self._themes.get(key)
+        if theme is not None:
+            self.hits += 1
+            return theme
+        with dpg.theme() as theme:
+            for component, colors, styles in key:
+                with dpg.theme_component(component):
+                    for target, value in colors:
+                        dpg.add_theme_color(target, value)
+                    for target, values in styles:
+                        dpg.add_theme_style(target, *values)
+        self._themes[key] = theme
+        return theme
+
+    def define(self, role, spec_func):
+        """註冊自訂角色：spec_func(palette_dict, debug) 回傳規格。"""
+        self.roles[role] = spec_func
+        self._rebind(role)
+
+    def theme_for(self, role):
+        return self.get(self.roles[role](self.PALETTES[self.palette], self.debug))
+
+    # ------------------------------------------------------------ 綁定
+    def bind(self, item, role):
+        """以角色綁定項目主題（之後切換調色盤時自動重新綁定）。"""
+        theme = self.theme_for(role)
+        self._bind(item, theme)
+        self._bound[item] = (role, theme)
+        return theme
+
+    def bind_global(self, role="global"):
+        return self.bind(0, role)
+
+    def _bind(self, item, theme):
+        if item == 0:
+            dpg.bind_theme(theme)
+        else:
+            dpg.bind_item_theme(item, theme)
+
+    def forget(self, item):
+        self._bound.pop(item, None)
+
+    def forget_prefix(self, prefix):
+        for item in [i for i in self._bound if isinstance(i, str) and i.startswith(prefix)]:
+            del self._bound[item]
+
+    def set_palette(self, palette=None, debug=None):
+        """切換調色盤及/或 debug 顏色；只重新綁定主題有變的項目，回傳重新綁定數。"""
+        if palette is not None:
+            if palette not in self.PALETTES:
+                raise ValueError(f"unknown palette {palette!r}")
+            self.palette = palette
+        if debug is not None:
+            self.debug = debug
+        return self._rebind()
+
+    def _rebind(self, only_role=None):
+        count = 0
+        themes = {}
+        for item, (role, theme) in list(self._bound.items()):
+            if only_role is not None and role != only_role:
+                continue
+            if role not in themes:
+                themes[role] = self.theme_for(role)
+            new = themes[role]
+            if new == theme:
+                continue
+            try:
+                if item != 0 and not dpg.does_item_exist(item):
+                    del self._bound[item]
+                    continue
+                self._bind(item, new)
+                self._bound[item] = (role, new)
+                count += 1
+            except Exception:
+                pass
+        self.rebinds += count
+        return count
+
+    def prune(self):
+        """刪除目前沒有任何項目使用的 theme（之後切回時會重新建立）；回傳刪除數。"""
+        used = {theme for _, theme in self._bound.values()}
+        removed = 0
+        for key, theme in list(self._themes.items()):
+            if theme not in used:
+                try:
+                    dpg.delete_item(theme)
+                except Exception:
+                    pass
+                del self._themes[key]
+                removed += 1
+        return removed
+
+    def get_stats(self):
+        return {
+            "live": len(self._themes),
+            "bound_items": len(self._bound),
+            "requests": self.requests,
+            "cache_hits": self.hits,
+            "rebinds": self.rebinds,
+            "palette": self.palette,
+            "debug": self.debug,
+        }
+
+    # ------------------------------------------------------------ 內建角色
+    @staticmethod
+    def _button_colors(normal, hovered, active):
+        return {dpg.mvThemeCol_Button: normal, dpg.mvThemeCol_ButtonHovered: hovered,
+                dpg.mvThemeCol_ButtonActive: active}
+
+    def _spec_global(self, pal, debug):
+        return {dpg.mvAll: {
+            "styles": {dpg.mvStyleVar_WindowPadding: (0, 0), dpg.mvStyleVar_WindowBorderSize: 0,
+                       dpg.mvStyleVar_ItemSpacing: (1, 4)},
+            "colors": {dpg.mvThemeCol_WindowBg: pal["window_bg"], dpg.mvThemeCol_ChildBg: pal["child_bg"],
+                       dpg.mvThemeCol_Text: pal["text"]},
+        }}
+
+    def _spec_title_table(self, pal, debug):
+        return {
+            dpg.mvTable: {"styles": {dpg.mvStyleVar_CellPadding: (0, 0)}},
+            dpg.mvAll: {"styles": {dpg.mvStyleVar_ItemSpacing: (0, 0)}},
+        }
+
+    def _spec_title_button(self, pal, debug):
+        # 標題列按鈕：移除框內邊距讓高度貼齊 cell；image_button 也套相同的 padding/rounding
+        styles = {dpg.mvStyleVar_FramePadding: (0, 0), dpg.mvStyleVar_FrameRounding: 0}
+        if debug:
+            colors = self._button_colors(*self.DEBUG_BUTTON)
+        else:
+            colors = self._button_colors(pal["title_button"], pal["title_button_hovered"], pal["title_button_hovered"])
+            colors[dpg.mvThemeCol_Text] = pal["title_text"]
+        return {dpg.mvButton: {"styles": styles, "colors": colors},
+                dpg.mvImageButton: {"styles": styles, "colors": colors}}
+
+    def _spec_title_text(self, pal, debug):
+        if debug:
+            # debug：標題文字區與其他標題列按鈕相同（顯示 hover/active 顏色）
+            return self._spec_title_button(pal, debug)
+        # 三種狀態同色，避免 hover/active 顏色變化
+        bg = pal["title_bg"]
+        colors = self._button_colors(bg, bg, bg)
+        colors[dpg.mvThemeCol_Text] = pal["title_text"]
+        return {dpg.mvButton: {"styles": {dpg.mvStyleVar_FramePadding: (0, 0), dpg.mvStyleVar_FrameRounding: 0},
+                               "colors": colors}}
+
+    def _spec_resize_bar(self, pal, debug):
+        colors = self._button_colors(*self.DEBUG_RESIZE) if debug else self._button_colors(*((0, 0, 0, 0),) * 3)
+        return {dpg.mvButton: {"styles": {dpg.mvStyleVar_FramePadding: (0, 0), dpg.mvStyleVar_FrameRounding: 0},
+                               "colors": colors}}
+
+    def _spec_panel_window(self, pal, debug):
+        return {dpg.mvAll: {"styles": {dpg.mvStyleVar_WindowPadding: (0, 0), dpg.mvStyleVar_WindowBorderSize: 1}}}
+
+    def _spec_hud_highlight(self, pal, debug):
+        # 醒目綠字：用於顯示最重要的計算座標
+        return {dpg.mvText: {"colors": {dpg.mvThemeCol_Text: (0, 255, 0, 255)}}}
+
 
 class CustomWindowBar:
-    """建立自訂標題列（icon + title + 控制按鈕）。"""
-    def build(self, ui, parent_tag: str = "main_window"):
-        # 標題列主題（零邊距/間距）
-        with dpg.theme() as table_theme:
-            with dpg.theme_component(dpg.mvTable):
-                dpg.add_theme_style(dpg.mvStyleVar_CellPadding, 0, 0)
-            with dpg.theme_component(dpg.mvAll):
-                dpg.add_theme_style(dpg.mvStyleVar_ItemSpacing, 0, 0)
-
-        # 標題列按鈕主題：移除框內邊距讓高度貼齊 cell
-        with dpg.theme() as bar_button_theme:
-            with dpg.theme_component(dpg.mvButton):
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 0, 0)
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 0)
-                if CUSTOMWINDOW_DEBUG:
-                    dpg.add_theme_color(dpg.mvThemeCol_Button, (60, 160, 255, 40))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (60, 160, 255, 120))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (60, 160, 255, 160))
-            # image_button 也套相同的 padding/rounding
-            with dpg.theme_component(dpg.mvImageButton):
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 0, 0)
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 0)
-                if CUSTOMWINDOW_DEBUG:
-                    dpg.add_theme_color(dpg.mvThemeCol_Button, (60, 160, 255, 40))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (60, 160, 255, 120))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (60, 160, 255, 160))
-
-        # 非 debug：讓 title 文字區的 hover/press 與一般狀態一致（透明，不改變顏色）
-        title_text_theme = None
-        if not CUSTOMWINDOW_DEBUG:
-            with dpg.theme() as _title_text_theme:
-                with dpg.theme_component(dpg.mvButton):
-                    dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 0, 0)
-                    dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 0)
-                    # 將三種狀態都設為透明，避免 hover/active 顏色變化
-                    dpg.add_theme_color(dpg.mvThemeCol_Button, (51, 51, 55, 255))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (51, 51, 55, 255))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (51, 51, 55, 255))
-            title_text_theme = _title_text_theme
+    """建立自訂標題列（icon + title + 控制按鈕）。
+
+    prefix 為所有 tag 的命名空間（主視窗為 ""），讓同一 viewport 內可有多份標題列（見 PanelManager）；
+    callbacks 可覆寫按鈕與標題列事件；主題經由 ui.themes（ThemeRegistry）共用。
+    """
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        # 以文字按鈕暫代、等待貼圖載入後替換的項目
+        self.placeholders = set()
+        self.callbacks = {}
+
+    # 控制按鈕 -> (一般, hover) 貼圖 key
+    HOVER_SPRITES = {
+        "min_btn": ("min_normal", "min_hover"),
+        "max_btn": ("max_normal", "max_hover"),
+        "close_btn": ("close_normal", "close_hover"),
+    }
+
+    def tag(self, name):
+        return self.prefix + name
+
+    def build(self, ui, parent_tag: str = "main_window", title="Title bar text", callbacks=None):
+        t = self.tag
+        self.callbacks = {
+            "minimize": ui.ui_event.minimize_viewport,
+            "maximize": ui.ui_event.toggle_maximize,
+            "close": ui.ui_event.close_application,
+            "title_press": ui.ui_event.on_title_press,
+            "title_double_click": ui.ui_event.on_title_double_click,
+        }
+        self.callbacks.update(callbacks or {})
+        cb = self.callbacks
 
         with dpg.table(header_row=False, borders_innerH=False, borders_outerH=False,
                        borders_innerV=False, borders_outerV=False, resizable=False,
                        policy=dpg.mvTable_SizingFixedFit, row_background=False,
-                       precise_widths=True, tag="title_table", parent=parent_tag):
+                       precise_widths=True, tag=t("title_table"), parent=parent_tag):
             # 欄位：icon | title(自適應像素) | min | max | close
-            dpg.add_table_column(tag="col_icon", init_width_or_weight=ui.button_size[0])
-            dpg.add_table_column(tag="col_title")
-            dpg.add_table_column(tag="col_min", init_width_or_weight=ui.button_size[0])
-            dpg.add_table_column(tag="col_max", init_width_or_weight=ui.button_size[0])
-            dpg.add_table_column(tag="col_close", init_width_or_weight=ui.button_size[0])
+            dpg.add_table_column(tag=t("col_icon"), init_width_or_weight=ui.button_size[0])
+            dpg.add_table_column(tag=t("col_title"))
+            dpg.add_table_column(tag=t("col_min"), init_width_or_weight=ui.button_size[0])
+            dpg.add_table_column(tag=t("col_max"), init_width_or_weight=ui.button_size[0])
+            dpg.add_table_column(tag=t("col_close"), init_width_or_weight=ui.button_size[0])
 
             with dpg.table_row():
                 # Icon
                 with dpg.table_cell():
                     if ui.icon_tex:
-                        dpg.add_image_button(tag="title_icon_btn", texture_tag=ui.icon_tex,
+                        dpg.add_image_button(tag=t("title_icon_btn"), **ui.sprite_args("icon"),
                                              width=ui.button_size[0], height=ui.button_size[1])
                     else:
-                        dpg.add_button(tag="title_icon_btn", label="■",
+                        dpg.add_button(tag=t("title_icon_btn"), label="■",
                                        width=ui.button_size[0], height=ui.button_size[1])
+                        self.placeholders.add(t("title_icon_btn"))
 
                 # Title（左對齊、可拖曳/雙擊）
-                with dpg.table_cell(tag="title_text_cell"):
+                with dpg.table_cell(tag=t("title_text_cell")):
                     # 初始化時先給一個暫定寬度，之後在 sync_ui 精確調整
-                    dpg.add_button(tag="title_text_btn", label="Title bar text",
+                    dpg.add_button(tag=t("title_text_btn"), label=title,
                                    width=200, height=ui.button_size[1])
 
                 # 控制按鈕
-                with dpg.table_cell():
-                    if ui.images_ok:
-                        dpg.add_image_button(tag="min_btn", texture_tag=ui.texture_ids.get("min_normal"),
-                                             width=ui.button_size[0], height=ui.button_size[1],
-                                             callback=ui.ui_event.minimize_viewport)
-                    else:
-                        dpg.add_button(tag="min_btn", label="-", width=ui.button_size[0], height=ui.button_size[1],
-                                       callback=ui.ui_event.minimize_viewport)
+                for name, label, action in (("min_btn", "-", "minimize"), ("max_btn", "口", "maximize"),
+                                            ("close_btn", "x", "close")):
+                    with dpg.table_cell():
+                        if ui.images_ok:
+                            dpg.add_image_button(tag=t(name), **ui.sprite_args(self.HOVER_SPRITES[name][0]),
+                                                 width=ui.button_size[0], height=ui.button_size[1],
+                                                 callback=cb[action])
+                        else:
+                            dpg.add_button(tag=t(name), label=label, width=ui.button_size[0],
+                                           height=ui.button_size[1], callback=cb[action])
+                            self.placeholders.add(t(name))
 
-                with dpg.table_cell():
-                    if ui.images_ok:
-                        dpg.add_image_button(tag="max_btn", texture_tag=ui.texture_ids.get("max_normal"),
-                                             width=ui.button_size[0], height=ui.button_size[1],
-                                             callback=ui.ui_event.toggle_maximize)
-                    else:
-                        dpg.add_button(tag="max_btn", label="口", width=ui.button_size[0], height=ui.button_size[1],
-                                       callback=ui.ui_event.toggle_maximize)
+        # 主題由 ThemeRegistry 依角色綁定（同規格共用同一 theme，切換調色盤時只重新綁定）
+        themes = ui.themes
+        themes.bind(t("title_table"), "title_table")
+        for name in ["title_icon_btn", "min_btn", "max_btn", "close_btn"]:
+            if dpg.does_item_exist(t(name)):
+                themes.bind(t(name), "title_button")
+        # title_text_btn：非 debug 狀態下 hover/press 不變色
+        if dpg.does_item_exist(t("title_text_btn")):
+            themes.bind(t("title_text_btn"), "title_text")
 
-                with dpg.table_cell():
-                    if ui.images_ok:
-                        dpg.add_image_button(tag="close_btn", texture_tag=ui.texture_ids.get("close_normal"),
-                                             width=ui.button_size[0], height=ui.button_size[1],
-                                             callback=ui.ui_event.close_application)
-                    else:
-                        dpg.add_button(tag="close_btn", label="x", width=ui.button_size[0], height=ui.button_size[1],
-                                       callback=ui.ui_event.close_application)
-
-        dpg.bind_item_theme("title_table", table_theme)
-        # 套用按鈕主題到所有標題列按鈕
-        for item_id in ["title_icon_btn", "title_text_btn", "min_btn", "max_btn", "close_btn"]:
-            if dpg.does_item_exist(item_id):
-                dpg.bind_item_theme(item_id, bar_button_theme)
-        # 覆蓋 title_text_btn 主題，確保非 debug 狀態下 hover/press 不變色
-        if title_text_theme and dpg.does_item_exist("title_text_btn"):
-            dpg.bind_item_theme("title_text_btn", title_text_theme)
-
-        # 事件綁定：只在 title/icon 上拖曳與雙擊
-        with dpg.item_handler_registry(tag="title_bar_handlers"):
-            dpg.add_item_clicked_handler(callback=ui.ui_event.on_title_press)
-            dpg.add_item_double_clicked_handler(callback=ui.ui_event.on_title_double_click)
-        for item_id in ["title_text_btn", "title_icon_btn"]:
-            if dpg.does_item_exist(item_id):
-                dpg.bind_item_handler_registry(item_id, "title_bar_handlers")
+        # hover 貼圖切換：事件驅動，只在進入/離開時更新（佔位文字按鈕期間不換圖）
+        for name, (normal, hover) in self.HOVER_SPRITES.items():
+            ui.add_hover_sprites(t(name), normal, hover, bar=self)
+
+        # 事件綁定：只在 title/icon 上拖曳與雙擊（未提供 callback 時不建立，例如由 PanelManager 統一路由）
+        if cb.get("title_press") or cb.get("title_double_click"):
+            with dpg.item_handler_registry(tag=t("title_bar_handlers")):
+                if cb.get("title_press"):
+                    dpg.add_item_clicked_handler(callback=cb["title_press"])
+                if cb.get("title_double_click"):
+                    dpg.add_item_double_clicked_handler(callback=cb["title_double_click"])
+            for name in ["title_text_btn", "title_icon_btn"]:
+                if dpg.does_item_exist(t(name)):
+                    dpg.bind_item_handler_registry(t(name), t("title_bar_handlers"))
 
         # 將標題列整體下移，預留上邊縮放條厚度（避免使用 spacer）
         try:
-            dpg.configure_item("title_table", pos=[0, ui.resize_overlay.bar_w])
+            dpg.configure_item(t("title_table"), pos=[0, ui.resize_overlay.bar_w])
         except Exception:
             pass
 
-class ResizeOverlay:
-    """封裝邊緣縮放條與角落方塊的建立與主題綁定。"""
-    def __init__(self, bar_w: int = 6, corner_size: int = 20):
-        self.bar_w = bar_w
-        self.corner_size = corner_size
-        self.theme = None
+    def swap_placeholders(self, ui):
+        """貼圖就緒後，將文字佔位按鈕原地換成圖片按鈕（同 tag、同 cell、同主題與 handler）。"""
+        t = self.tag
+        cb = self.callbacks
+        specs = {
+            t("title_icon_btn"): ("icon" if ui.icon_tex else None, None),
+            t("min_btn"): ("min_normal" if ui.images_ok else None, cb.get("minimize")),
+            t("max_btn"): ("max_normal" if ui.images_ok else None, cb.get("maximize")),
+            t("close_btn"): ("close_normal" if ui.images_ok else None, cb.get("close")),
+        }
+        for tag in list(self.placeholders):
+            sprite, callback = specs[tag]
+            if not sprite:
+                continue
+            try:
+                if dpg.does_item_exist(tag):
+                    parent = dpg.get_item_parent(tag)
+                    dpg.delete_item(tag)
+                    dpg.add_image_button(tag=tag, parent=parent, **ui.sprite_args(sprite),
+                                         width=ui.button_size[0], height=ui.button_size[1], callback=callback)
+                    ui.themes.bind(tag, "title_button")
+                    if tag == t("title_icon_btn") and dpg.does_item_exist(t("title_bar_handlers")):
+                        dpg.bind_item_handler_registry(tag, t("title_bar_handlers"))
+                    ui.geometry.invalidate(tag)
+                    if tag in ui.hover.items:
+                        # 重建後的項目需重新綁定 hover registry，狀態回到未 hover
+                        ui.hover.bind(tag)
+                    if tag in ui.state["btn_hover"]:
+                        ui.state["btn_hover"][tag] = False
+                self.placeholders.discard(tag)
+            except Exception:
+                pass
+
+
+class ResizeOverlay:
+    """封裝邊緣縮放條與角落方塊的建立與主題綁定。"""
+    def __init__(self, bar_w: int = 6, corner_size: int = 20):
+        self.bar_w = bar_w
+        self.corner_size = corner_size
+
+    def build(self, ui, parent_tag: str = "main_window"):
+
+        # 現況尺寸
+        vw, vh = dpg.get_viewport_width(), dpg.get_viewport_height()
+        title_h = ui.button_size[1]
+
+        # 角落方塊
+        dpg.add_button(tag="resize_bl_corner", label="", width=self.corner_size, height=self.corner_size,
+                       pos=[0, max(0, vh - self.corner_size)], parent=parent_tag)
+        dpg.add_button(tag="resize_br_corner", label="", width=self.corner_size, height=self.corner_size,
+                       pos=[max(0, vw - self.corner_size), max(0, vh - self.corner_size)], parent=parent_tag)
+        dpg.add_button(tag="resize_tl_corner", label="", width=self.corner_size, height=self.corner_size,
+                   pos=[0, 0], parent=parent_tag)
+
+        # 邊緣縮放條（先建立，後續在 sync_ui/update_logic 依據實際 title 位置修正）
+        dpg.add_button(tag="resize_left_bar", label="", width=self.bar_w, height=max(1, vh - self.bar_w - self.bar_w), pos=[0, self.bar_w], parent=parent_tag)
+        dpg.add_button(tag="resize_right_bar", label="", width=self.bar_w, height=max(1, vh - self.bar_w - self.bar_w), pos=[max(0, vw - self.bar_w), self.bar_w], parent=parent_tag)
+        dpg.add_button(tag="resize_bottom_bar", label="", width=vw, height=self.bar_w, pos=[0, max(0, vh - self.bar_w)], parent=parent_tag)
+        dpg.add_button(tag="resize_top_bar", label="", width=vw, height=self.bar_w, pos=[0, 0], parent=parent_tag)
+        # 縮放條主題（debug 時可見；ui.themes.set_palette(debug=...) 於執行期切換）
+        for tag in ("resize_bl_corner", "resize_br_corner", "resize_tl_corner",
+                    "resize_left_bar", "resize_right_bar", "resize_bottom_bar", "resize_top_bar"):
+            ui.themes.bind(tag, "resize_bar")
+
+class HitTester:
+    """命中判定引擎：依 viewport 尺寸預先建立區域表，之後以常數時間分類座標。
+
+    區域名稱：縮放方向（corner_top_left / corner_left / corner / top / left / right / bottom）、
+    icon / title / min_btn / max_btn / close_btn，其餘為 content。座標為 viewport 本地整數座標。
+    """
+    # 可進入縮放模式的區域（名稱與 state["resize_dir"] 相同）
+    RESIZE_REGIONS = ("corner_top_left", "corner_left", "corner", "top", "left", "right", "bottom")
+
+    def __init__(self):
+        self._key = None
+        self._xs = []
+        self._ys = []
+        self._regions = []
+        self._cursors = []
+        self.rebuild_count = 0
+
+    def update(self, vw, vh, bar_w, corner_size, button_size, title_y):
+        """尺寸或參數改變時才重建區域表；回傳是否重建。"""
+        key = (vw, vh, bar_w, corner_size, button_size[0], button_size[1], title_y)
+        if key == self._key:
+            return False
+        self._key = key
+        bw, cs = bar_w, corner_size
+        btn_w, title_h = button_size
+        # 所有判定都是對下列門檻的比較；「<= a」以整數門檻 a + 1 表示
+        xs = sorted({bw + 1, cs + 1, vw - cs, vw - bw, vw - 24,
+                     btn_w, vw - 3 * btn_w, vw - 2 * btn_w, vw - btn_w})
+        ys = sorted({bw + 1, cs + 1, vh - cs, vh - bw, vh - 24, title_y, title_y + title_h})
+        # 每個區段取一個代表點（區段下界），以參考判定填表
+        rep_xs = [xs[0] - 1] + xs
+        rep_ys = [ys[0] - 1] + ys
+        self._xs, self._ys = xs, ys
+        self._regions = [[self._region_at(x, y, vw, vh, bw, cs, btn_w, title_y, title_h) for x in rep_xs]
+                         for y in rep_ys]
+        self._cursors = [[self._cursor_at(x, y, vw, vh, bw, cs) for x in rep_xs] for y in rep_ys]
+        self.rebuild_count += 1
+        return True
+
+    def classify(self, x, y):
+        """回傳座標所在區域名稱（點擊語意）。"""
+        return self._regions[bisect.bisect_right(self._ys, y)][bisect.bisect_right(self._xs, x)]
+
+    def cursor_key(self, x, y):
+        """回傳座標對應的游標形狀鍵（std / we / ns / nwse / nesw）。"""
+        return self._cursors[bisect.bisect_right(self._ys, y)][bisect.bisect_right(self._xs, x)]
+
+    @staticmethod
+    def _region_at(x, y, vw, vh, bw, cs, btn_w, title_y, title_h):
+        # 參考判定：順序與原本 on_mouse_click 的座標判定一致
+        if x <= cs and y <= cs:
+            return "corner_top_left"
+        if x <= cs and y >= vh - cs:
+            return "corner_left"
+        if x >= vw - cs and y >= vh - cs:
+            return "corner"
+        if y <= bw:
+            return "top"
+        if x <= bw:
+            return "left"
+        if x >= vw - bw:
+            return "right"
+        if y >= vh - bw:
+            return "bottom"
+        # 右下角放寬的抓取範圍
+        if x > vw - 25 and y > vh - 25:
+            return "corner"
+        if title_y <= y < title_y + title_h:
+            if x < btn_w:
+                return "icon"
+            if x >= vw - btn_w:
+                return "close_btn"
+            if x >= vw - 2 * btn_w:
+                return "max_btn"
+            if x >= vw - 3 * btn_w:
+                return "min_btn"
+            return "title"
+        return "content"
+
+    @staticmethod
+    def _cursor_at(x, y, vw, vh, bw, cs):
+        # 參考判定：與原本游標座標回退判定一致（右上角僅提示游標，不進入縮放）
+        if x <= cs and y <= cs:
+            return "nwse"
+        if x <= cs and y >= vh - cs:
+            return "nesw"
+        if x >= vw - cs and y >= vh - cs:
+            return "nwse"
+        if x >= vw - cs and y <= cs:
+            return "nesw"
+        if y <= bw or y >= vh - bw:
+            return "ns"
+        if x <= bw or x >= vw - bw:
+            return "we"
+        return "std"
+
+class GeometryCommit:
+    """幾何提交層：暫存目標幾何，於每幀結束時與上次提交的值比對，只送出有變動的屬性。
+
+    同一幀內對同一 item 的多次 stage（clamp、sync_ui、使用者 resize callback）會合併，
+    每個 item 每次 flush 最多只呼叫一次 dpg.configure_item。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._committed = {}
+        self.stage_count = 0       # 若直接 configure_item 時應有的呼叫次數
+        self.configure_calls = 0   # 實際送出的 configure_item 次數
+
+    @property
+    def saved_calls(self):
+        """省下的 configure_item 呼叫次數。"""
+        return self.stage_count - self.configure_calls
+
+    def stage(self, tag, **props):
+        """暫存一個 item 的目標屬性（後寫覆蓋先寫）。"""
+        with self._lock:
+            self._pending.setdefault(tag, {}).update(props)
+            self.stage_count += 1
+
+    def invalidate(self, tag=None):
+        """清除已提交快取（item 重建或被外部直接修改時呼叫）。"""
+        with self._lock:
+            if tag is None:
+                self._committed.clear()
+            else:
+                self._committed.pop(tag, None)
+
+    def forget_prefix(self, prefix):
+        """移除 tag 以 prefix 開頭的暫存與快取（整組 item 被刪除時呼叫）。"""
+        with self._lock:
+            for table in (self._pending, self._committed):
+                for tag in [t for t in table if isinstance(t, str) and t.startswith(prefix)]:
+                    del table[tag]
+
+    def flush(self):
+        """送出所有暫存屬性中與上次提交不同者。"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+        for tag, props in pending.items():
+            last = self._committed.get(tag)
+            if last is None:
+                # 首次提交才確認 item 是否存在，之後直接比對快取
+                if not dpg.does_item_exist(tag):
+                    continue
+                last = self._committed[tag] = {}
+            changed = {k: v for k, v in props.items() if last.get(k) != v}
+            if not changed:
+                continue
+            try:
+                dpg.configure_item(tag, **changed)
+                last.update(changed)
+                self.configure_calls += 1
+            except Exception:
+                self._committed.pop(tag, None)
+
+    def get_stats(self):
+        return {
+            "stage_count": self.stage_count,
+            "configure_calls": self.configure_calls,
+            "saved_calls": self.saved_calls,
+        }
+
+class FrameSnapshot:
+    """每幀輸入/viewport 快照：於 UIHandle.handler() 開頭擷取一次，供所有處理常式共用。
+
+    只有在框架自行移動/縮放 viewport 後才呼叫 refresh_viewport() 重新查詢。
+    """
+    def __init__(self, ui_handle):
+        self.ui_handle = ui_handle
+        self.frame = 0
+        self.time = 0.0
+        self.mouse_moved = False
+        self.mouse_screen = [0, 0]
+        self.mouse_local = [0, 0]
+        self.viewport_pos = [0, 0]
+        self.viewport_w = 0
+        self.viewport_h = 0
+        self.is_maximized = False
+        self._work_area = None
+
+    def capture(self):
+        """擷取本幀的滑鼠螢幕座標與 viewport 狀態。"""
+        self.frame += 1
+        self.time = time.perf_counter()
+        prev = self.mouse_screen
+        # 每幀只查詢一次 viewport 設定，滑鼠換算（非 Windows）與 viewport 狀態共用
+        cfg = dpg.get_viewport_configuration(0)
+        self.mouse_screen = self.ui_handle.get_real_mouse_pos(cfg)
+        self.mouse_moved = self.mouse_screen[0] != prev[0] or self.mouse_screen[1] != prev[1]
+        self._work_area = None
+        self.refresh_viewport(cfg)
+
+    def ensure(self):
+        """尚未擷取過（例如第一幀之前的 callback）時立即擷取。"""
+        if self.frame == 0:
+            self.capture()
+        return self
+
+    def refresh_viewport(self, cfg=None):
+        """重新查詢 viewport 位置/尺寸（單次 get_viewport_configuration）並更新衍生值。"""
+        if cfg is None:
+            cfg = dpg.get_viewport_configuration(0)
+        self.viewport_pos = [cfg["x_pos"], cfg["y_pos"]]
+        self.viewport_w, self.viewport_h = cfg["width"], cfg["height"]
+        self.mouse_local = [int(self.mouse_screen[0] - self.viewport_pos[0]),
+                            int(self.mouse_screen[1] - self.viewport_pos[1])]
+        self.is_maximized = self.ui_handle.state["is_manual_max"]
+
+    def set_viewport_rect(self, x, y, w, h):
+        """框架已知剛寫入的 viewport 矩形時直接更新，免去重新查詢。"""
+        self.viewport_pos = [x, y]
+        self.viewport_w, self.viewport_h = w, h
+        self.mouse_local = [int(self.mouse_screen[0] - x), int(self.mouse_screen[1] - y)]
 
-    def build(self, ui, parent_tag: str = "main_window"):
-        # 建立縮放條主題
-        with dpg.theme() as resize_bar_theme:
-            with dpg.theme_component(dpg.mvButton):
-                if CUSTOMWINDOW_DEBUG:
-                    dpg.add_theme_color(dpg.mvThemeCol_Button, (120, 120, 120, 40))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (60, 160, 255, 120))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (60, 160, 255, 160))
-                else:
-                    dpg.add_theme_color(dpg.mvThemeCol_Button, (0, 0, 0, 0))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonHovered, (0, 0, 0, 0))
-                    dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, (0, 0, 0, 0))
-                dpg.add_theme_style(dpg.mvStyleVar_FramePadding, 0, 0)
-                dpg.add_theme_style(dpg.mvStyleVar_FrameRounding, 0)
-        self.theme = resize_bar_theme
+    @property
+    def viewport_rect(self):
+        return [self.viewport_pos[0], self.viewport_pos[1], self.viewport_w, self.viewport_h]
 
-        # 現況尺寸
-        vw, vh = dpg.get_viewport_width(), dpg.get_viewport_height()
-        title_h = ui.button_size[1]
+    @property
+    def viewport_size(self):
+        return [self.viewport_w, self.viewport_h]
 
-        # 角落方塊
-        dpg.add_button(tag="resize_bl_corner", label="", width=self.corner_size, height=self.corner_size,
-                       pos=[0, max(0, vh - self.corner_size)], parent=parent_tag)
-        dpg.add_button(tag="resize_br_corner", label="", width=self.corner_size, height=self.corner_size,
-                       pos=[max(0, vw - self.corner_size), max(0, vh - self.corner_size)], parent=parent_tag)
-        dpg.add_button(tag="resize_tl_corner", label="", width=self.corner_size, height=self.corner_size,
-                   pos=[0, 0], parent=parent_tag)
-        dpg.bind_item_theme("resize_bl_corner", self.theme)
-        dpg.bind_item_theme("resize_br_corner", self.theme)
-        dpg.bind_item_theme("resize_tl_corner", self.theme)
+    @property
+    def work_area(self):
+        """viewport 所在螢幕的工作區（每幀首次存取時才查詢）。"""
+        if self._work_area is None:
+            self._work_area = self.ui_handle.get_viewport_work_area()
+        return self._work_area
 
-        # 邊緣縮放條（先建立，後續在 sync_ui/update_logic 依據實際 title 位置修正）
-        dpg.add_button(tag="resize_left_bar", label="", width=self.bar_w, height=max(1, vh - self.bar_w - self.bar_w), pos=[0, self.bar_w], parent=parent_tag)
-        dpg.add_button(tag="resize_right_bar", label="", width=self.bar_w, height=max(1, vh - self.bar_w - self.bar_w), pos=[max(0, vw - self.bar_w), self.bar_w], parent=parent_tag)
-        dpg.add_button(tag="resize_bottom_bar", label="", width=vw, height=self.bar_w, pos=[0, max(0, vh - self.bar_w)], parent=parent_tag)
-        dpg.add_button(tag="resize_top_bar", label="", width=vw, height=self.bar_w, pos=[0, 0], parent=parent_tag)
-        dpg.bind_item_theme("resize_left_bar", self.theme)
-        dpg.bind_item_theme("resize_right_bar", self.theme)
-        dpg.bind_item_theme("resize_bottom_bar", self.theme)
-        dpg.bind_item_theme("resize_top_bar", self.theme)
+def compute_resize_rect(direction, start_pos, start_size, dx, dy, current, min_w=400, min_h=300):
+    """依縮放方向與滑鼠位移計算目標 viewport 矩形 [x, y, w, h]；未受影響的軸沿用 current。"""
+    x, y, w, h = current
+    sx, sy = start_pos
+    sw, sh = start_size
+    if direction in ("right", "corner"):
+        w = max(min_w, int(sw + dx))
+    if direction in ("bottom", "corner", "corner_left"):
+        h = max(min_h, int(sh + dy))
+    if direction in ("left", "corner_left", "corner_top_left"):
+        w = max(min_w, int(sw - dx))
+        x = int(sx + dx)
+        if w == min_w:
+            x = min(x, sx + sw - min_w)
+    if direction in ("top", "corner_top_left"):
+        h = max(min_h, int(sh - dy))
+        y = int(sy + dy)
+        if h == min_h:
+            y = min(y, sy + sh - min_h)
+    return [x, y, w, h]
+
+def clamp_rect_to_area(rect, area):
+    """將矩形 [x, y, w, h] 夾入工作區：尺寸不超過工作區，位置不超出邊界。"""
+    x, y, w, h = rect
+    w, h = min(w, area["w"]), min(h, area["h"])
+    x = min(max(x, area["x"]), area["x"] + max(0, area["w"] - w))
+    y = min(max(y, area["y"]), area["y"] + max(0, area["h"] - h))
+    return [int(x), int(y), w, h]
 
 class UIEvent:
     """事件代理：對齊 GUI_demo 架構，處理 viewport 事件。"""
     def __init__(self, ui_handle):
         self.ui_handle = ui_handle
 
+    def _trace(self, kind, a=0):
+        """錄製中時記錄輸入事件。"""
+        recorder = self.ui_handle.recorder
+        if recorder is not None:
+            recorder.event(kind, a)
+
     def resize_window_callback(self, sender, app_data):
         try:
-            self.ui_handle.clamp_viewport_to_work_area()
-            self.ui_handle.sync_ui()
-            # 呼叫用戶自訂的 resize callback
-            self.ui_handle.user_ui.resize_callback(sender, app_data)
+            # viewport 尺寸已由系統改變，先更新快照
+            ui = self.ui_handle
+            ui.snapshot.ensure().refresh_viewport()
+            ui.clamp_viewport_to_work_area()
+            if ui._resize_deferred():
+                # outline：縮放中不動外框；hybrid：只同步外框。內容與使用者 callback 延後
+                if ui.live_resize != "outline":
+                    ui.sync_ui(content=False)
+                ui.state["content_stale"] = True
+                return
+            ui.sync_ui()
+            # 呼叫用戶自訂的 resize callback（延後重排已通知過同一尺寸時不重複）
+            ui.notify_resize(sender, app_data)
         except Exception:
             pass
 
     def minimize_viewport(self, sender=None, app_data=None, user_data=None):
+        self._trace(InputTrace.MINIMIZE)
         try:
             # 先使用 Dear PyGui 的官方 API
             dpg.minimize_viewport()
         except Exception:
-            try:
-                hwnd = dpg.get_viewport_platform_handle()
-                user32 = ctypes.windll.user32
-                WM_SYSCOMMAND = 0x0112
-                SC_MINIMIZE = 0xF020
-                user32.SendMessageW(hwnd, WM_SYSCOMMAND, SC_MINIMIZE, 0)
-                if not user32.IsIconic(hwnd):
-                    user32.ShowWindow(hwnd, 6)  # SW_MINIMIZE
-            except Exception:
+            minimized = False
+            platform = self.ui_handle.platform
+            if platform.available:
+                try:
+                    minimized = platform.minimize_window(dpg.get_viewport_platform_handle())
+                except Exception:
+                    minimized = False
+            if not minimized:
                 try:
                     dpg.hide_viewport()
                 except Exception:
                     pass
 
     def toggle_maximize(self, sender=None, app_data=None, user_data=None):
+        self._trace(InputTrace.MAXIMIZE)
         ui = self.ui_handle
+        snap = ui.snapshot.ensure()
         if not ui.state["is_manual_max"]:
-            ui.state["pre_max_pos"] = dpg.get_viewport_pos()
-            ui.state["pre_max_size"] = [dpg.get_viewport_width(), dpg.get_viewport_height()]
-            area = ui.get_viewport_work_area()
-            dpg.configure_viewport(0, x_pos=area["x"], y_pos=area["y"], width=area["w"], height=area["h"], resizable=False)
+            ui.state["pre_max_pos"] = list(snap.viewport_pos)
+            ui.state["pre_max_size"] = snap.viewport_size
+            area = ui.get_maximize_work_area()
+            if area is None:
+                # 平台不提供工作區時交由 Dear PyGui 最大化
+                dpg.maximize_viewport()
+            else:
+                dpg.configure_viewport(0, x_pos=area["x"], y_pos=area["y"], width=area["w"], height=area["h"], resizable=False)
             dpg.set_item_label("max_btn", "❐")
             ui.state["is_manual_max"] = True
             ui._set_resize_bars_enabled(False)
@@ -278,6 +1947,7 @@ class UIEvent:
             dpg.set_item_label("max_btn", "口")
             ui.state["is_manual_max"] = False
             ui._set_resize_bars_enabled(True)
+        snap.refresh_viewport()
         ui.sync_ui()
         ui.clamp_viewport_to_work_area()
 
@@ -289,191 +1959,1364 @@ class UIEvent:
         ui.state["toggle_value"] = 1 - ui.state["toggle_value"]
         dpg.set_item_label("toggle_btn", str(ui.state["toggle_value"]))
 
+    def _start_resize(self, direction, m_real, v_pos, v_size):
+        """記錄縮放起點並進入縮放模式。"""
+        ui = self.ui_handle
+        ui.state["resizing"] = True
+        ui.state["resize_dir"] = direction
+        ui.state["click_offset"] = [m_real[0], m_real[1]]
+        ui.state["start_size"] = [v_size[0], v_size[1]]
+        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
+
     def on_title_press(self, sender, app_data, user_data):
+        self._trace(InputTrace.TITLE_PRESS)
+        ui = self.ui_handle
+        try:
+            if ui.state["is_manual_max"]:
+                return
+            snap = ui.snapshot.ensure()
+            m_real, v_pos, m_local = snap.mouse_screen, snap.viewport_pos, snap.mouse_local
+            if ui.panels.covers(*m_local):
+                return
+            v_w, v_h = snap.viewport_w, snap.viewport_h
+            # 標題列上只有左上角、頂邊與左邊會優先進入縮放
+            region = ui.classify_point(m_local[0], m_local[1], v_w, v_h)
+            if region in ("corner_top_left", "top", "left"):
+                self._start_resize(region, m_real, v_pos, [v_w, v_h])
+                return
+
+            # 以上都不符合，才進入拖曳移動
+            ui.state["dragging"] = True
+            ui.state["click_offset"] = [m_real[0] - v_pos[0], m_real[1] - v_pos[1]]
+        except Exception:
+            pass
+
+    def on_title_double_click(self, sender, app_data, user_data):
+        try:
+            self.toggle_maximize()
+        except Exception:
+            pass
+
+    def on_mouse_click(self, sender=None, app_data=None, user_data=None):
+        self._trace(InputTrace.MOUSE_CLICK)
+        ui = self.ui_handle
+        if ui.panels.on_mouse_click():
+            # 點在面板上：由面板處理，主視窗不進入縮放/拖曳
+            return
+        snap = ui.snapshot.ensure()
+        if not ui.state["is_manual_max"] and not ui.state["resizing"]:
+            m_real, v_pos, m_local = snap.mouse_screen, snap.viewport_pos, snap.mouse_local
+            v_w, v_h = snap.viewport_w, snap.viewport_h
+            # 直接座標判定（避免 hover 失效）：由命中區域表決定縮放方向
+            region = ui.classify_point(m_local[0], m_local[1], v_w, v_h)
+            if region in HitTester.RESIZE_REGIONS:
+                self._start_resize(region, m_real, v_pos, [v_w, v_h])
+
+    def on_mouse_release(self, sender=None, app_data=None, user_data=None):
+        self._trace(InputTrace.MOUSE_RELEASE)
+        ui = self.ui_handle
+        ui.state["dragging"] = False
+        ui.state["resizing"] = False
+        ui.state["resize_dir"] = None
+        # 放開滑鼠時才將視窗夾回工作區
+        try:
+            # outline：先套用目標矩形；outline / hybrid 延後的內容重排與 resize_callback 於此執行一次
+            ui.finish_deferred_resize()
+            ui.clamp_viewport_to_work_area()
+            ui.sync_ui()
+        except Exception:
+            pass
+
+    def on_resize_press(self, sender, app_data, user_data):
+        """直接由縮放邊/角的 item handler 進入縮放模式，避免 hover 判定失效。"""
         ui = self.ui_handle
+        if ui.recorder is not None and user_data in HitTester.RESIZE_REGIONS:
+            self._trace(InputTrace.RESIZE_PRESS, HitTester.RESIZE_REGIONS.index(user_data))
         try:
             if ui.state["is_manual_max"]:
                 return
-            m_real = ui.get_real_mouse_pos()
-            v_pos = dpg.get_viewport_pos()
-            m_local = ui.get_mouse_pos_viewport_local()
-            bar_w = ui.resize_overlay.bar_w
-            corner_sz = ui.resize_overlay.corner_size
-            title_h = ui.button_size[1]
-            # 先判定是否落在左上角的縮放優先區域（正方形：X、Y 都需 ≤ corner_size）
-            if m_local[0] <= corner_sz and m_local[1] <= corner_sz:
-                # 左上角（正方形區域）
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "corner_top_left"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [dpg.get_viewport_width(), dpg.get_viewport_height()]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
+            snap = ui.snapshot.ensure()
+            if ui.panels.covers(*snap.mouse_local):
                 return
-            if m_local[1] <= bar_w:
-                # 頂邊縮放
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "top"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [dpg.get_viewport_width(), dpg.get_viewport_height()]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
+            self._start_resize(str(user_data), snap.mouse_screen, snap.viewport_pos, snap.viewport_size)
+        except Exception:
+            pass
+
+
+class DebugHud:
+    """座標除錯 HUD：依設定頻率更新，只對文字有變動的行呼叫 set_value。"""
+    TAGS = (
+        "mouse_pos_text", "mouse_pos_content_text", "coord_screen_mouse", "coord_viewport_pos",
+        "coord_viewport_size", "coord_viewport_mouse_local", "coord_viewport_local_computed",
+        "coord_title_pos", "coord_work_area", "coord_top_bar", "coord_left_bar", "coord_right_bar",
+        "coord_bottom_bar",
+    )
+
+    def __init__(self, ui_handle, rate_hz=None):
+        self.ui_handle = ui_handle
+        self.rate_hz = rate_hz or CUSTOMWINDOW_DEBUG_HUD_RATE
+        self._texts = {}
+        self._next_update = 0.0
+        self.set_value_calls = 0
+        self.skipped_lines = 0
+
+    def build(self):
+        """在目前容器中建立 HUD 文字項目。"""
+        dpg.add_text("API Viewport Mouse: (0, 0)", tag="mouse_pos_text")
+        dpg.add_text("Adjusted Content Mouse: (0, 0)", tag="mouse_pos_content_text")
+        dpg.add_text("Real Screen Mouse: (0, 0)", tag="coord_screen_mouse")
+        dpg.add_text("Viewport Pos (Screen): (0, 0)", tag="coord_viewport_pos")
+        dpg.add_text("Viewport Size: (0, 0)", tag="coord_viewport_size")
+        dpg.add_text("Mouse Local (Viewport): (0, 0)", tag="coord_viewport_mouse_local")
+        dpg.add_text("Viewport Local (Computed): (0, 0)", tag="coord_viewport_local_computed")
+        dpg.add_text("Title Pos: (0, 0)", tag="coord_title_pos")
+        dpg.add_text("Work Area: x=0 y=0 w=0 h=0", tag="coord_work_area")
+        dpg.add_text("Top Bar Pos: (0, 0)", tag="coord_top_bar")
+        dpg.add_text("Left Bar Pos: (0, 0) size: (0, 0)", tag="coord_left_bar")
+        dpg.add_text("Right Bar Pos: (0, 0) size: (0, 0)", tag="coord_right_bar")
+        dpg.add_text("Bottom Bar Pos: (0, 0)", tag="coord_bottom_bar")
+
+        # 醒目綠字主題：用於顯示最重要的計算座標
+        self.ui_handle.themes.bind("coord_viewport_local_computed", "hud_highlight")
+
+    def _item_rect(self, tag):
+        try:
+            pos = dpg.get_item_pos(tag)
+            return int(pos[0]), int(pos[1]), dpg.get_item_width(tag), dpg.get_item_height(tag)
+        except Exception:
+            return 0, 0, 0, 0
+
+    def compose(self, snap):
+        """依快照組出每一行文字。"""
+        ui = self.ui_handle
+        m_api = dpg.get_mouse_pos(local=True)
+        raw_x, raw_y = int(m_api[0]), int(m_api[1])
+        # 標題列固定位於 bar_w（見 compute_layout）
+        title_pos_y = ui.resize_overlay.bar_w
+        content_y = max(0, raw_y - (title_pos_y + ui.button_size[1]))
+        m_real, v_pos = snap.mouse_screen, snap.viewport_pos
+        area = snap.work_area or {"x": 0, "y": 0, "w": 0, "h": 0}
+        t_x, t_y, _, _ = self._item_rect("title_table")
+        tb_x, tb_y, _, _ = self._item_rect("resize_top_bar")
+        lb_x, lb_y, lb_w, lb_h = self._item_rect("resize_left_bar")
+        rb_x, rb_y, rb_w, rb_h = self._item_rect("resize_right_bar")
+        bb_x, bb_y, _, _ = self._item_rect("resize_bottom_bar")
+        return (
+            f"API Viewport Mouse: ({raw_x}, {raw_y})",
+            f"Adjusted Content Mouse: ({raw_x}, {content_y})",
+            f"Real Screen Mouse: ({int(m_real[0])}, {int(m_real[1])})",
+            f"Viewport Pos (Screen): ({int(v_pos[0])}, {int(v_pos[1])})",
+            f"Viewport Size: ({snap.viewport_w}, {snap.viewport_h})",
+            f"Mouse Local (Viewport): ({raw_x}, {raw_y})",
+            f"Viewport Local (Computed): ({snap.mouse_local[0]}, {snap.mouse_local[1]})",
+            f"Title Pos: ({t_x}, {t_y})",
+            f"Work Area: x={area['x']} y={area['y']} w={area['w']} h={area['h']}",
+            f"Top Bar Pos: ({tb_x}, {tb_y})",
+            f"Left Bar Pos: ({lb_x}, {lb_y}) size: ({lb_w}, {lb_h})",
+            f"Right Bar Pos: ({rb_x}, {rb_y}) size: ({rb_w}, {rb_h})",
+            f"Bottom Bar Pos: ({bb_x}, {bb_y})",
+        )
+
+    def update(self, snap):
+        if snap.time < self._next_update:
+            return
+        self._next_update = snap.time + 1.0 / self.rate_hz
+        try:
+            for tag, text in zip(self.TAGS, self.compose(snap)):
+                if self._texts.get(tag) == text:
+                    self.skipped_lines += 1
+                    continue
+                dpg.set_value(tag, text)
+                self._texts[tag] = text
+                self.set_value_calls += 1
+        except Exception:
+            pass
+
+class UIDispatchQueue:
+    """執行緒安全的 UI 變更佇列：任何執行緒都可 post，主迴圈每幀在時間預算內套用。
+
+    對同一 item 的 set_value 只保留最新值；configure 依屬性合併（同屬性後寫覆蓋先寫）；
+    post(func) 的一般呼叫不合併，依序執行。max_pending 只限制可合併的 value/configure 項目，
+    一般呼叫（例如 worker 完成通知）一律排入，不會被丟棄。
+    """
+    def __init__(self, budget_ms=None, max_pending=None, on_post=None, on_text=None):
+        self.budget_s = (CUSTOMWINDOW_DISPATCH_BUDGET_MS if budget_ms is None else budget_ms) / 1000.0
+        self.max_pending = max_pending or CUSTOMWINDOW_DISPATCH_MAX_PENDING
+        self.on_post = on_post
+        # 字串值/標籤的觀察者（字元子集模式用來延遲補字），於 post 的執行緒呼叫
+        self.on_text = on_text
+        self._lock = threading.Lock()
+        self._pending = {}     # key -> (kind, tag, payload)；dict 保持插入順序
+        self._seq = 0
+        self.posted = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.budget_hits = 0   # 因時間預算中止、剩餘項目留到下一幀的次數
+        self.errors = 0
+        self.max_depth = 0
+        self.last_drain_ms = 0.0
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def _put(self, key, kind, tag, payload):
+        with self._lock:
+            self.posted += 1
+            entry = self._pending.get(key)
+            if entry is not None:
+                self.coalesced += 1
+                if kind == "configure":
+                    entry[2].update(payload)
+                else:
+                    self._pending[key] = (kind, tag, payload)
+            elif kind != "call" and len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            else:
+                self._pending[key] = (kind, tag, dict(payload) if kind == "configure" else payload)
+                if len(self._pending) > self.max_depth:
+                    self.max_depth = len(self._pending)
+        if self.on_post is not None:
+            self.on_post()
+        return True
+
+    def post_value(self, tag, value):
+        """排入 dpg.set_value(tag, value)。"""
+        if self.on_text is not None and isinstance(value, str):
+            self.on_text(value)
+        return self._put(("value", tag), "value", tag, value)
+
+    def post_configure(self, tag, **props):
+        """排入 dpg.configure_item(tag, **props)。"""
+        if self.on_text is not None and "label" in props:
+            self.on_text(props["label"])
+        return self._put(("configure", tag), "configure", tag, props)
+
+    def post(self, func, *args, **kwargs):
+        """排入一般呼叫（不合併、不受 max_pending 限制），於主迴圈執行緒依序執行。"""
+        with self._lock:
+            self._seq += 1
+            key = ("call", self._seq)
+        return self._put(key, "call", func, (args, kwargs))
+
+    def drain(self, budget_s=None):
+        """套用佇列項目直到清空或超出時間預算；回傳套用數量。"""
+        if not self._pending:
+            return 0
+        budget = self.budget_s if budget_s is None else budget_s
+        t0 = time.perf_counter()
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        items = iter(list(batch.items()))
+        done = 0
+        for key, (kind, tag, payload) in items:
+            try:
+                if kind == "value":
+                    dpg.set_value(tag, payload)
+                elif kind == "configure":
+                    dpg.configure_item(tag, **payload)
+                else:
+                    tag(*payload[0], **payload[1])
+            except Exception:
+                self.errors += 1
+            done += 1
+            del batch[key]
+            if budget > 0 and time.perf_counter() - t0 >= budget:
+                break
+        if batch:
+            # 超出預算：剩餘項目放回佇列前端；期間新 post 的值較新，合併時優先
+            self.budget_hits += 1
+            with self._lock:
+                newer, self._pending = self._pending, batch
+                for key, (kind, tag, payload) in newer.items():
+                    entry = batch.get(key)
+                    if entry is not None and kind == "configure":
+                        entry[2].update(payload)
+                    else:
+                        batch[key] = (kind, tag, payload)
+        self.applied += done
+        self.last_drain_ms = (time.perf_counter() - t0) * 1000.0
+        return done
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+
+    def get_stats(self):
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "posted": self.posted,
+            "applied": self.applied,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "budget_hits": self.budget_hits,
+            "errors": self.errors,
+            "last_drain_ms": self.last_drain_ms,
+        }
+
+
+class FramePacer:
+    """幀節奏控制：FPS 上限（sleep 後短暫自旋的精準等待）、閒置降頻，以及延遲/掉幀統計。
+
+    閒置時仍以低頻率繪製（Dear PyGui 只在繪製時處理視窗訊息與輸入事件），
+    等待期間可被 request_frame()（任何執行緒）或 wake_check() 立即喚醒。
+    """
+    SPIN_S = 0.002        # 最後 2ms 以自旋等待，避免 sleep 的排程誤差
+    POLL_S = 1.0 / 60     # 閒置等待中檢查 wake_check 的間隔
+
+    def __init__(self, fps_cap=None, idle_mode=None, idle_fps=None, idle_after=None):
+        self.fps_cap = CUSTOMWINDOW_FPS_CAP if fps_cap is None else fps_cap
+        self.idle_mode = CUSTOMWINDOW_IDLE_MODE if idle_mode is None else idle_mode
+        self.idle_fps = idle_fps or CUSTOMWINDOW_IDLE_FPS
+        self.idle_after = CUSTOMWINDOW_IDLE_AFTER if idle_after is None else idle_after
+        self.wake_check = None
+        self.idle = False
+        self.frames = 0
+        self.idle_frames = 0
+        self.late_frames = 0      # 超過本幀期限才完成
+        self.dropped_frames = 0   # 超過期限一整個週期以上所錯過的幀數
+        self.wakeups = 0
+        self.fps = 0.0
+        self._wake = threading.Event()
+        self._deadline = None
+        self._last_active = time.perf_counter()
+        self._last_frame = None
+        self._avg_dt = None
+        # vsync 下的事件迴圈時間片（UIHandle.run）：估計的垂直同步週期與 render 保留量
+        self.render_reserve_min = CUSTOMWINDOW_ASYNC_RENDER_RESERVE_MS / 1000.0
+        self.render_reserve = self.render_reserve_min
+        self.vsync_period = None
+        self.vsync_slices = 0
+        self.vsync_misses = 0
+        self._vsync_window = None
+        self._vsync_count = 0
+
+    def request_frame(self, sender=None, app_data=None, user_data=None):
+        """要求立即回到全速（可直接作為 Dear PyGui callback，或由其他執行緒呼叫）。"""
+        self._wake.set()
+
+    def period(self):
+        if self.idle:
+            return 1.0 / self.idle_fps
+        return 1.0 / self.fps_cap if self.fps_cap > 0 else 0.0
+
+    def pace(self, active):
+        """於每幀 render 之前呼叫：更新閒置狀態並等待到本幀期限。"""
+        deadline = self._schedule(active)
+        if deadline is not None:
+            self._finish(self._sleep_until(deadline, self.idle))
+
+    async def pace_async(self, active, slice_until=None):
+        """pace() 的 asyncio 版本：等待期間讓出事件迴圈給其他 task。
+
+        slice_until：無 FPS 上限時（vsync 由 render 等待）讓出事件迴圈直到此時間，而不是只讓出一次。
+        """
+        import asyncio
+        deadline = self._schedule(active)
+        if deadline is None:
+            if slice_until is not None and slice_until > time.perf_counter():
+                self.vsync_slices += 1
+                await self._sleep_until_async(slice_until, False)
+            else:
+                await asyncio.sleep(0)
+            return
+        self._finish(await self._sleep_until_async(deadline, self.idle))
+
+    def vsync_slice_end(self, frame_start, budget):
+        """vsync 下本幀讓給事件迴圈的時間片結束時間：上次 render 返回後一個週期（不超過 budget）減去 render 保留量。"""
+        if self.vsync_period is None or self.period() > 0.0:
+            return None
+        return frame_start + min(budget, self.vsync_period) - self.render_reserve
+
+    def vsync_frame_done(self, interval):
+        """vsync 下每次 render 返回後呼叫（interval 為相鄰兩次返回的間隔）。
+
+        週期取最近兩個 120 幀視窗內的最小間隔；間隔超過 1.5 週期即錯過 vsync，加大 render 保留量，否則慢慢縮回下限。
+        """
+        window = self._vsync_window
+        self._vsync_window = interval if window is None else min(window, interval)
+        self._vsync_count += 1
+        if self.vsync_period is None or interval < self.vsync_period:
+            self.vsync_period = interval
+        elif self._vsync_count >= 120:
+            self.vsync_period = self._vsync_window
+        if self._vsync_count >= 120:
+            self._vsync_window, self._vsync_count = None, 0
+        if interval > 1.5 * self.vsync_period:
+            self.vsync_misses += 1
+            self.render_reserve = min(self.vsync_period, self.render_reserve * 1.5 + 0.0005)
+        else:
+            self.render_reserve = max(self.render_reserve_min, self.render_reserve * 0.99)
+
+    def _schedule(self, active):
+        """更新閒置狀態與統計；需要等待時回傳本幀期限，否則回傳 None。"""
+        now = time.perf_counter()
+        if self._wake.is_set():
+            self._wake.clear()
+            active = True
+        if active:
+            self._last_active = now
+        was_idle = self.idle
+        self.idle = bool(self.idle_mode) and now - self._last_active >= self.idle_after
+        self.frames += 1
+        if self.idle:
+            self.idle_frames += 1
+        period = self.period()
+        if period <= 0.0 or was_idle != self.idle or self._deadline is None:
+            # 無上限或模式切換：以目前時間重新定錨
+            self._deadline = now + period if period > 0.0 else None
+            self._mark_frame(now)
+            return None
+        if now > self._deadline:
+            if not was_idle:
+                self.late_frames += 1
+                self.dropped_frames += int((now - self._deadline) / period)
+            self._deadline = now + period
+            self._mark_frame(now)
+            return None
+        return self._deadline
+
+    def _finish(self, woken):
+        if woken:
+            # 閒置等待中被喚醒：立即繪製並回到全速
+            self.wakeups += 1
+            self.idle = False
+            self._last_active = time.perf_counter()
+            self._deadline = None
+        else:
+            self._deadline += self.period()
+        self._mark_frame(time.perf_counter())
+
+    def _mark_frame(self, now):
+        # 以相鄰兩幀的開始時間估算實際 FPS（幀間隔的指數平滑）
+        if self._last_frame is not None:
+            dt = now - self._last_frame
+            self._avg_dt = dt if self._avg_dt is None else self._avg_dt * 0.9 + dt * 0.1
+            if self._avg_dt > 0:
+                self.fps = 1.0 / self._avg_dt
+        self._last_frame = now
+
+    def _sleep_until(self, deadline, interruptible):
+        """等待至 deadline；可中斷模式下被喚醒時回傳 True。"""
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            if interruptible:
+                if self._wake.wait(min(remaining, self.POLL_S)):
+                    return True
+                try:
+                    if self.wake_check is not None and self.wake_check():
+                        return True
+                except Exception:
+                    pass
+            elif remaining > self.SPIN_S:
+                time.sleep(remaining - self.SPIN_S)
+
+    async def _sleep_until_async(self, deadline, interruptible):
+        import asyncio
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            if interruptible:
+                if self._wake.is_set():
+                    return True
+                try:
+                    if self.wake_check is not None and self.wake_check():
+                        return True
+                except Exception:
+                    pass
+                await asyncio.sleep(min(remaining, self.POLL_S))
+            elif remaining > self.SPIN_S:
+                await asyncio.sleep(remaining - self.SPIN_S)
+            else:
+                # 最後一小段自旋，不讓事件迴圈的計時誤差延遲繪製
+                while time.perf_counter() < deadline:
+                    pass
+                return False
+
+    def get_stats(self):
+        return {
+            "frames": self.frames,
+            "idle_frames": self.idle_frames,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "wakeups": self.wakeups,
+            "idle": self.idle,
+            "fps": self.fps,
+            "vsync_slices": self.vsync_slices,
+            "vsync_misses": self.vsync_misses,
+            "render_reserve_ms": self.render_reserve * 1000.0,
+        }
+
+
+class FrameProfiler:
+    """幀階段分析器：每個階段一個固定大小的 array 環形緩衝（毫秒），記錄時不配置新物件。
+
+    "frame" 為整幀工作時間，不含 FramePacer 的等待；等待時間另記於 "pace"。
+    """
+    PHASES = ("snapshot", "dispatch", "drag_resize", "cursor", "hover", "debug_hud", "user_update", "commit", "render")
+    SERIES = PHASES + ("pace", "frame")
+
+    def __init__(self, capacity=None, export_path=None):
+        self.capacity = capacity or CUSTOMWINDOW_PROFILE_FRAMES
+        self.export_path = export_path
+        self._buffers = {name: array("d", bytes(8 * self.capacity)) for name in self.SERIES}
+        self._slot = 0
+        self.frames = 0
+        self._frame_start = None
+        self._next_plot = 0.0
+        self.window_tag = None
+
+    def record(self, phase, seconds):
+        self._buffers[phase][self._slot] = seconds * 1000.0
+
+    def end_frame(self, now):
+        """結束一幀：記錄整幀工作時間（扣除 pace 等待）並前進到下一格（清除下一格的舊值）。"""
+        if self._frame_start is not None:
+            slot = self._slot
+            self._buffers["frame"][slot] = (now - self._frame_start) * 1000.0 - self._buffers["pace"][slot]
+        self._frame_start = now
+        self.frames += 1
+        self._slot = (self._slot + 1) % self.capacity
+        for buf in self._buffers.values():
+            buf[self._slot] = 0.0
+        if self.window_tag is not None and now >= self._next_plot:
+            self._next_plot = now + 0.25
+            self._update_plot()
+
+    def series(self, phase):
+        """由舊到新的樣本（不含目前進行中的一格）。"""
+        buf = self._buffers[phase]
+        count = min(self.frames, self.capacity - 1)
+        start = (self._slot - count) % self.capacity
+        if start + count <= self.capacity:
+            return buf[start:start + count].tolist()
+        return buf[start:].tolist() + buf[:start + count - self.capacity].tolist()
+
+    @staticmethod
+    def _percentile(ordered, q):
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def summary(self):
+        """各階段的 p50/p95/p99/mean/max（毫秒）。"""
+        result = {}
+        for phase in self.SERIES:
+            ordered = sorted(self.series(phase))
+            result[phase] = {
+                "p50": self._percentile(ordered, 0.50),
+                "p95": self._percentile(ordered, 0.95),
+                "p99": self._percentile(ordered, 0.99),
+                "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+                "max": ordered[-1] if ordered else 0.0,
+            }
+        return result
+
+    def export(self, path=None):
+        """依副檔名輸出 JSON（摘要 + 樣本）或 CSV（每幀一列）。"""
+        path = path or self.export_path
+        if not path:
+            return None
+        names = self.SERIES
+        if path.lower().endswith(".csv"):
+            columns = [self.series(name) for name in names]
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(("index",) + names)
+                for i, row in enumerate(zip(*columns)):
+                    writer.writerow((i,) + row)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"frames": self.frames, "unit": "ms", "summary": self.summary(),
+                           "samples": {name: self.series(name) for name in names}}, f)
+        return path
+
+    def build_window(self, tag="profiler_window"):
+        """建立（預設隱藏的）即時圖表視窗。"""
+        with dpg.window(label="Frame Profiler (F9)", tag=tag, show=False, width=520, height=320, pos=(40, 60)):
+            with dpg.plot(height=-1, width=-1):
+                dpg.add_plot_legend()
+                dpg.add_plot_axis(dpg.mvXAxis, label="frame", tag=f"{tag}_x")
+                with dpg.plot_axis(dpg.mvYAxis, label="ms", tag=f"{tag}_y"):
+                    for phase in self.PHASES:
+                        dpg.add_line_series([], [], label=phase, tag=f"{tag}_{phase}")
+        self.window_tag = tag
+
+    def toggle_window(self, sender=None, app_data=None, user_data=None):
+        if self.window_tag is not None and dpg.does_item_exist(self.window_tag):
+            dpg.configure_item(self.window_tag, show=not dpg.is_item_shown(self.window_tag))
+
+    def _update_plot(self):
+        try:
+            if not dpg.is_item_shown(self.window_tag):
                 return
-            if m_local[0] <= bar_w:
-                # 左邊縮放
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "left"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [dpg.get_viewport_width(), dpg.get_viewport_height()]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
+            xs = None
+            for phase in self.PHASES:
+                ys = self.series(phase)
+                if xs is None:
+                    xs = list(range(len(ys)))
+                dpg.set_value(f"{self.window_tag}_{phase}", [xs, ys])
+            dpg.fit_axis_data(f"{self.window_tag}_x")
+            dpg.fit_axis_data(f"{self.window_tag}_y")
+        except Exception:
+            pass
+
+class StartupProfiler:
+    """啟動階段計時：記錄 UIHandle 建構、initialize_gui 各步驟與首幀的牆鐘時間，以及模組匯入成本。
+
+    以 `with profiler.phase("name"):` 包住各步驟；巢狀階段以深度縮排顯示。
+    """
+    def __init__(self, print_report=False, export_path=None):
+        self.print_report = print_report
+        self.export_path = export_path
+        self.t0 = time.perf_counter()
+        self.entries = []      # [name, ms, depth]
+        self._stack = []
+        self.done = False
+
+    def phase(self, name):
+        self._stack.append((name, time.perf_counter(), len(self.entries)))
+        # 先佔位，讓巢狀階段排在父階段之後
+        self.entries.append([name, 0.0, len(self._stack) - 1])
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        name, start, index = self._stack.pop()
+        self.entries[index][1] = (time.perf_counter() - start) * 1000.0
+        return False
+
+    @property
+    def depth(self):
+        """目前開啟中的巢狀階段數。"""
+        return len(self._stack)
+
+    def record(self, name, ms, depth=None):
+        """加入一筆已量測的階段；depth 省略時為目前的巢狀深度。"""
+        self.entries.append([name, ms, self.depth if depth is None else depth])
+
+    @staticmethod
+    def import_cost():
+        """CustomWindow 模組匯入耗時（ms），含其中 dearpygui 的匯入。"""
+        return {"CustomWindow": _IMPORT_MS, "dearpygui": _DPG_IMPORT_MS}
+
+    def report(self):
+        return {
+            "unit": "ms",
+            "import": self.import_cost(),
+            "phases": [{"name": name, "ms": ms, "depth": depth} for name, ms, depth in self.entries],
+            "since_construct_ms": (time.perf_counter() - self.t0) * 1000.0,
+        }
+
+    def format(self):
+        imports = self.import_cost()
+        lines = [f"import CustomWindow {imports['CustomWindow']:9.2f} ms (dearpygui {imports['dearpygui']:.2f} ms)"]
+        for name, ms, depth in self.entries:
+            lines.append(f"{'  ' * depth}{name:{30 - 2 * depth}s} {ms:9.2f} ms")
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        """依副檔名輸出 JSON 或 CSV（每階段一列）。"""
+        path = path or self.export_path
+        if not path:
+            return None
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(("phase", "ms", "depth"))
+                for name, ms in self.import_cost().items():
+                    writer.writerow((f"import.{name}", round(ms, 3), 0))
+                for name, ms, depth in self.entries:
+                    writer.writerow((name, round(ms, 3), depth))
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=1)
+        return path
+
+    def finish(self):
+        """首幀完成後呼叫一次：依設定列印/輸出報告。"""
+        if self.done:
+            return
+        self.done = True
+        if self.print_report:
+            print(self.format())
+        if self.export_path:
+            try:
+                self.export()
+            except Exception:
+                pass
+
+
+class InputTrace:
+    """輸入軌跡檔格式：檔頭 + 固定長度紀錄（種類、相對時間、四個整數參數）。"""
+    MAGIC = b"CWTR"
+    VERSION = 1
+    HEADER = struct.Struct("<4sH")
+    RECORD = struct.Struct("<Bdiiii")
+
+    # 紀錄種類
+    FRAME = 0          # 一幀開始（handler）
+    SAMPLE = 1         # 游標螢幕座標 a=x b=y
+    VIEWPORT = 2       # 幀開始時的 viewport a=x b=y c=w d=h
+    WORK_AREA = 3      # 工作區 a=x b=y c=w d=h
+    MOUSE_CLICK = 4    # UIEvent.on_mouse_click
+    MOUSE_RELEASE = 5  # UIEvent.on_mouse_release
+    TITLE_PRESS = 6    # UIEvent.on_title_press
+    RESIZE_PRESS = 7   # UIEvent.on_resize_press a=HitTester.RESIZE_REGIONS 索引
+    MAXIMIZE = 8       # UIEvent.toggle_maximize
+    MINIMIZE = 9       # UIEvent.minimize_viewport
+
+    @classmethod
+    def read(cls, path):
+        """讀取軌跡檔，回傳 (kind, t, a, b, c, d) 串列。"""
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version = cls.HEADER.unpack_from(data, 0)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"not a CustomWindow trace (v{cls.VERSION}): {path}")
+        return list(cls.RECORD.iter_unpack(data[cls.HEADER.size:]))
+
+    @classmethod
+    def write(cls, path, records):
+        """將紀錄串列一次寫入軌跡檔。"""
+        with open(path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION))
+            f.write(b"".join(cls.RECORD.pack(*rec) for rec in records))
+
+
+class InputRecorder:
+    """錄製輸入軌跡：每幀記錄游標（有移動時）與 viewport/工作區（有變動時），事件由 UIEvent 通報。"""
+    FLUSH_BYTES = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self._buf = bytearray(InputTrace.HEADER.pack(InputTrace.MAGIC, InputTrace.VERSION))
+        self._file = open(path, "wb")
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._last_sample = None
+        self._last_viewport = None
+        self._last_area = None
+
+    def _append(self, kind, a=0, b=0, c=0, d=0):
+        # callback 執行緒與主迴圈都會寫入
+        with self._lock:
+            self._buf += InputTrace.RECORD.pack(kind, time.perf_counter() - self._t0, a, b, c, d)
+            self.records += 1
+            if len(self._buf) >= self.FLUSH_BYTES and self._file is not None:
+                self._file.write(self._buf)
+                self._buf.clear()
+
+    def frame(self, snap):
+        """於 snapshot.capture() 之後呼叫。"""
+        m = snap.mouse_screen
+        sample = (int(m[0]), int(m[1]))
+        if sample != self._last_sample:
+            self._last_sample = sample
+            self._append(InputTrace.SAMPLE, sample[0], sample[1])
+        rect = [int(v) for v in snap.viewport_rect]
+        if rect != self._last_viewport:
+            self._last_viewport = rect
+            self._append(InputTrace.VIEWPORT, *rect)
+        area = snap.work_area
+        if area is not None and area != self._last_area:
+            self._last_area = dict(area)
+            self._append(InputTrace.WORK_AREA, area["x"], area["y"], area["w"], area["h"])
+        self._append(InputTrace.FRAME)
+
+    def event(self, kind, a=0):
+        self._append(kind, a)
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
                 return
+            self._file.write(self._buf)
+            self._buf.clear()
+            self._file.close()
+            self._file = None
+
+
+class TraceReplayer:
+    """以真實的 handler 無頭重播軌跡：游標由 FakeBackend 提供，事件直接呼叫 UIEvent。"""
+
+    def __init__(self, ui_handle, backend=None):
+        self.ui_handle = ui_handle
+        self.backend = backend
+
+    @staticmethod
+    def monitor_source(records):
+        """由軌跡中的工作區紀錄建立 FakeMonitorSource（每個工作區視為一個螢幕）。"""
+        areas = []
+        for kind, _t, a, b, c, d in records:
+            if kind == InputTrace.WORK_AREA:
+                area = {"x": a, "y": b, "w": c, "h": d}
+                if area not in areas:
+                    areas.append(area)
+        return FakeMonitorSource([(area, area) for area in areas]) if areas else None
+
+    def run(self, records):
+        """重播並回傳統計：耗時、最終幾何、viewport 更新序列與和錄製值不一致的幀數。"""
+        ui = self.ui_handle
+        backend = self.backend or FakeBackend(monitors=self.monitor_source(records))
+        ui.set_platform_backend(backend)
+        ev = ui.ui_event
+        events = {
+            InputTrace.MOUSE_CLICK: lambda a: ev.on_mouse_click(),
+            InputTrace.MOUSE_RELEASE: lambda a: ev.on_mouse_release(),
+            InputTrace.TITLE_PRESS: lambda a: ev.on_title_press(None, None, None),
+            InputTrace.RESIZE_PRESS: lambda a: ev.on_resize_press(None, None, HitTester.RESIZE_REGIONS[a]),
+            InputTrace.MAXIMIZE: lambda a: ev.toggle_maximize(),
+            InputTrace.MINIMIZE: lambda a: ev.minimize_viewport(),
+        }
+
+        def current():
+            cfg = dpg.get_viewport_configuration(0)
+            return (cfg["x_pos"], cfg["y_pos"], cfg["width"], cfg["height"])
+
+        frames = event_count = mismatches = 0
+        expected = None
+        updates = []
+        last = None
+        t0 = time.perf_counter()
+        for kind, _t, a, b, c, d in records:
+            if kind == InputTrace.SAMPLE:
+                backend.cursor_pos = [a, b]
+                continue
+            if kind == InputTrace.VIEWPORT:
+                expected = (a, b, c, d)
+                if last is None:
+                    # 第一筆：重播起點與錄製時相同
+                    dpg.configure_viewport(0, x_pos=a, y_pos=b, width=c, height=d)
+                    ui.snapshot.refresh_viewport()
+                    last = expected
+                continue
+            if kind == InputTrace.FRAME:
+                if expected is not None and last != expected:
+                    mismatches += 1
+                ui.handler()
+                frames += 1
+            elif kind in events:
+                events[kind](a)
+                event_count += 1
+            else:
+                continue
+            rect = current()
+            if rect != last:
+                last = rect
+                updates.append((frames,) + rect)
+        elapsed = time.perf_counter() - t0
+        return {
+            "records": len(records),
+            "frames": frames,
+            "events": event_count,
+            "elapsed_s": elapsed,
+            "recorded_s": records[-1][1] if records else 0.0,
+            "final_geometry": list(last) if last else None,
+            "viewport_updates": [list(u) for u in updates],
+            "mismatches": mismatches,
+        }
+
+
+class SpatialGrid:
+    """均勻網格空間索引：矩形登記到其覆蓋的格子，點查詢只檢查該點所在格子的候選。
+
+    面板數量增加時查詢成本只與重疊在同一格的面板數有關（而非總數）。
+    """
+    def __init__(self, cell=128):
+        self.cell = cell
+        self.cells = {}     # (cx, cy) -> set(key)
+        self.rects = {}     # key -> (rect, cells)
+
+    def _cells_of(self, rect):
+        x, y, w, h = rect
+        c = self.cell
+        return [(cx, cy) for cy in range(int(y) // c, int(y + max(1, h) - 1) // c + 1)
+                for cx in range(int(x) // c, int(x + max(1, w) - 1) // c + 1)]
+
+    def update(self, key, rect):
+        """登記或更新 key 的矩形 [x, y, w, h]。"""
+        old = self.rects.get(key)
+        rect = tuple(rect)
+        if old is not None and old[0] == rect:
+            return
+        cells = self._cells_of(rect)
+        if old is not None and old[1] == cells:
+            self.rects[key] = (rect, cells)
+            return
+        self.remove(key)
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+        self.rects[key] = (rect, cells)
+
+    def remove(self, key):
+        old = self.rects.pop(key, None)
+        if old is None:
+            return
+        for cell in old[1]:
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+
+    def query(self, x, y):
+        """回傳包含點 (x, y) 的所有 key。"""
+        bucket = self.cells.get((int(x) // self.cell, int(y) // self.cell))
+        if not bucket:
+            return []
+        hits = []
+        for key in bucket:
+            rx, ry, rw, rh = self.rects[key][0]
+            if rx <= x < rx + rw and ry <= y < ry + rh:
+                hits.append(key)
+        return hits
+
+
+class Panel:
+    """PanelManager 建立的浮動面板：命名空間化的標題列（CustomWindowBar）+ 內容子視窗。"""
+    def __init__(self, manager, name, title, rect):
+        self.manager = manager
+        self.name = name
+        self.title = title
+        self.prefix = f"panel.{name}."
+        self.window = self.prefix + "window"
+        self.content = self.prefix + "content"
+        self.rect = [int(v) for v in rect]
+        self.bar = CustomWindowBar(self.prefix)
+        # 每個面板一張區域表（與主視窗相同的命中判定），尺寸改變時才重建
+        self.hit = HitTester()
+        # 收合與最大化互斥：restore_height 為收合前高度，restore_rect 為最大化前矩形
+        self.minimized = False
+        self.maximized = False
+        self.restore_height = None
+        self.restore_rect = None
+        self.z = 0
+
+    def tag(self, name):
+        return self.prefix + name
+
+    def local(self, x, y):
+        return x - self.rect[0], y - self.rect[1]
+
+
+class PanelManager:
+    """同一 viewport 內的多面板視窗管理：每個面板有與主視窗相同的標題列與縮放判定（tag 以 panel.<name>. 命名空間化）。
+
+    主題與貼圖所有面板共用；z-order 以遞增序號維護（點擊即置頂）；點擊以 SpatialGrid 找出最上層面板，
+    再由該面板的 HitTester 分類區域，不需要逐一查詢各面板縮放項目的 hover。
+    拖曳/縮放於 UIHandle 的 drag_resize 階段更新，幾何經由 ui.geometry 送出。
+    """
+    def __init__(self, ui, cell=128):
+        self.ui = ui
+        self.panels = {}
+        self.grid = SpatialGrid(cell)
+        self.active = None          # 進行中的拖曳/縮放：{"panel", "mode", "dir", "start_mouse", "start_rect"}
+        self._z = 0
+        self._handlers = None
+
+    def __len__(self):
+        return len(self.panels)
+
+    def __getitem__(self, name):
+        return self.panels[name]
+
+    # ------------------------------------------------------------ 建立 / 關閉
+    def _ensure_shared(self):
+        if self._handlers is not None:
+            return
+        # 全部面板共用一組全域滑鼠 handler，依空間索引路由；單擊由 UIEvent.on_mouse_click 先交給面板，
+        # 面板消耗時主視窗不再判定縮放/拖曳
+        with dpg.handler_registry() as handlers:
+            dpg.add_mouse_double_click_handler(button=0, callback=self.on_double_click)
+            dpg.add_mouse_release_handler(button=0, callback=self.on_mouse_release)
+        self._handlers = handlers
+
+    def create(self, name, title="", rect=(60, 80, 320, 240), build=None):
+        """建立面板；build(panel) 於內容子視窗中呼叫以建立使用者內容。"""
+        if name in self.panels:
+            raise ValueError(f"panel {name!r} already exists")
+        ui = self.ui
+        self._ensure_shared()
+        panel = Panel(self, name, title or name, rect)
+        x, y, w, h = panel.rect
+        with dpg.window(tag=panel.window, no_title_bar=True, no_move=True, no_resize=True, no_collapse=True,
+                        no_scrollbar=True, no_scroll_with_mouse=True, pos=(x, y), width=w, height=h):
+            panel.bar.build(ui, parent_tag=panel.window, title=panel.title, callbacks={
+                "minimize": lambda *a: self.toggle_minimize(name),
+                "maximize": lambda *a: self.toggle_maximize(name),
+                "close": lambda *a: self.close(name),
+                # 標題列拖曳/雙擊由全域 handler 經空間索引路由
+                "title_press": None,
+                "title_double_click": None,
+            })
+            with dpg.child_window(tag=panel.content, border=False, no_scrollbar=False):
+                if build is not None:
+                    build(panel)
+        # 主題由 ui.themes 依角色共用（所有面板同一組 theme）
+        ui.themes.bind(panel.window, "panel_window")
+        self.panels[name] = panel
+        self.raise_panel(name)
+        self._apply(panel)
+        return panel
+
+    def close(self, name):
+        panel = self.panels.pop(name, None)
+        if panel is None:
+            return
+        self.grid.remove(name)
+        if self.active is not None and self.active["panel"] is panel:
+            self.active = None
+        for tag in [panel.bar.tag(n) for n in CustomWindowBar.HOVER_SPRITES]:
+            self.ui.hover.items.pop(tag, None)
+            self.ui.hover.hovered.pop(tag, None)
+            if dpg.does_item_exist(tag + "_hover_handlers"):
+                dpg.delete_item(tag + "_hover_handlers")
+        for tag in (panel.window, panel.bar.tag("title_bar_handlers")):
+            if dpg.does_item_exist(tag):
+                dpg.delete_item(tag)
+        self.ui.geometry.forget_prefix(panel.prefix)
+        self.ui.themes.forget_prefix(panel.prefix)
+
+    def swap_placeholders(self):
+        for panel in self.panels.values():
+            if panel.bar.placeholders:
+                panel.bar.swap_placeholders(self.ui)
+
+    # ------------------------------------------------------------ z-order / 查詢
+    def raise_panel(self, name):
+        """置頂面板（z 序號遞增）。"""
+        panel = self.panels[name]
+        if panel.z == self._z and self._z:
+            return
+        self._z += 1
+        panel.z = self._z
+        try:
+            dpg.focus_item(panel.window)
+        except Exception:
+            pass
+
+    def z_order(self):
+        """由下到上的面板名稱。"""
+        return [p.name for p in sorted(self.panels.values(), key=lambda p: p.z)]
+
+    def panel_at(self, x, y):
+        """viewport 本地座標下最上層的面板（無則 None）。"""
+        best = None
+        for name in self.grid.query(x, y):
+            panel = self.panels[name]
+            if best is None or panel.z > best.z:
+                best = panel
+        return best
+
+    def _hit(self, panel):
+        ui = self.ui
+        bar_w = ui.resize_overlay.bar_w
+        panel.hit.update(panel.rect[2], panel.rect[3], bar_w, ui.resize_overlay.corner_size, ui.button_size, bar_w)
+        return panel.hit
+
+    def region_at(self, x, y):
+        """回傳 (panel, 區域名稱)；區域名稱同 HitTester。"""
+        panel = self.panel_at(x, y)
+        if panel is None:
+            return None, None
+        lx, ly = panel.local(x, y)
+        return panel, self._hit(panel).classify(lx, ly)
+
+    def cursor_key_at(self, x, y):
+        """面板縮放邊緣的游標形狀鍵（不在面板上為 None）。"""
+        if self.active is not None and self.active["mode"] == "resize":
+            return CursorManager.RESIZE_CURSORS.get(self.active["dir"], "std")
+        panel = self.panel_at(x, y)
+        if panel is None or panel.minimized or panel.maximized:
+            return None
+        lx, ly = panel.local(x, y)
+        return self._hit(panel).cursor_key(lx, ly)
+
+    def covers(self, x, y):
+        """viewport 本地座標 (x, y) 是否落在任一面板上。"""
+        return self.panel_at(x, y) is not None
+
+    # ------------------------------------------------------------ 事件
+    def on_mouse_click(self, sender=None, app_data=None, user_data=None):
+        """由 UIEvent.on_mouse_click 呼叫；點在面板上時回傳 True（此點擊由面板消耗）。"""
+        ui = self.ui
+        if ui.state["dragging"] or ui.state["resizing"]:
+            return False
+        snap = ui.snapshot.ensure()
+        x, y = snap.mouse_local
+        panel, region = self.region_at(x, y)
+        if panel is None:
+            return False
+        self.raise_panel(panel.name)
+        mode = None
+        if region in HitTester.RESIZE_REGIONS and not (panel.minimized or panel.maximized):
+            mode = "resize"
+        elif region in ("title", "icon") and not panel.maximized:
+            mode = "drag"
+        if mode is not None:
+            self.active = {"panel": panel, "mode": mode, "dir": region,
+                           "start_mouse": (x, y), "start_rect": list(panel.rect)}
+        return True
+
+    def on_double_click(self, sender=None, app_data=None, user_data=None):
+        snap = self.ui.snapshot.ensure()
+        panel, region = self.region_at(*snap.mouse_local)
+        if panel is not None and region in ("title", "icon"):
+            self.active = None
+            self.toggle_maximize(panel.name)
+
+    def on_mouse_release(self, sender=None, app_data=None, user_data=None):
+        self.active = None
+
+    def update(self, snap):
+        """拖曳/縮放中的面板依本幀滑鼠位置更新（由 UIHandle 的 drag_resize 階段呼叫）。"""
+        active = self.active
+        panel = active["panel"]
+        sx, sy = active["start_mouse"]
+        dx, dy = snap.mouse_local[0] - sx, snap.mouse_local[1] - sy
+        start = active["start_rect"]
+        if active["mode"] == "drag":
+            target = [start[0] + int(dx), start[1] + int(dy), start[2], start[3]]
+        else:
+            ui = self.ui
+            min_w = ui.button_size[0] * 5 + 2 * ui.resize_overlay.bar_w
+            min_h = ui.button_size[1] + 3 * ui.resize_overlay.bar_w
+            target = compute_resize_rect(active["dir"], start[:2], start[2:], dx, dy, panel.rect, min_w, min_h)
+        # 面板保持在 viewport 內
+        target = clamp_rect_to_area(target, {"x": 0, "y": 0, "w": snap.viewport_w, "h": snap.viewport_h})
+        self.set_rect(panel.name, target)
+
+    # ------------------------------------------------------------ 幾何
+    def set_rect(self, name, rect):
+        panel = self.panels[name]
+        rect = [int(v) for v in rect]
+        if rect == panel.rect:
+            return False
+        panel.rect = rect
+        self._apply(panel)
+        return True
+
+    def _apply(self, panel):
+        """暫存面板幾何到 ui.geometry（幀末合併送出）並更新空間索引。"""
+        ui = self.ui
+        x, y, w, h = panel.rect
+        bar_w = ui.resize_overlay.bar_w
+        btn_w, title_h = ui.button_size
+        content_y = bar_w + title_h
+        stage = ui.geometry.stage
+        stage(panel.window, pos=[x, y], width=w, height=h)
+        stage(panel.bar.tag("title_text_btn"), width=max(0, w - btn_w * 4), height=title_h)
+        stage(panel.bar.tag("title_table"), pos=[0, bar_w])
+        stage(panel.content, pos=[bar_w, content_y], width=max(1, w - 2 * bar_w),
+              height=max(1, h - content_y - bar_w), show=not panel.minimized)
+        self.grid.update(panel.name, panel.rect)
+
+    def toggle_minimize(self, name):
+        """收合為只剩標題列（再按一次還原高度）；最大化中的面板先還原為最大化前的矩形再收合。"""
+        panel = self.panels[name]
+        ui = self.ui
+        if panel.minimized:
+            panel.minimized = False
+            panel.rect[3] = panel.restore_height
+        else:
+            if panel.maximized:
+                panel.maximized = False
+                panel.rect = list(panel.restore_rect)
+            panel.minimized = True
+            panel.restore_height = panel.rect[3]
+            panel.rect[3] = ui.button_size[1] + 2 * ui.resize_overlay.bar_w
+        self._apply(panel)
+
+    def toggle_maximize(self, name):
+        """填滿主視窗的內容區（再按一次還原）；收合中的面板先還原高度，還原時回到展開的矩形。"""
+        panel = self.panels[name]
+        if panel.maximized:
+            panel.maximized = False
+            panel.rect = list(panel.restore_rect)
+        else:
+            if panel.minimized:
+                panel.minimized = False
+                panel.rect[3] = panel.restore_height
+            panel.maximized = True
+            panel.restore_rect = list(panel.rect)
+            panel.rect = self._maximized_rect()
+        self.raise_panel(name)
+        self._apply(panel)
+
+    def _maximized_rect(self):
+        snap = self.ui.snapshot.ensure()
+        area = self.ui.compute_layout(snap.viewport_w, snap.viewport_h)["content_window"]
+        return [area["pos"][0], area["pos"][1], area["width"], area["height"]]
+
+    def sync(self):
+        """viewport 尺寸改變後：最大化面板重新填滿，其餘面板夾回 viewport 內。"""
+        if not self.panels:
+            return
+        snap = self.ui.snapshot.ensure()
+        bounds = {"x": 0, "y": 0, "w": snap.viewport_w, "h": snap.viewport_h}
+        for panel in self.panels.values():
+            target = self._maximized_rect() if panel.maximized else clamp_rect_to_area(panel.rect, bounds)
+            self.set_rect(panel.name, target)
+
+
+class LayoutEngine:
+    """content_window 內的宣告式版面：項目以 dock / anchor / 百分比登記一次約束，viewport 尺寸改變時自動重算。
+
+    約束（px 為整數，百分比為 "50%" 字串，以父容器尺寸計算）：
+      dock="top"/"bottom"/"left"/"right"/"fill"：依登記順序從父容器剩餘區域切出，size 為 dock 方向的厚度；
+      left/top/right/bottom：與父容器邊緣的距離；同時指定 left 與 right（或 top 與 bottom）時隨父容器伸縮；
+      width/height：未由兩側 anchor 決定時的尺寸（預設填滿剩餘）；min_w/min_h：最小尺寸。
+    父容器為另一個已登記項目（例如 child_window）或 content_window 本身（parent=None）。
+    增量更新：某容器尺寸未變且其子項約束未變時整個子樹略過；位置/尺寸經 ui.geometry 於幀末合併送出。
+    """
+    DOCKS = ("top", "bottom", "left", "right", "fill")
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self.nodes = {}          # tag -> 約束 dict（含 "parent"、"rect"）
+        self.children = {None: []}
+        self._sizes = {}         # 容器 key -> 上次計算子項時的 (w, h)
+        self._dirty = set()      # 子項約束有變的容器 key
+        self.root_size = None
+        self.computed = 0        # 最近一次 update 重算的項目數
+        self.skipped = 0         # 最近一次 update 略過的容器數
+        self.last_update_ms = 0.0
 
-            # 以上都不符合，才進入拖曳移動
-            ui.state["dragging"] = True
-            ui.state["click_offset"] = [m_real[0] - v_pos[0], m_real[1] - v_pos[1]]
-        except Exception:
-            pass
+    def __len__(self):
+        return len(self.nodes)
 
-    def on_title_double_click(self, sender, app_data, user_data):
-        try:
-            self.toggle_maximize()
-        except Exception:
-            pass
+    def add(self, tag, parent=None, dock=None, size=None, left=None, top=None, right=None, bottom=None,
+            width=None, height=None, min_w=1, min_h=1):
+        """登記（或更新）項目的約束；下一次 update 時生效。"""
+        if dock is not None and dock not in self.DOCKS:
+            raise ValueError(f"unknown dock {dock!r}")
+        if parent is not None and parent not in self.nodes:
+            raise KeyError(f"layout parent {parent!r} is not registered")
+        old = self.nodes.get(tag)
+        if old is not None and old["parent"] != parent:
+            self.children[old["parent"]].remove(tag)
+            self._dirty.add(old["parent"])
+            old = None
+        node = {"parent": parent, "dock": dock, "size": size, "left": left, "top": top, "right": right,
+                "bottom": bottom, "width": width, "height": height, "min_w": min_w, "min_h": min_h,
+                "rect": old["rect"] if old else None}
+        self.nodes[tag] = node
+        if old is None:
+            self.children[parent].append(tag)
+        self.children.setdefault(tag, [])
+        self._dirty.add(parent)
+        return tag
 
-    def on_mouse_click(self, sender=None, app_data=None, user_data=None):
-        ui = self.ui_handle
-        v_w, v_h = dpg.get_viewport_width(), dpg.get_viewport_height()
-        m_real = ui.get_real_mouse_pos()
-        v_pos = dpg.get_viewport_pos()
-        if not ui.state["is_manual_max"]:
-            m_local = ui.get_mouse_pos_viewport_local()
-            # 直接座標判定（避免 hover 失效）：優先處理左上角與上側邊條
-            try:
-                bar_w = ui.resize_overlay.bar_w
-                corner_sz = ui.resize_overlay.corner_size
-                if not ui.state["resizing"]:
-                    # 左上角：正方形區域（X、Y 都需 ≤ corner_size）
-                    if m_local[0] <= corner_sz and m_local[1] <= corner_sz:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "corner_top_left"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-                    # 左下角：X ≤ corner_size 且 Y ≥ vh - corner_size
-                    elif m_local[0] <= corner_sz and m_local[1] >= v_h - corner_sz:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "corner_left"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-                    # 右下角：X ≥ vw - corner_size 且 Y ≥ vh - corner_size
-                    elif m_local[0] >= v_w - corner_sz and m_local[1] >= v_h - corner_sz:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "corner"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-                    elif m_local[1] <= bar_w:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "top"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-                    elif m_local[0] <= bar_w:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "left"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-                    elif m_local[0] >= v_w - bar_w:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "right"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-                    elif m_local[1] >= v_h - bar_w:
-                        ui.state["resizing"] = True
-                        ui.state["resize_dir"] = "bottom"
-                        ui.state["click_offset"] = [m_real[0], m_real[1]]
-                        ui.state["start_size"] = [v_w, v_h]
-                        ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            except Exception:
-                pass
-            if dpg.does_item_exist("resize_left_bar") and dpg.is_item_hovered("resize_left_bar"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "left"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif dpg.does_item_exist("resize_right_bar") and dpg.is_item_hovered("resize_right_bar"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "right"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif dpg.does_item_exist("resize_bottom_bar") and dpg.is_item_hovered("resize_bottom_bar"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "bottom"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif dpg.does_item_exist("resize_top_bar") and dpg.is_item_hovered("resize_top_bar"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "top"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif dpg.does_item_exist("resize_bl_corner") and dpg.is_item_hovered("resize_bl_corner"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "corner_left"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif dpg.does_item_exist("resize_br_corner") and dpg.is_item_hovered("resize_br_corner"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "corner"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif dpg.does_item_exist("resize_tl_corner") and dpg.is_item_hovered("resize_tl_corner"):
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "corner_top_left"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-            elif m_local[0] > v_w - 25 and m_local[1] > v_h - 25:
-                ui.state["resizing"] = True
-                ui.state["resize_dir"] = "corner"
-                ui.state["click_offset"] = [m_real[0], m_real[1]]
-                ui.state["start_size"] = [v_w, v_h]
-                ui.state["start_pos"] = [v_pos[0], v_pos[1]]
+    def remove(self, tag):
+        """移除項目及其子樹的約束（不刪除 Dear PyGui 項目）。"""
+        node = self.nodes.pop(tag, None)
+        if node is None:
+            return
+        for child in list(self.children.get(tag, ())):
+            self.remove(child)
+        self.children.pop(tag, None)
+        self._sizes.pop(tag, None)
+        self.children[node["parent"]].remove(tag)
+        self._dirty.add(node["parent"])
 
-    def on_mouse_release(self, sender=None, app_data=None, user_data=None):
-        ui = self.ui_handle
-        ui.state["dragging"] = False
-        ui.state["resizing"] = False
-        ui.state["resize_dir"] = None
-        # 放開滑鼠時才將視窗夾回工作區
-        try:
-            ui.clamp_viewport_to_work_area()
-            ui.sync_ui()
-        except Exception:
-            pass
+    def rect(self, tag):
+        """最近一次計算的相對父容器矩形 [x, y, w, h]。"""
+        return self.nodes[tag]["rect"]
 
-    def on_resize_press(self, sender, app_data, user_data):
-        """直接由縮放邊/角的 item handler 進入縮放模式，避免 hover 判定失效。"""
-        ui = self.ui_handle
-        try:
-            if ui.state["is_manual_max"]:
-                return
-            v_w, v_h = dpg.get_viewport_width(), dpg.get_viewport_height()
-            m_real = ui.get_real_mouse_pos()
-            v_pos = dpg.get_viewport_pos()
-            ui.state["resizing"] = True
-            ui.state["resize_dir"] = str(user_data)
-            ui.state["click_offset"] = [m_real[0], m_real[1]]
-            ui.state["start_size"] = [v_w, v_h]
-            ui.state["start_pos"] = [v_pos[0], v_pos[1]]
-        except Exception:
-            pass
+    @staticmethod
+    def _resolve(value, total):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return int(total * float(value.rstrip("%")) / 100.0)
+        return int(value)
+
+    def update(self, width, height):
+        """以 content_window 尺寸更新版面；只重算輸入（容器尺寸或約束）有變的子樹。回傳重算的項目數。"""
+        if not self.nodes:
+            return 0
+        t0 = time.perf_counter()
+        self.computed = 0
+        self.skipped = 0
+        size = (int(width), int(height))
+        if size != self.root_size or None in self._dirty:
+            self.root_size = size
+            self._layout_group(None, size[0], size[1])
+        else:
+            self.skipped += 1
+        # 其餘約束有變、但所在容器尺寸未變的子樹
+        while self._dirty:
+            key = self._dirty.pop()
+            if key is None:
+                self._layout_group(None, *self.root_size)
+                continue
+            node = self.nodes.get(key)
+            if node is not None and node["rect"] is not None:
+                self._layout_group(key, node["rect"][2], node["rect"][3])
+        self.last_update_ms = (time.perf_counter() - t0) * 1000.0
+        return self.computed
+
+    def _layout_group(self, key, pw, ph):
+        self._dirty.discard(key)
+        self._sizes[key] = (pw, ph)
+        resolve = self._resolve
+        cx, cy, cw, ch = 0, 0, pw, ph      # dock 用的剩餘區域
+        nodes = self.nodes
+        for tag in self.children[key]:
+            n = nodes[tag]
+            dock = n["dock"]
+            if dock is not None:
+                if dock == "fill":
+                    r = [cx, cy, cw, ch]
+                elif dock in ("top", "bottom"):
+                    h = min(ch, resolve(n["size"], ph) if n["size"] is not None else ch)
+                    r = [cx, cy if dock == "top" else cy + ch - h, cw, h]
+                    if dock == "top":
+                        cy += h
+                    ch -= h
+                else:
+                    w = min(cw, resolve(n["size"], pw) if n["size"] is not None else cw)
+                    r = [cx if dock == "left" else cx + cw - w, cy, w, ch]
+                    if dock == "left":
+                        cx += w
+                    cw -= w
+            else:
+                left, right = resolve(n["left"], pw), resolve(n["right"], pw)
+                top, bottom = resolve(n["top"], ph), resolve(n["bottom"], ph)
+                w = resolve(n["width"], pw)
+                h = resolve(n["height"], ph)
+                if w is None or (left is not None and right is not None):
+                    w = pw - (left or 0) - (right or 0)
+                if h is None or (top is not None and bottom is not None):
+                    h = ph - (top or 0) - (bottom or 0)
+                x = left if left is not None else (pw - right - w if right is not None else 0)
+                y = top if top is not None else (ph - bottom - h if bottom is not None else 0)
+                r = [x, y, w, h]
+            r[2] = max(n["min_w"], r[2])
+            r[3] = max(n["min_h"], r[3])
+            self.computed += 1
+            if r != n["rect"]:
+                n["rect"] = r
+                self.geometry.stage(tag, pos=[r[0], r[1]], width=r[2], height=r[3])
+            if self.children[tag]:
+                if (r[2], r[3]) != self._sizes.get(tag) or tag in self._dirty:
+                    self._layout_group(tag, r[2], r[3])
+                else:
+                    self.skipped += 1
+
+    def get_stats(self):
+        return {"nodes": len(self.nodes), "computed": self.computed, "skipped": self.skipped,
+                "last_update_ms": self.last_update_ms}
 
 
 class UserUI:
@@ -483,43 +3326,47 @@ class UserUI:
     def create_layout(self):
         """預設範例佈局：展示框架的 debug 資訊。覆寫此方法以自訂。"""
         with dpg.group(indent=15):
-            dpg.add_text("API Viewport Mouse: (0, 0)", tag="mouse_pos_text")
-            dpg.add_text("Adjusted Content Mouse: (0, 0)", tag="mouse_pos_content_text")
-            dpg.add_text("Real Screen Mouse: (0, 0)", tag="coord_screen_mouse")
-            dpg.add_text("Viewport Pos (Screen): (0, 0)", tag="coord_viewport_pos")
-            dpg.add_text("Viewport Size: (0, 0)", tag="coord_viewport_size")
-            dpg.add_text("Mouse Local (Viewport): (0, 0)", tag="coord_viewport_mouse_local")
-            dpg.add_text("Viewport Local (Computed): (0, 0)", tag="coord_viewport_local_computed")
-            dpg.add_text("Title Pos: (0, 0)", tag="coord_title_pos")
-            dpg.add_text("Work Area: x=0 y=0 w=0 h=0", tag="coord_work_area")
-            dpg.add_text("Top Bar Pos: (0, 0)", tag="coord_top_bar")
-            dpg.add_text("Left Bar Pos: (0, 0) size: (0, 0)", tag="coord_left_bar")
-            dpg.add_text("Right Bar Pos: (0, 0) size: (0, 0)", tag="coord_right_bar")
-            dpg.add_text("Bottom Bar Pos: (0, 0)", tag="coord_bottom_bar")
+            # 座標除錯 HUD（只有建立時才會每幀更新）
+            self.ui_handle.add_debug_hud()
 
             # 新增toggle按鈕
             dpg.add_button(label="0", tag="toggle_btn", callback=self.ui_handle.ui_event.toggle_button)
 
-            # 醒目綠字主題：用於顯示最重要的計算座標
-            with dpg.theme() as _computed_local_theme:
-                with dpg.theme_component(dpg.mvText):
-                    dpg.add_theme_color(dpg.mvThemeCol_Text, (0, 255, 0, 255))
-            dpg.bind_item_theme("coord_viewport_local_computed", _computed_local_theme)
-
     def resize_callback(self, sender, app_data):
         pass
     def update_logic(self):
         pass
+    def ui_strings(self):
+        # 字元子集模式（CUSTOMWINDOW_FONT_GLYPHS = "subset"）：回傳執行期才會顯示的字串，建立字型時一併加入
+        return ()
+    # 使用 UIHandle.run()（asyncio）時可另外定義：
+    #   async def update_logic_async(self): ...
+    # 每幀啟動一次（前一次未完成則略過），不會讓繪製等待 I/O
 
 
 class UIHandle:
     def __init__(self):
+        self.startup = StartupProfiler(CUSTOMWINDOW_STARTUP_PROFILE, CUSTOMWINDOW_STARTUP_EXPORT or None)
         self.initialized = False
         self.ui_event = UIEvent(self)
         self.window_bar = CustomWindowBar()
         self.resize_overlay = ResizeOverlay()
-        self.sys = SystemUtils()
+        self.hit_tester = HitTester()
+        self.hover = HoverTracker()
+        # 主題登錄（去重 + 執行期調色盤切換）
+        self.themes = ThemeRegistry()
+        # viewport 內的浮動面板（PanelManager.create 建立時才有任何 Dear PyGui 項目）
+        self.panels = PanelManager(self)
+        self.geometry = GeometryCommit()
+        self.layout = LayoutEngine(self.geometry)
+        self.snapshot = FrameSnapshot(self)
+        # 平台後端：原生函式於此一次綁定
+        self.platform = create_platform_backend()
+        self.sys = SystemUtils(self.platform)
+        self.cursor = CursorManager(create_cursor_backend(self.platform))
         self.user_ui = UserUI(self)
+        # 除錯 HUD（由佈局呼叫 add_debug_hud() 才建立）
+        self.debug_hud = None
         
         # 資源與狀態
         self.font_dir = os.path.join(os.path.dirname(__file__), "fonts")
@@ -530,8 +3377,42 @@ class UIHandle:
         self.images_ok = False
         self.icon_dir = os.path.join(os.path.dirname(__file__), "icon")
         self.icon_tex = None
-        # WinAPI 游標快取
+        self.atlas = None
+        self.resources_applied = False
+        self._resources_future = None
+        self._first_frame_done = False
+        self.image_cache = ImageCache() if CUSTOMWINDOW_IMAGE_CACHE else None
+        # 字型字元子集（subset 模式）；full 模式為 None
+        self.fonts = GlyphSubset(CUSTOMWINDOW_FONT_TOPUP) if CUSTOMWINDOW_FONT_GLYPHS == "subset" else None
+        # 預載游標形狀（由 CursorManager 使用）
         self.win_cursors = {}
+        # 每幀邏輯階段（名稱供 FrameProfiler 使用）
+        self._frame_phases = (
+            ("dispatch", self._phase_dispatch),
+            ("drag_resize", self._phase_drag_resize),
+            ("cursor", self._phase_cursor),
+            ("hover", self._phase_hover),
+            ("debug_hud", self._phase_debug_hud),
+            ("user_update", self._phase_user_update),
+        )
+        self.recorder = None
+        # 跨執行緒 UI 變更佇列與內建 worker pool（首次使用時建立）
+        self.dispatch = UIDispatchQueue(on_post=self.invalidate,
+                                        on_text=self.fonts.add_text if self.fonts is not None else None)
+        self._workers = None
+        # asyncio 驅動（run()）：執行中的 task 與待套用的結果
+        self._async_tasks = set()
+        self._async_results = deque()
+        self._async_hook_task = None
+        self._async_hook = None
+        # 幀節奏（FPS 上限 / 閒置降頻）；每幀活動判定用的上一幀計數
+        self.pacer = FramePacer()
+        self.pacer.wake_check = self._pointer_woke
+        self._activity_marks = (0, 0)
+        self._pointer_inside = False
+        self.profiler = FrameProfiler(export_path=CUSTOMWINDOW_PROFILE_EXPORT or None) if CUSTOMWINDOW_PROFILE else None
+        # viewport 更新統計：實際送出 / 目標未變而略過
+        self.viewport_stats = {"updates": 0, "skipped": 0}
         self.state = {
             "is_manual_max": False,
             "pre_max_pos": [100, 100],
@@ -545,46 +3426,62 @@ class UIHandle:
             "btn_hover": {"min_btn": False, "max_btn": False, "close_btn": False},
             "current_cursor": None,
             "current_cursor_key": "std",
-            "toggle_value": 0
+            "toggle_value": 0,
+            # live-resize outline/hybrid：內容尚未依目前尺寸重排
+            "content_stale": False,
         }
+        self.live_resize = CUSTOMWINDOW_LIVE_RESIZE
+        self._last_relayout = 0.0
+        self._outline_ready = False
+        self._outline_target = None    # outline 模式：放開滑鼠時套用的目標矩形
+        self._notified_size = None     # 上次呼叫 UserUI.resize_callback 時的 viewport 尺寸
+        self.startup.record("UIHandle.__init__", (time.perf_counter() - self.startup.t0) * 1000.0)
+
+    def add_debug_hud(self, rate_hz=None):
+        """在目前容器中建立座標除錯 HUD 並註冊到每幀更新。"""
+        self.debug_hud = DebugHud(self, rate_hz)
+        self.debug_hud.build()
+        return self.debug_hud
 
     def get_mouse_pos_viewport_local(self):
-        """取得滑鼠相對於 viewport 的本地座標。"""
-        m_real = self.get_real_mouse_pos()
-        v_pos = dpg.get_viewport_pos()
-        return [int(m_real[0] - v_pos[0]), int(m_real[1] - v_pos[1])]
+        """取得滑鼠相對於 viewport 的本地座標（本幀快照）。"""
+        return list(self.snapshot.ensure().mouse_local)
+
+    def _update_hit_tester(self, vw, vh):
+        # 標題列固定下移 bar_w（見 sync_ui），區域表僅在尺寸/參數改變時重建
+        bar_w = self.resize_overlay.bar_w
+        self.hit_tester.update(vw, vh, bar_w, self.resize_overlay.corner_size, self.button_size, bar_w)
+
+    def classify_point(self, x, y, vw, vh):
+        """以命中區域表分類 viewport 本地座標，回傳區域名稱。"""
+        self._update_hit_tester(vw, vh)
+        return self.hit_tester.classify(x, y)
+
+    def cursor_key_at(self, x, y, vw, vh):
+        """以命中區域表取得 viewport 本地座標對應的游標形狀鍵。"""
+        self._update_hit_tester(vw, vh)
+        return self.hit_tester.cursor_key(x, y)
 
     def _init_win_cursors(self):
-        """預載 WinAPI 系統游標以供快速切換。"""
+        """預載游標形狀（Windows 系統游標）並交由 CursorManager 管理。"""
         try:
-            user32 = ctypes.windll.user32
-            self.win_cursors = {
-                "std":  user32.LoadCursorW(None, 32512),  # IDC_ARROW
-                "we":   user32.LoadCursorW(None, 32644),  # IDC_SIZEWE
-                "ns":   user32.LoadCursorW(None, 32645),  # IDC_SIZENS
-                "nwse": user32.LoadCursorW(None, 32642),  # IDC_SIZENWSE
-                "nesw": user32.LoadCursorW(None, 32643),  # IDC_SIZENESW
-            }
+            self.win_cursors = self.cursor.backend.load_shapes()
         except Exception:
             self.win_cursors = {}
+        self.cursor.set_shapes(self.win_cursors)
 
     def _set_cursor_win(self, cursor_id: int) -> bool:
-        """透過 WinAPI 設定游標形狀（系統預設游標）。
+        """透過平台後端設定游標形狀（系統預設游標）。
         cursor_id 可用：
         32512: IDC_ARROW, 32645: IDC_SIZENS, 32644: IDC_SIZEWE,
         32642: IDC_SIZENWSE, 32643: IDC_SIZENESW
         """
-        try:
-            user32 = ctypes.windll.user32
-            # 設定函式型別，並以 MAKEINTRESOURCE 的方式傳遞資源 ID
-            user32.LoadCursorW.restype = wintypes.HCURSOR
-            user32.LoadCursorW.argtypes = [wintypes.HINSTANCE, wintypes.LPCWSTR]
-            hcur = user32.LoadCursorW(None, ctypes.c_void_p(cursor_id))
-            if hcur:
-                user32.SetCursor(hcur)
-                return True
-        except Exception:
-            pass
+        if not self.platform.available:
+            return False
+        hcur = self.platform.load_cursor(cursor_id)
+        if hcur:
+            self.platform.set_cursor(hcur)
+            return True
         return False
 
     # 輔助：載入貼圖
@@ -593,36 +3490,72 @@ class UIHandle:
             path = os.path.join(self.images_dir, filename)
             if not os.path.exists(path):
                 return None, None, None
-            w, h, c, data = dpg.load_image(path)
-            with dpg.texture_registry():
-                tex_id = dpg.add_static_texture(w, h, data)
+            with self._decode_image(path) as image:
+                w, h, c, data = image
+                with dpg.texture_registry():
+                    tex_id = dpg.add_static_texture(w, h, data)
+                # 上傳後立即釋放主機端像素資料（離開 with 時關閉快取的 mmap）
+                del data
             return tex_id, w, h
         except Exception:
             return None, None, None
 
     # 系統工具包裝
-    def get_real_mouse_pos(self):
-        return self.sys.get_real_mouse_pos()
+    def get_real_mouse_pos(self, cfg=None):
+        return self.sys.get_real_mouse_pos(cfg)
 
     def get_viewport_work_area(self):
-        return self.sys.get_viewport_work_area()
+        snap = self.snapshot.ensure()
+        return self.sys.get_viewport_work_area(snap.viewport_pos + snap.viewport_size)
+
+    def set_platform_backend(self, platform):
+        """替換平台後端（例如 FakeBackend），並重建相依的系統工具與游標快取。"""
+        self.platform = platform
+        self.sys = SystemUtils(platform)
+        self.cursor = CursorManager(create_cursor_backend(platform))
+        self._init_win_cursors()
+
+    def invalidate_work_area(self):
+        """顯示設定（解析度、螢幕配置、工作列）變更後呼叫，強制重新查詢工作區。"""
+        self.sys.invalidate_work_area()
+
+    def apply_viewport_rect(self, rect):
+        """以單次 configure_viewport 送出與目前不同的欄位；回傳尺寸是否改變。"""
+        snap = self.snapshot.ensure()
+        cur = snap.viewport_rect
+        if rect == cur:
+            self.viewport_stats["skipped"] += 1
+            return False
+        changed = {}
+        for key, old, new in zip(("x_pos", "y_pos", "width", "height"), cur, rect):
+            if old != new:
+                changed[key] = new
+        dpg.configure_viewport(0, **changed)
+        self.viewport_stats["updates"] += 1
+        snap.set_viewport_rect(*rect)
+        return cur[2] != rect[2] or cur[3] != rect[3]
+
+    def clamp_rect_to_work_area(self, rect):
+        """將矩形夾入工作區：有螢幕拓撲時依 CUSTOMWINDOW_SPAN_MONITORS 允許跨螢幕；無工作區資訊時回傳 None。"""
+        clamped = self.sys.clamp_rect(rect, CUSTOMWINDOW_SPAN_MONITORS and not self.state["is_manual_max"])
+        if clamped is not None:
+            return clamped
+        area = self.snapshot.ensure().work_area
+        return None if area is None else clamp_rect_to_area(rect, area)
+
+    def get_maximize_work_area(self):
+        """最大化目標：游標所在螢幕的工作區（無螢幕拓撲時為 viewport 所在螢幕）。"""
+        snap = self.snapshot.ensure()
+        area = self.sys.get_work_area_at(*snap.mouse_screen)
+        return area if area is not None else snap.work_area
 
     def clamp_viewport_to_work_area(self):
-        area = self.get_viewport_work_area()
-        v_w, v_h = dpg.get_viewport_width(), dpg.get_viewport_height()
-        v_pos = dpg.get_viewport_pos()
-        max_x = area["x"] + max(0, area["w"] - v_w)
-        max_y = area["y"] + max(0, area["h"] - v_h)
-        new_x = min(max(v_pos[0], area["x"]), max_x)
-        new_y = min(max(v_pos[1], area["y"]), max_y)
-        if v_w > area["w"] or v_h > area["h"]:
-            dpg.configure_viewport(0, width=min(v_w, area["w"]), height=min(v_h, area["h"]))
-            v_w, v_h = dpg.get_viewport_width(), dpg.get_viewport_height()
-            max_x = area["x"] + max(0, area["w"] - v_w)
-            max_y = area["y"] + max(0, area["h"] - v_h)
-            new_x = min(max(new_x, area["x"]), max_x)
-            new_y = min(max(new_y, area["y"]), max_y)
-        dpg.set_viewport_pos([int(new_x), int(new_y)])
+        snap = self.snapshot.ensure()
+        target = self.clamp_rect_to_work_area(snap.viewport_rect)
+        if target is None:
+            # 平台不提供工作區資訊：不夾取
+            return False
+        return self.apply_viewport_rect(target)
 
     def _set_resize_bars_enabled(self, enabled: bool):
         try:
@@ -636,289 +3569,332 @@ class UIHandle:
         except Exception:
             pass
 
-    def update_logic(self):
-        if self.state["dragging"] or self.state["resizing"]:
-            m_real = self.get_real_mouse_pos()
-            if self.state["dragging"]:
-                dpg.set_viewport_pos([int(m_real[0] - self.state["click_offset"][0]), int(m_real[1] - self.state["click_offset"][1])])
-            elif self.state["resizing"]:
-                dx, dy = m_real[0] - self.state["click_offset"][0], m_real[1] - self.state["click_offset"][1]
-                min_w, min_h = 400, 300
-                if self.state["resize_dir"] == "right" or self.state["resize_dir"] == "corner":
-                    new_w = max(min_w, int(self.state["start_size"][0] + dx))
-                    new_h = max(min_h, int(self.state["start_size"][1] + dy)) if self.state["resize_dir"] == "corner" else dpg.get_viewport_height()
-                    dpg.configure_viewport(0, width=new_w, height=new_h)
-                elif self.state["resize_dir"] == "bottom":
-                    new_h = max(min_h, int(self.state["start_size"][1] + dy))
-                    dpg.configure_viewport(0, height=new_h)
-                elif self.state["resize_dir"] == "left":
-                    new_w = max(min_w, int(self.state["start_size"][0] - dx))
-                    new_x = int(self.state["start_pos"][0] + dx)
-                    if new_w == min_w:
-                        new_x = min(new_x, self.state["start_pos"][0] + self.state["start_size"][0] - min_w)
-                    dpg.configure_viewport(0, x_pos=new_x, width=new_w)
-                elif self.state["resize_dir"] == "top":
-                    new_h = max(min_h, int(self.state["start_size"][1] - dy))
-                    new_y = int(self.state["start_pos"][1] + dy)
-                    if new_h == min_h:
-                        new_y = min(new_y, self.state["start_pos"][1] + self.state["start_size"][1] - min_h)
-                    dpg.configure_viewport(0, y_pos=new_y, height=new_h)
-                elif self.state["resize_dir"] == "corner_left":
-                    new_w = max(min_w, int(self.state["start_size"][0] - dx))
-                    new_h = max(min_h, int(self.state["start_size"][1] + dy))
-                    new_x = int(self.state["start_pos"][0] + dx)
-                    if new_w == min_w:
-                        new_x = min(new_x, self.state["start_pos"][0] + self.state["start_size"][0] - min_w)
-                    dpg.configure_viewport(0, x_pos=new_x, width=new_w, height=new_h)
-                elif self.state["resize_dir"] == "corner_top_left":
-                    new_w = max(min_w, int(self.state["start_size"][0] - dx))
-                    new_h = max(min_h, int(self.state["start_size"][1] - dy))
-                    new_x = int(self.state["start_pos"][0] + dx)
-                    new_y = int(self.state["start_pos"][1] + dy)
-                    if new_w == min_w:
-                        new_x = min(new_x, self.state["start_pos"][0] + self.state["start_size"][0] - min_w)
-                    if new_h == min_h:
-                        new_y = min(new_y, self.state["start_pos"][1] + self.state["start_size"][1] - min_h)
-                    dpg.configure_viewport(0, x_pos=new_x, y_pos=new_y, width=new_w, height=new_h)
-                self.clamp_viewport_to_work_area()
+    def _update_drag_resize(self, snap):
+        """由本幀滑鼠取樣計算目標矩形；與目前矩形相同時不做任何事，否則合併為一次 viewport 更新。"""
+        m_real = snap.mouse_screen
+        if self.state["dragging"]:
+            # 拖曳時不夾取，放開滑鼠時才夾回工作區
+            target = [int(m_real[0] - self.state["click_offset"][0]), int(m_real[1] - self.state["click_offset"][1]),
+                      snap.viewport_w, snap.viewport_h]
+        else:
+            dx, dy = m_real[0] - self.state["click_offset"][0], m_real[1] - self.state["click_offset"][1]
+            outline = self.live_resize == "outline"
+            # outline 模式的 viewport 不等於目標矩形，未受影響的軸以起點矩形為準
+            current = self.state["start_pos"] + self.state["start_size"] if outline else snap.viewport_rect
+            target = compute_resize_rect(self.state["resize_dir"], self.state["start_pos"], self.state["start_size"],
+                                         dx, dy, current)
+            clamped = self.clamp_rect_to_work_area(target)
+            if clamped is not None:
+                target = clamped
+            if outline:
+                self._outline_resize_step(target)
+                return
+        if self.apply_viewport_rect(target):
+            if self._resize_deferred():
+                self._deferred_resize_step(snap)
+            else:
                 self.sync_ui()
 
-        # 游標提示（WinAPI）：使用預載系統游標，依狀態或座標切換
-        # 仿照 test.py 的做法，每幀無條件設定游標
+    def _phase_dispatch(self, snap):
+        # 套用其他執行緒排入的 UI 變更（時間預算內）
+        self.dispatch.drain()
+        fonts = self.fonts
+        if fonts is not None and fonts.missing:
+            # 新字元延遲補字：重建字型，下一次繪製時生效
+            fonts.flush()
+
+    def _phase_drag_resize(self, snap):
+        if self.state["dragging"] or self.state["resizing"]:
+            self._update_drag_resize(snap)
+        elif self.panels.active is not None:
+            self.panels.update(snap)
+
+    def _phase_cursor(self, snap):
+        # 游標提示：依縮放狀態或命中區域決定形狀，只在形狀改變或被系統重設時才套用
         try:
-            desired_key = "std"
             if self.state["resizing"]:
-                # 縮放中：依 resize_dir 決定游標
-                dir_map = {
-                    "left": "we",
-                    "right": "we",
-                    "top": "ns",
-                    "bottom": "ns",
-                    "corner": "nwse",
-                    "corner_left": "nesw",
-                    "corner_top_left": "nwse",
-                }
-                desired_key = dir_map.get(self.state["resize_dir"], "std")
+                desired_key = CursorManager.RESIZE_CURSORS.get(self.state["resize_dir"], "std")
             else:
-                # 非縮放中：檢測 hover 或座標
-                vw, vh = dpg.get_viewport_width(), dpg.get_viewport_height()
-                m_local = self.get_mouse_pos_viewport_local()
-                bar_w = self.resize_overlay.bar_w
-                corner_sz = self.resize_overlay.corner_size
-
-                # 先用 item hover 判定
-                if dpg.does_item_exist("resize_left_bar") and dpg.is_item_hovered("resize_left_bar"):
-                    desired_key = "we"
-                elif dpg.does_item_exist("resize_right_bar") and dpg.is_item_hovered("resize_right_bar"):
-                    desired_key = "we"
-                elif dpg.does_item_exist("resize_top_bar") and dpg.is_item_hovered("resize_top_bar"):
-                    desired_key = "ns"
-                elif dpg.does_item_exist("resize_bottom_bar") and dpg.is_item_hovered("resize_bottom_bar"):
-                    desired_key = "ns"
-                elif dpg.does_item_exist("resize_tl_corner") and dpg.is_item_hovered("resize_tl_corner"):
-                    desired_key = "nwse"
-                elif dpg.does_item_exist("resize_bl_corner") and dpg.is_item_hovered("resize_bl_corner"):
-                    desired_key = "nesw"
-                elif dpg.does_item_exist("resize_br_corner") and dpg.is_item_hovered("resize_br_corner"):
-                    desired_key = "nwse"
-                else:
-                    # 座標回退判定（避免 hover 失效）
-                    if m_local[0] <= corner_sz and m_local[1] <= corner_sz:
-                        desired_key = "nwse"
-                    elif m_local[0] <= corner_sz and m_local[1] >= vh - corner_sz:
-                        desired_key = "nesw"
-                    elif m_local[0] >= vw - corner_sz and m_local[1] >= vh - corner_sz:
-                        desired_key = "nwse"
-                    elif m_local[0] >= vw - corner_sz and m_local[1] <= corner_sz:
-                        desired_key = "nesw"
-                    elif m_local[1] <= bar_w or m_local[1] >= vh - bar_w:
-                        desired_key = "ns"
-                    elif m_local[0] <= bar_w or m_local[0] >= vw - bar_w:
-                        desired_key = "we"
-
-            # 每幀無條件套用游標（與 test.py 相同做法）
-            hcur = self.win_cursors.get(desired_key)
-            if hcur:
-                ctypes.windll.user32.SetCursor(hcur)
+                # 非縮放中：以命中區域表依座標判定（不再逐一查詢縮放條 hover）
+                m_local = snap.mouse_local
+                desired_key = self.cursor_key_at(m_local[0], m_local[1], snap.viewport_w, snap.viewport_h)
+                if desired_key == "std" and self.panels.panels:
+                    # 面板縮放邊緣：經空間索引只查詢游標所在格子的面板
+                    desired_key = self.panels.cursor_key_at(m_local[0], m_local[1]) or "std"
+            self.cursor.apply(desired_key, snap.mouse_moved, snap.time)
             self.state["current_cursor_key"] = desired_key
         except Exception:
             pass
 
-        if self.images_ok:
-            mapping = {
-                "min_btn": ("min_normal", "min_hover"),
-                "max_btn": ("max_normal", "max_hover"),
-                "close_btn": ("close_normal", "close_hover")
-            }
-            for item_id, (norm_key, hover_key) in mapping.items():
-                try:
-                    hovered = dpg.is_item_hovered(item_id)
-                except Exception:
-                    hovered = False
-                if hovered != self.state["btn_hover"][item_id]:
-                    dpg.configure_item(item_id, texture_tag=self.texture_ids[hover_key if hovered else norm_key])
-                    self.state["btn_hover"][item_id] = hovered
+    def _phase_hover(self, snap):
+        # hover 進入由 handler 即時處理；這裡只判定 hover 中的項目是否已離開
+        self.hover.update()
 
-        # 縮放條與 content_window 的同步已移至 _sync_resize_bars()，由 sync_ui() 統一呼叫
+    def add_hover_sprites(self, tag, normal_key, hover_key, bar=None):
+        """讓圖片按鈕在 hover 時顯示 hover_key 的 sprite（事件驅動，只在進入/離開時更新），可用於自訂標題列按鈕。"""
+        def on_change(item, hovered):
+            key = hover_key if hovered else normal_key
+            if item in self.state["btn_hover"]:
+                self.state["btn_hover"][item] = hovered
+            if item in (bar or self.window_bar).placeholders or not (
+                    (self.atlas is not None and key in self.atlas) or self.texture_ids.get(key)):
+                return
+            # 貼圖集：同一張貼圖只切換 UV
+            dpg.configure_item(item, **self.sprite_state_args(key))
+        self.hover.register(tag, on_change)
 
-        try:
-            m_local = dpg.get_mouse_pos(local=True)
-            raw_x, raw_y = int(m_local[0]), int(m_local[1])
-            if dpg.does_item_exist("mouse_pos_text"):
-                dpg.set_value("mouse_pos_text", f"API Viewport Mouse: ({raw_x}, {raw_y})")
-            if dpg.does_item_exist("mouse_pos_content_text"):
-                title_pos_y = 0
-                if dpg.does_item_exist("title_table"):
-                    try:
-                        title_pos_y = dpg.get_item_pos("title_table")[1]
-                    except Exception:
-                        title_pos_y = self.resize_overlay.bar_w
-                content_y = max(0, raw_y - (title_pos_y + self.button_size[1]))
-                dpg.set_value("mouse_pos_content_text", f"Adjusted Content Mouse: ({raw_x}, {content_y})")
-            # 額外座標系資訊
-            m_real = self.get_real_mouse_pos()
-            v_pos = dpg.get_viewport_pos()
-            vw, vh = dpg.get_viewport_width(), dpg.get_viewport_height()
-            if dpg.does_item_exist("coord_screen_mouse"):
-                dpg.set_value("coord_screen_mouse", f"Real Screen Mouse: ({int(m_real[0])}, {int(m_real[1])})")
-            if dpg.does_item_exist("coord_viewport_pos"):
-                dpg.set_value("coord_viewport_pos", f"Viewport Pos (Screen): ({int(v_pos[0])}, {int(v_pos[1])})")
-            if dpg.does_item_exist("coord_viewport_size"):
-                dpg.set_value("coord_viewport_size", f"Viewport Size: ({vw}, {vh})")
-            if dpg.does_item_exist("coord_viewport_mouse_local"):
-                dpg.set_value("coord_viewport_mouse_local", f"Mouse Local (Viewport): ({raw_x}, {raw_y})")
-            if dpg.does_item_exist("coord_viewport_local_computed"):
-                comp_x = int(m_real[0] - v_pos[0])
-                comp_y = int(m_real[1] - v_pos[1])
-                dpg.set_value("coord_viewport_local_computed", f"Viewport Local (Computed): ({comp_x}, {comp_y})")
-            # 標題列位置
-            if dpg.does_item_exist("coord_title_pos"):
-                try:
-                    tpos = dpg.get_item_pos("title_table")
-                except Exception:
-                    tpos = [0, self.resize_overlay.bar_w]
-                dpg.set_value("coord_title_pos", f"Title Pos: ({int(tpos[0])}, {int(tpos[1])})")
-            # 工作區
-            if dpg.does_item_exist("coord_work_area"):
-                area = self.get_viewport_work_area()
-                dpg.set_value("coord_work_area", f"Work Area: x={area['x']} y={area['y']} w={area['w']} h={area['h']}")
-            # 各縮放條位置與尺寸
-            if dpg.does_item_exist("coord_top_bar"):
-                try:
-                    tbpos = dpg.get_item_pos("resize_top_bar")
-                except Exception:
-                    tbpos = [0, 0]
-                dpg.set_value("coord_top_bar", f"Top Bar Pos: ({int(tbpos[0])}, {int(tbpos[1])})")
-            if dpg.does_item_exist("coord_left_bar"):
-                try:
-                    lbpos = dpg.get_item_pos("resize_left_bar")
-                    lbw = dpg.get_item_width("resize_left_bar")
-                    lbh = dpg.get_item_height("resize_left_bar")
-                except Exception:
-                    lbpos, lbw, lbh = [0, 0], 0, 0
-                dpg.set_value("coord_left_bar", f"Left Bar Pos: ({int(lbpos[0])}, {int(lbpos[1])}) size: ({lbw}, {lbh})")
-            if dpg.does_item_exist("coord_right_bar"):
-                try:
-                    rbpos = dpg.get_item_pos("resize_right_bar")
-                    rbw = dpg.get_item_width("resize_right_bar")
-                    rbh = dpg.get_item_height("resize_right_bar")
-                except Exception:
-                    rbpos, rbw, rbh = [0, 0], 0, 0
-                dpg.set_value("coord_right_bar", f"Right Bar Pos: ({int(rbpos[0])}, {int(rbpos[1])}) size: ({rbw}, {rbh})")
-            if dpg.does_item_exist("coord_bottom_bar"):
-                try:
-                    bbpos = dpg.get_item_pos("resize_bottom_bar")
-                except Exception:
-                    bbpos = [0, 0]
-                dpg.set_value("coord_bottom_bar", f"Bottom Bar Pos: ({int(bbpos[0])}, {int(bbpos[1])})")
-        except Exception:
-            pass
+    def _phase_debug_hud(self, snap):
+        # 除錯 HUD：僅在佈局建立時才存在，依設定頻率更新
+        if self.debug_hud is not None:
+            self.debug_hud.update(snap)
 
+    def _phase_user_update(self, snap):
         # 呼叫用戶自訂的每幀更新邏輯
         try:
             self.user_ui.update_logic()
         except Exception:
             pass
 
-    def _sync_resize_bars(self):
-        """同步縮放條、角落方塊與 content_window 的位置與尺寸。"""
-        try:
-            vw, vh = dpg.get_viewport_width(), dpg.get_viewport_height()
-            bar_w_local = self.resize_overlay.bar_w
-            title_h_local = self.button_size[1]
-            title_pos_y = bar_w_local
-            if dpg.does_item_exist("title_table"):
-                try:
-                    title_pos_y = dpg.get_item_pos("title_table")[1]
-                except Exception:
-                    pass
-            corner_size_local = self.resize_overlay.corner_size
+    def update_logic(self):
+        # 縮放條與 content_window 的同步已移至 _sync_resize_bars()，由 sync_ui() 統一呼叫
+        snap = self.snapshot.ensure()
+        prof = self.profiler
+        for name, phase in self._frame_phases:
+            if prof is None:
+                phase(snap)
+            else:
+                t0 = time.perf_counter()
+                phase(snap)
+                prof.record(name, time.perf_counter() - t0)
 
-            # 縮放條位置與尺寸
-            y_start = title_pos_y
-            if dpg.does_item_exist("resize_left_bar"):
-                dpg.configure_item("resize_left_bar", width=bar_w_local, height=max(1, vh - y_start - bar_w_local), pos=[0, y_start])
-            if dpg.does_item_exist("resize_right_bar"):
-                dpg.configure_item("resize_right_bar", width=bar_w_local, height=max(1, vh - y_start - bar_w_local), pos=[max(0, vw - bar_w_local), y_start])
-            if dpg.does_item_exist("resize_bottom_bar"):
-                dpg.configure_item("resize_bottom_bar", width=vw, height=bar_w_local, pos=[0, max(0, vh - bar_w_local)])
-            if dpg.does_item_exist("resize_top_bar"):
-                dpg.configure_item("resize_top_bar", width=vw, height=bar_w_local, pos=[0, 0])
+    def compute_layout(self, vw, vh):
+        """以純資料計算標題列、縮放條、角落方塊與 content_window 的目標幾何。"""
+        bar_w = self.resize_overlay.bar_w
+        corner = self.resize_overlay.corner_size
+        btn_w, title_h = self.button_size
+        # 標題列固定下移 bar_w（不使用 spacer），縮放條自標題列頂端開始
+        title_pos_y = bar_w
+        side_h = max(1, vh - title_pos_y - bar_w)
+        content_y = title_pos_y + title_h
+        return {
+            # 可用寬度：viewport 寬度減去固定欄寬（icon + min + max + close）
+            "title_text_btn": {"width": max(0, vw - btn_w * 4), "height": title_h},
+            "title_table": {"pos": [0, title_pos_y]},
+            "resize_left_bar": {"width": bar_w, "height": side_h, "pos": [0, title_pos_y]},
+            "resize_right_bar": {"width": bar_w, "height": side_h, "pos": [max(0, vw - bar_w), title_pos_y]},
+            "resize_bottom_bar": {"width": vw, "height": bar_w, "pos": [0, max(0, vh - bar_w)]},
+            "resize_top_bar": {"width": vw, "height": bar_w, "pos": [0, 0]},
+            "resize_bl_corner": {"width": corner, "height": corner, "pos": [0, max(0, vh - corner)]},
+            "resize_br_corner": {"width": corner, "height": corner,
+                                 "pos": [max(0, vw - corner), max(0, vh - corner)]},
+            "resize_tl_corner": {"width": corner, "height": corner, "pos": [0, 0]},
+            # 主內容子視窗（預留四側縮放邊距）
+            "content_window": {"pos": [bar_w, content_y], "width": max(1, vw - 2 * bar_w),
+                               "height": max(1, vh - (content_y + bar_w))},
+        }
 
-            # 角落方塊位置與尺寸
-            if dpg.does_item_exist("resize_bl_corner"):
-                dpg.configure_item("resize_bl_corner", width=corner_size_local, height=corner_size_local, pos=[0, max(0, vh - corner_size_local)])
-            if dpg.does_item_exist("resize_br_corner"):
-                dpg.configure_item("resize_br_corner", width=corner_size_local, height=corner_size_local, pos=[max(0, vw - corner_size_local), max(0, vh - corner_size_local)])
-            if dpg.does_item_exist("resize_tl_corner"):
-                dpg.configure_item("resize_tl_corner", width=corner_size_local, height=corner_size_local, pos=[0, 0])
-
-            # 同步主內容子視窗的位置與尺寸（預留四側縮放邊距）
-            if dpg.does_item_exist("content_window"):
-                content_y = title_pos_y + title_h_local
-                dpg.configure_item(
-                    "content_window",
-                    pos=[bar_w_local, content_y],
-                    width=max(1, vw - 2 * bar_w_local),
-                    height=max(1, vh - (content_y + bar_w_local))
-                )
+    RESIZE_TAGS = ("resize_left_bar", "resize_right_bar", "resize_bottom_bar", "resize_top_bar",
+                   "resize_bl_corner", "resize_br_corner", "resize_tl_corner")
+
+    def _sync_resize_bars(self, content=True):
+        """同步縮放條、角落方塊與 content_window 的位置與尺寸（暫存至幾何提交層）。"""
+        try:
+            snap = self.snapshot.ensure()
+            layout = self.compute_layout(snap.viewport_w, snap.viewport_h)
+            for tag in self.RESIZE_TAGS + (("content_window",) if content else ()):
+                self.geometry.stage(tag, **layout[tag])
         except Exception:
             pass
 
-    def sync_ui(self):
-        """同步所有 UI 元件的位置與尺寸。"""
+    def sync_ui(self, content=True):
+        """同步所有 UI 元件的位置與尺寸；實際 configure_item 於幀末由 geometry.flush() 送出。
+
+        content=False 時只同步外框（標題列、縮放條）；content_window、版面引擎與面板留待之後（見 live-resize 模式）。
+        """
+        layout = None
         try:
-            # 計算可用寬度：viewport 寬度減去固定欄寬（icon + 3 個按鈕）
-            vw = dpg.get_viewport_width()
-            fixed_sum = self.button_size[0] * 4  # icon + min + max + close
-            title_w = max(0, vw - fixed_sum)
-            if dpg.does_item_exist("title_text_btn"):
-                dpg.configure_item("title_text_btn", width=title_w, height=self.button_size[1])
+            snap = self.snapshot.ensure()
+            layout = self.compute_layout(snap.viewport_w, snap.viewport_h)
+            self.geometry.stage("title_text_btn", **layout["title_text_btn"])
             # 保持標題列下移位置（不使用 spacer）
-            if dpg.does_item_exist("title_table"):
-                dpg.configure_item("title_table", pos=[0, self.resize_overlay.bar_w])
+            self.geometry.stage("title_table", **layout["title_table"])
         except Exception:
             pass
         # 同步縮放條與 content_window
-        self._sync_resize_bars()
+        self._sync_resize_bars(content)
+        if not content:
+            return
+        if self.layout.nodes and layout is not None:
+            # content_window 內宣告式版面：只重算尺寸/約束有變的子樹，與上方幾何同批送出
+            try:
+                content_rect = layout["content_window"]
+                self.layout.update(content_rect["width"], content_rect["height"])
+            except Exception:
+                pass
+        if self.panels.panels:
+            self.panels.sync()
 
-    def _load_resources(self):
+    # ---------------------------------------------------------- live-resize 模式
+    def _resize_deferred(self):
+        """目前是否處於延後內容重排的縮放中（outline / hybrid 模式）。"""
+        return self.state["resizing"] and self.live_resize != "live"
+
+    def _deferred_resize_step(self, snap):
+        # hybrid：只讓外框跟上，內容標記為過期，並依上限頻率重排內容
+        self.sync_ui(content=False)
+        self.state["content_stale"] = True
+        hz = CUSTOMWINDOW_RESIZE_RELAYOUT_HZ
+        if hz > 0 and snap.time - self._last_relayout >= 1.0 / hz:
+            self._relayout_content(snap.time)
+
+    def _outline_resize_step(self, target):
+        # outline：viewport 維持起點矩形，外框、內容與使用者 callback 都不動（拖曳中不付出系統縮放成本）；
+        # 目標矩形以 viewport 本地座標畫出，放大時夾在 viewport 內；放開滑鼠時才套用目標矩形
+        sx, sy = self.state["start_pos"]
+        sw, sh = self.state["start_size"]
+        x0, y0 = max(0, target[0] - sx), max(0, target[1] - sy)
+        x1, y1 = min(sw, target[0] + target[2] - sx), min(sh, target[1] + target[3] - sy)
+        self._outline_target = list(target)
+        self.state["content_stale"] = True
+        self._show_resize_outline([x0, y0, x1 - x0, y1 - y0])
+
+    def notify_resize(self, sender=None, app_data=None):
+        """呼叫 UserUI.resize_callback；同一 viewport 尺寸只呼叫一次（延後重排與系統 resize callback 不重複）。"""
+        snap = self.snapshot.ensure()
+        w, h = snap.viewport_w, snap.viewport_h
+        if (w, h) == self._notified_size:
+            return False
+        self._notified_size = (w, h)
+        try:
+            self.user_ui.resize_callback(sender, app_data if app_data is not None else [w, h, w, h])
+        except Exception:
+            pass
+        return True
+
+    def _relayout_content(self, now=None):
+        """完整重排內容並呼叫 UserUI.resize_callback 一次（app_data 與 viewport resize callback 相同格式）。"""
+        self.state["content_stale"] = False
+        self._last_relayout = time.perf_counter() if now is None else now
+        self.sync_ui()
+        self.notify_resize()
+
+    def _show_resize_outline(self, local_rect):
+        # 以前景 viewport drawlist 的單一矩形標示目標矩形（viewport 本地座標）
+        x, y, w, h = local_rect
+        try:
+            if not self._outline_ready:
+                with dpg.viewport_drawlist(front=True, tag="resize_outline_layer"):
+                    dpg.draw_rectangle((0, 0), (1, 1), color=(60, 160, 255, 220), thickness=2, tag="resize_outline")
+                self._outline_ready = True
+            self.geometry.stage("resize_outline_layer", show=True)
+            self.geometry.stage("resize_outline", pmin=[x + 1, y + 1], pmax=[x + w - 1, y + h - 1])
+        except Exception:
+            pass
+
+    def finish_deferred_resize(self):
+        """放開滑鼠時：outline 模式先套用目標矩形；內容過期則完整重排並呼叫一次 UserUI.resize_callback。"""
+        if self._outline_ready:
+            self.geometry.stage("resize_outline_layer", show=False)
+        target, self._outline_target = self._outline_target, None
+        if target is not None:
+            self.apply_viewport_rect(target)
+        if self.state["content_stale"]:
+            self._relayout_content()
+
+    # 按鈕貼圖：texture key -> 檔名
+    IMAGE_FILES = {
+        "min_normal": "Minimize_Normal.png",
+        "min_hover": "Minimize_Hover.png",
+        "max_normal": "Maximize_Normal.png",
+        "max_hover": "Maximize_Hover.png",
+        "close_normal": "Close_Normal.png",
+        "close_hover": "Close_Hover.png",
+    }
+
+    def _find_font(self):
         # 掃描可用字型檔案
         try:
             if os.path.isdir(self.font_dir):
                 preferred = os.path.join(self.font_dir, "NotoSansTC-Regular.ttf")
                 if os.path.exists(preferred):
-                    self.font_path = preferred
-                else:
-                    for name in os.listdir(self.font_dir):
-                        if name.lower().endswith((".ttf", ".otf")):
-                            self.font_path = os.path.join(self.font_dir, name)
-                            break
+                    return preferred
+                for name in os.listdir(self.font_dir):
+                    if name.lower().endswith((".ttf", ".otf")):
+                        return os.path.join(self.font_dir, name)
+        except Exception:
+            pass
+        return None
+
+    def _find_icon(self):
+        try:
+            if os.path.isdir(self.icon_dir):
+                for name in ["icon.png", "icon.jpg", "icon.jpeg", "icon.bmp"]:
+                    p = os.path.join(self.icon_dir, name)
+                    if os.path.exists(p):
+                        return p
+                for name in os.listdir(self.icon_dir):
+                    if name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp")):
+                        return os.path.join(self.icon_dir, name)
         except Exception:
-            self.font_path = None
+            pass
+        return None
+
+    def _decode_image(self, path):
+        """解碼圖片為 DecodedImage（啟用快取時由磁碟快取 mmap 載入）；用完需 close()。"""
+        if self.image_cache is not None:
+            return self.image_cache.load(path)
+        return DecodedImage.wrap(dpg.load_image(path))
+
+    def _read_resources(self):
+        """讀取階段（不建立任何 Dear PyGui 項目，可在背景執行緒執行）：找字型、解碼圖片並打包貼圖集。"""
+        atlas = None
+        if CUSTOMWINDOW_ATLAS_FILE and os.path.exists(CUSTOMWINDOW_ATLAS_FILE):
+            try:
+                atlas = TextureAtlas.load(CUSTOMWINDOW_ATLAS_FILE, self._decode_image)
+            except Exception:
+                atlas = None
+        if atlas is None:
+            images = {}
+            # 內建按鈕圖使用固定 key；images/ 下其他 PNG（自訂標題列按鈕）以檔名（不含副檔名）為 key
+            files = dict((filename, key) for key, filename in self.IMAGE_FILES.items())
+            try:
+                if os.path.isdir(self.images_dir):
+                    for name in sorted(os.listdir(self.images_dir)):
+                        if name.lower().endswith(".png") and name not in files:
+                            files[name] = os.path.splitext(name)[0]
+            except Exception:
+                pass
+            for filename, key in files.items():
+                try:
+                    path = os.path.join(self.images_dir, filename)
+                    if os.path.exists(path):
+                        images[key] = self._decode_image(path)
+                except Exception:
+                    pass
+            icon_path = self._find_icon()
+            if icon_path:
+                try:
+                    images["icon"] = self._decode_image(icon_path)
+                except Exception:
+                    pass
+            images = {key: image for key, image in images.items() if image is not None}
+            atlas = TextureAtlas.pack(images) if images else None
+            # 打包後即釋放各圖的解碼資料 / mmap
+            images.clear()
+        return {"font": self._find_font(), "atlas": atlas}
 
-        # 載入字型（含中文 range 提示）
-        if self.font_path:
+    def _apply_resources(self, res):
+        """套用階段（主執行緒）：載入字型、建立貼圖集貼圖，並把已建立的文字佔位按鈕換成圖片按鈕。"""
+        t0 = time.perf_counter()
+        # 載入字型（full：含中文 range 提示；subset：只含用到的字元）
+        self.font_path = res.get("font")
+        if self.font_path and self.fonts is not None:
+            try:
+                self._collect_glyphs()
+                self.fonts.build(self.font_path, 18)
+            except Exception:
+                pass
+        elif self.font_path:
             try:
                 with dpg.font_registry():
                     try:
@@ -932,49 +3908,92 @@ class UIHandle:
             except Exception:
                 pass
 
-        # 載入按鈕圖片
+        # 按鈕圖片與 icon：單一貼圖，各 sprite 以 UV 取用
+        atlas = res.get("atlas")
         try:
-            self.texture_ids["min_normal"], _, _ = self.load_texture("Minimize_Normal.png")
-            self.texture_ids["min_hover"], _, _ = self.load_texture("Minimize_Hover.png")
-            self.texture_ids["max_normal"], _, _ = self.load_texture("Maximize_Normal.png")
-            self.texture_ids["max_hover"], _, _ = self.load_texture("Maximize_Hover.png")
-            self.texture_ids["close_normal"], _, _ = self.load_texture("Close_Normal.png")
-            self.texture_ids["close_hover"], _, _ = self.load_texture("Close_Hover.png")
-            self.images_ok = all(self.texture_ids.get(k) for k in [
-                "min_normal", "min_hover", "max_normal", "max_hover", "close_normal", "close_hover"
-            ])
+            if atlas is not None:
+                texture = atlas.create_texture()
+                self.atlas = atlas
+                for key in atlas.rects:
+                    self.texture_ids[key] = texture
+            self.images_ok = all(self.texture_ids.get(k) for k in self.IMAGE_FILES)
+            self.icon_tex = self.texture_ids.get("icon")
         except Exception:
             self.images_ok = False
+            self.icon_tex = None
+
+        if self.window_bar.placeholders:
+            self.window_bar.swap_placeholders(self)
+        self.panels.swap_placeholders()
+        self.resources_applied = True
+        self.startup.record("apply_resources", (time.perf_counter() - t0) * 1000.0)
 
-        # 載入 icon 圖示
+    def _collect_glyphs(self, scan_items=False):
+        """subset 模式：收集標題列標籤、UserUI.ui_strings()、語料檔，以及（scan_items 時）所有已建立項目的標籤與字串值。"""
+        fonts = self.fonts
+        fonts.add_text("Title bar text", "-", "口", "x", "■")
         try:
-            if os.path.isdir(self.icon_dir):
-                preferred_icon = None
-                for name in ["icon.png", "icon.jpg", "icon.jpeg", "icon.bmp"]:
-                    p = os.path.join(self.icon_dir, name)
-                    if os.path.exists(p):
-                        preferred_icon = name
-                        break
-                if preferred_icon is None:
-                    for name in os.listdir(self.icon_dir):
-                        if name.lower().endswith((".png", ".jpg", ".jpeg", ".bmp")):
-                            preferred_icon = name
-                            break
-                if preferred_icon:
-                    w, h, c, data = dpg.load_image(os.path.join(self.icon_dir, preferred_icon))
-                    with dpg.texture_registry():
-                        self.icon_tex = dpg.add_static_texture(w, h, data)
+            fonts.add_text(*self.user_ui.ui_strings())
         except Exception:
-            self.icon_tex = None
+            pass
+        if CUSTOMWINDOW_FONT_CORPUS:
+            fonts.add_file(CUSTOMWINDOW_FONT_CORPUS)
+        if scan_items:
+            for item in dpg.get_all_items():
+                try:
+                    fonts.add_text(dpg.get_item_label(item), dpg.get_value(item))
+                except Exception:
+                    pass
+
+    def font_report(self):
+        """字型字元數與估算的字型貼圖集大小（subset 模式另含與 full 模式的比較及實測建立時間）。"""
+        if self.fonts is not None:
+            return self.fonts.report()
+        probe = GlyphSubset()
+        probe.font_path, probe.size = self.font_path, 18
+        report = probe.report()
+        report.update(glyphs=report["full_glyphs"], atlas=report["full_atlas"],
+                      atlas_bytes=report["full_atlas_bytes"], register_ms=None, rebuilds=0)
+        return report
+
+    def save_atlas(self, json_path):
+        """重新打包目前的圖片並輸出預建貼圖集（供 CUSTOMWINDOW_ATLAS_FILE 使用）；請勿輸出到 images/ 內。"""
+        atlas = self._read_resources()["atlas"]
+        if atlas is None or atlas.data is None:
+            return None
+        atlas.save(json_path)
+        return json_path
+
+    def sprite_args(self, key):
+        """建立圖片按鈕用的參數（貼圖集時含 uv_min/uv_max），例如 dpg.add_image_button(**ui.sprite_args("Pin_Normal"))。"""
+        if self.atlas is not None and key in self.atlas:
+            return self.atlas.image_args(key)
+        return {"texture_tag": self.texture_ids.get(key)}
+
+    def sprite_state_args(self, key):
+        """切換既有圖片按鈕狀態用的參數：貼圖集時只改 UV。"""
+        if self.atlas is not None and key in self.atlas:
+            uv_min, uv_max = self.atlas.uv(key)
+            return {"uv_min": uv_min, "uv_max": uv_max}
+        return {"texture_tag": self.texture_ids.get(key)}
+
+    def _load_resources(self):
+        """同步載入所有資源（於建立佈局前呼叫，標題列直接使用圖片按鈕）。"""
+        self._apply_resources(self._read_resources())
+
+    def _load_resources_async(self):
+        """背景執行緒讀取與解碼資源，完成後經 dispatch 於主迴圈套用；期間標題列使用文字佔位按鈕。
+        讀取失敗時仍以空資源套用（保留文字按鈕），套用階段不會遺失。"""
+        def read():
+            try:
+                return self._read_resources()
+            except Exception:
+                return {}
+        return self.run_in_worker(read, on_done=self._apply_resources)
 
     def create_layout(self):
-        # 主題（需要在 context 之後建立）
-        with dpg.theme() as global_theme:
-            with dpg.theme_component(dpg.mvAll):
-                dpg.add_theme_style(dpg.mvStyleVar_WindowPadding, 0, 0)
-                dpg.add_theme_style(dpg.mvStyleVar_WindowBorderSize, 0)
-                dpg.add_theme_style(dpg.mvStyleVar_ItemSpacing, 1, 4)
-        dpg.bind_theme(global_theme)
+        # 全域主題（需要在 context 之後建立；調色盤切換時重新綁定）
+        self.themes.bind_global()
 
         # 建立主視窗與標題列（對齊 GUI_demo 風格）
         with dpg.window(
@@ -995,7 +4014,8 @@ class UIHandle:
                                   width=max(1, vw - 2 * self.resize_overlay.bar_w),
                                   height=max(1, vh - (content_y + self.resize_overlay.bar_w))):
                 # 呼叫用戶自訂的佈局方法
-                self.user_ui.create_layout()
+                with self.startup.phase("UserUI.create_layout"):
+                    self.user_ui.create_layout()
 
             # 在主視窗中建立縮放覆蓋層（位於內容之上、四側邊距可互動）
             self.resize_overlay.build(self, parent_tag="main_window")
@@ -1034,75 +4054,365 @@ class UIHandle:
         with dpg.handler_registry():
             dpg.add_mouse_click_handler(button=0, callback=self.ui_event.on_mouse_click)
             dpg.add_mouse_release_handler(button=0, callback=self.ui_event.on_mouse_release)
+            if self.profiler is not None:
+                dpg.add_key_press_handler(dpg.mvKey_F9, callback=self.profiler.toggle_window)
+            if self.pacer.idle_mode:
+                # 任何輸入都讓閒置模式立即回到全速
+                dpg.add_mouse_move_handler(callback=self.pacer.request_frame)
+                dpg.add_mouse_click_handler(callback=self.pacer.request_frame)
+                dpg.add_mouse_wheel_handler(callback=self.pacer.request_frame)
+                dpg.add_key_press_handler(callback=self.pacer.request_frame)
+
+        # 分析器圖表視窗（預設隱藏，F9 切換）
+        if self.profiler is not None:
+            self.profiler.build_window()
 
     def initialize_gui(self):
         if self.initialized:
             return
+        startup = self.startup
         
-        
-        # DPI 意識設定 (確保像素 1:1)
-        try:
-            # System-DPI aware：支援度高，邏輯簡單
-            ctypes.windll.shcore.SetProcessDpiAwareness(1)
-        except Exception:
-            # 後備：舊版 Windows（如 7/8）
-            try:
-                ctypes.windll.user32.SetProcessDPIAware()
-            except Exception:
-                pass
-        
-                
-        dpg.create_context()
-        # 預載 WinAPI 游標
-        try:
-            self._init_win_cursors()
-        except Exception:
-            pass
+        with startup.phase("initialize_gui"):
+            # DPI 意識設定 (確保像素 1:1)
+            with startup.phase("dpi_awareness"):
+                try:
+                    self.platform.set_dpi_awareness()
+                except Exception:
+                    pass
 
-        # 延後載入資源（字型、圖片、icon）在 context 建立之後
-        try:
-            self._load_resources()
-        except Exception:
-            pass
-        
-        # 建立 viewport
-        dpg.create_viewport(title='Refined UI', width=800, height=600, decorated=False, resizable=True)
-        # 建立 UI 佈局（主視窗與內容）
-        self.create_layout()
-        
-        # 顯示與必要同步
-        dpg.setup_dearpygui()
-        dpg.show_viewport()
-        dpg.set_primary_window("main_window", True)
-        
-        # 對齊 GUI_demo：使用 UIEvent 的 resize callback
-        dpg.set_viewport_resize_callback(self.ui_event.resize_window_callback)
-        self.sync_ui()
-        self.clamp_viewport_to_work_area()
+            with startup.phase("create_context"):
+                dpg.create_context()
+            # 預載 WinAPI 游標
+            with startup.phase("init_cursors"):
+                try:
+                    self._init_win_cursors()
+                except Exception:
+                    pass
+
+            # 延後載入資源（字型、圖片、icon）在 context 建立之後；
+            # 非同步模式下與 viewport 建立並行，首幀不需等待解碼（套用時另記 apply_resources）
+            with startup.phase("load_resources_submit" if CUSTOMWINDOW_ASYNC_RESOURCES else "load_resources"):
+                try:
+                    if CUSTOMWINDOW_ASYNC_RESOURCES:
+                        self._resources_future = self._load_resources_async()
+                    else:
+                        self._load_resources()
+                except Exception:
+                    pass
+
+            # 建立 viewport
+            with startup.phase("create_viewport"):
+                dpg.create_viewport(title='Refined UI', width=800, height=600, decorated=False, resizable=True)
+            # 建立 UI 佈局（主視窗與內容；UserUI.create_layout 另計為巢狀階段）
+            with startup.phase("create_layout"):
+                self.create_layout()
+            # 字元子集：加入佈局中實際出現的標籤/字串（字型已建立時於首幀前補字）
+            if self.fonts is not None:
+                with startup.phase("font_glyphs"):
+                    try:
+                        self._collect_glyphs(scan_items=True)
+                        self.fonts.flush()
+                    except Exception:
+                        pass
+
+            # 顯示與必要同步
+            with startup.phase("setup_dearpygui"):
+                dpg.setup_dearpygui()
+            with startup.phase("show_viewport"):
+                dpg.show_viewport()
+                dpg.set_primary_window("main_window", True)
+
+            # 對齊 GUI_demo：使用 UIEvent 的 resize callback
+            dpg.set_viewport_resize_callback(self.ui_event.resize_window_callback)
+            with startup.phase("sync_ui"):
+                self.sync_ui()
+            with startup.phase("clamp_to_work_area"):
+                self.clamp_viewport_to_work_area()
         self.initialized = True
 
     def handler(self):
+        prof = self.profiler
+        if prof is None:
+            # 每幀只查詢一次滑鼠與 viewport 狀態
+            self.snapshot.capture()
+            if self.recorder is not None:
+                self.recorder.frame(self.snapshot)
+            self.update_logic()
+            # 幀末統一送出本幀累積的幾何變更
+            self.geometry.flush()
+            return
+        t0 = time.perf_counter()
+        self.snapshot.capture()
+        t1 = time.perf_counter()
+        prof.record("snapshot", t1 - t0)
+        if self.recorder is not None:
+            self.recorder.frame(self.snapshot)
         self.update_logic()
+        t2 = time.perf_counter()
+        self.geometry.flush()
+        prof.record("commit", time.perf_counter() - t2)
+
+    def render_frame(self):
+        """繪製一幀（啟用分析器時記錄 render 階段並結束該幀）。"""
+        prof = self.profiler
+        fonts = self.fonts
+        if fonts is not None and fonts.build_pending:
+            # 字型變更後的第一幀包含字型貼圖集建置，記錄其耗時
+            t0 = time.perf_counter()
+            dpg.render_dearpygui_frame()
+            t1 = time.perf_counter()
+            fonts.record_first_frame(t1 - t0)
+            if prof is not None:
+                prof.record("render", t1 - t0)
+                prof.end_frame(t1)
+            return
+        if prof is None:
+            dpg.render_dearpygui_frame()
+            return
+        t0 = time.perf_counter()
+        dpg.render_dearpygui_frame()
+        t1 = time.perf_counter()
+        prof.record("render", t1 - t0)
+        prof.end_frame(t1)
+
+    def _pace(self, active):
+        # 啟用分析器時把 FramePacer 的等待記為 "pace"，不計入幀工作時間
+        prof = self.profiler
+        if prof is None:
+            self.pacer.pace(active)
+            return
+        t0 = time.perf_counter()
+        self.pacer.pace(active)
+        prof.record("pace", time.perf_counter() - t0)
+
+    async def _pace_async(self, active, slice_until=None):
+        prof = self.profiler
+        if prof is None:
+            await self.pacer.pace_async(active, slice_until)
+            return
+        t0 = time.perf_counter()
+        await self.pacer.pace_async(active, slice_until)
+        prof.record("pace", time.perf_counter() - t0)
+
+    def enable_profiler(self, capacity=None, export_path=None):
+        """啟用幀階段分析器（於 initialize_gui 之前呼叫可一併建立 F9 圖表視窗）。"""
+        self.profiler = FrameProfiler(capacity, export_path)
+        return self.profiler
+
+    def invalidate(self):
+        """通知框架內容已變更（UserUI 或背景執行緒更新資料後呼叫），閒置模式下會立即恢復全速。"""
+        self.pacer.request_frame()
+
+    def _pointer_in_viewport(self, mouse_screen, snap, margin=8):
+        x, y = mouse_screen[0] - snap.viewport_pos[0], mouse_screen[1] - snap.viewport_pos[1]
+        return -margin <= x < snap.viewport_w + margin and -margin <= y < snap.viewport_h + margin
+
+    def frame_active(self):
+        """本幀是否有活動：拖曳/縮放、幾何或 viewport 有送出、或游標在視窗內（或剛離開）移動。"""
+        snap = self.snapshot
+        marks = (self.geometry.configure_calls, self.viewport_stats["updates"])
+        changed = marks != self._activity_marks
+        self._activity_marks = marks
+        inside = self._pointer_in_viewport(snap.mouse_screen, snap)
+        moved = snap.mouse_moved and (inside or self._pointer_inside)
+        self._pointer_inside = inside
+        return changed or moved or self.state["dragging"] or self.state["resizing"]
+
+    def _pointer_woke(self):
+        # 閒置等待中輪詢平台游標：在視窗內移動即喚醒（不需繪製就能偵測）
+        if not self.platform.available:
+            return False
+        pos = self.platform.get_cursor_pos()
+        if pos is None:
+            return False
+        snap = self.snapshot
+        prev = snap.mouse_screen
+        if pos[0] == prev[0] and pos[1] == prev[1]:
+            return False
+        return self._pointer_in_viewport(pos, snap) or self._pointer_inside
+
+    def start_trace(self, path):
+        """開始錄製輸入軌跡（見 InputTrace）。"""
+        self.stop_trace()
+        self.recorder = InputRecorder(path)
+        return self.recorder
+
+    def stop_trace(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def loop(self):
         # Initialize GUI
         self.initialize_gui()
+        if CUSTOMWINDOW_TRACE_RECORD:
+            self.start_trace(CUSTOMWINDOW_TRACE_RECORD)
         
         while dpg.is_dearpygui_running():
             
             # Handle per frame
             self.handler()
+
+            # Frame pacing (FPS cap / idle mode)
+            self._pace(self.frame_active())
             
             # Render frame
-            dpg.render_dearpygui_frame()
+            self.render_frame()
+            if not self.startup.done:
+                self._startup_frame()
+        self._shutdown()
+
+    def _startup_frame(self):
+        # 首幀與「資源已套用的首幀」時間（自 UIHandle 建構起算）；兩者皆到齊後列印/輸出啟動報告
+        startup = self.startup
+        elapsed = (time.perf_counter() - startup.t0) * 1000.0
+        if not self._first_frame_done:
+            self._first_frame_done = True
+            startup.record("first_frame", elapsed)
+        if self.resources_applied:
+            startup.record("first_frame_with_resources", elapsed)
+            startup.finish()
+        else:
+            future = self._resources_future
+            if future is not None and future.done() and (future.cancelled() or future.exception() is not None):
+                # 背景載入失敗（不會套用）：不再等待
+                startup.finish()
+
+    def run_in_worker(self, func, *args, on_done=None, **kwargs):
+        """在內建 worker pool 執行 func；完成後 on_done(result) 經由 dispatch 於主迴圈執行。"""
+        if self._workers is None:
+            # 延後匯入：未使用 worker pool 的程式不付出 concurrent.futures 的匯入成本
+            import concurrent.futures
+            self._workers = concurrent.futures.ThreadPoolExecutor(
+                max_workers=CUSTOMWINDOW_WORKER_THREADS, thread_name_prefix="customwindow-worker")
+        future = self._workers.submit(func, *args, **kwargs)
+        if on_done is not None:
+            def _done(f):
+                if not f.cancelled() and f.exception() is None:
+                    self.dispatch.post(on_done, f.result())
+            future.add_done_callback(_done)
+        return future
+
+    def _shutdown(self):
+        if self._workers is not None:
+            self._workers.shutdown(wait=False, cancel_futures=True)
+            self._workers = None
+        if self.profiler is not None:
+            try:
+                self.profiler.export()
+            except Exception:
+                pass
+        self.stop_trace()
         dpg.destroy_context()
 
+    # ---------------------------------------------------------------- asyncio
+    def schedule(self, coro, apply=None):
+        """在目前的事件迴圈執行 coroutine；完成後 apply(result) 於下一幀的幀邏輯之前呼叫。"""
+        import asyncio
+        task = asyncio.get_running_loop().create_task(coro)
+        self._async_tasks.add(task)
+
+        def _done(t):
+            self._async_tasks.discard(t)
+            if t.cancelled() or t.exception() is not None:
+                return
+            if apply is not None:
+                self._async_results.append((apply, t.result()))
+                self.pacer.request_frame()
+        task.add_done_callback(_done)
+        return task
+
+    def _apply_async_results(self):
+        results = self._async_results
+        while results:
+            apply, value = results.popleft()
+            try:
+                apply(value)
+            except Exception:
+                pass
+
+    def _resolve_async_hook(self):
+        """run() 開始時解析一次 UserUI.update_logic_async（不是 coroutine function 則不啟用）。"""
+        hook = getattr(self.user_ui, "update_logic_async", None)
+        if hook is not None:
+            import inspect
+            if not inspect.iscoroutinefunction(hook):
+                hook = None
+        self._async_hook = hook
+        return hook
+
+    def _start_async_hook(self):
+        # UserUI.update_logic_async：每幀最多啟動一次，前一次尚未完成則略過，不讓幀等待 I/O
+        hook = self._async_hook
+        if hook is None:
+            return
+        if self._async_hook_task is not None and not self._async_hook_task.done():
+            return
+        self._async_hook_task = self.schedule(hook())
+
+    def _vsync_on(self):
+        try:
+            return bool(dpg.get_viewport_configuration(0).get("vsync", False))
+        except Exception:
+            return False
+
+    async def run(self, frame_budget=None):
+        """loop() 的 asyncio 版本：每幀作為事件迴圈中的一步，幀預算內剩餘的時間讓給其他 task。"""
+        budget = CUSTOMWINDOW_ASYNC_FRAME_BUDGET if frame_budget is None else frame_budget
+        self.initialize_gui()
+        if CUSTOMWINDOW_TRACE_RECORD:
+            self.start_trace(CUSTOMWINDOW_TRACE_RECORD)
+        self._resolve_async_hook()
+        # 幀預算只在 run() 期間作為 FPS 上限；vsync 開啟時 render 已等待垂直同步，不另設上限（避免每幀等待兩次），
+        # 改為在 render 之前把距下次垂直同步的剩餘時間（扣除 render 保留量）讓給事件迴圈
+        pacer = self.pacer
+        prev_cap = pacer.fps_cap
+        budget_cap = 0.0
+        vsync = budget > 0 and self._vsync_on()
+        if prev_cap <= 0 and budget > 0 and not vsync:
+            budget_cap = pacer.fps_cap = 1.0 / budget
+        frame_start = time.perf_counter()
+        try:
+            while dpg.is_dearpygui_running():
+                # 套用上一幀之後完成的 coroutine 結果
+                self._apply_async_results()
+                self.handler()
+                self._start_async_hook()
+                slice_until = pacer.vsync_slice_end(frame_start, budget) if vsync else None
+                await self._pace_async(self.frame_active(), slice_until)
+                self.render_frame()
+                if vsync:
+                    now = time.perf_counter()
+                    pacer.vsync_frame_done(now - frame_start)
+                    frame_start = now
+                if not self.startup.done:
+                    self._startup_frame()
+        finally:
+            if budget_cap and pacer.fps_cap == budget_cap:
+                pacer.fps_cap = prev_cap
+            for task in list(self._async_tasks):
+                task.cancel()
+            self._shutdown()
+
+
+_IMPORT_MS = (time.perf_counter() - _IMPORT_START) * 1000.0
+
+# 單一 UI 實例於首次存取 UIInstance 時才建立，匯入本模組（工具、測試）不會建構 UIHandle
+_ui_instance = None
+
+def get_ui_instance():
+    global _ui_instance
+    if _ui_instance is None:
+        _ui_instance = UIHandle()
+    return _ui_instance
 
-# 建立單一 UI 實例並提供 main 入口
-UIInstance = UIHandle()
+def __getattr__(name):
+    if name == "UIInstance":
+        return get_ui_instance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def main():
-    UIInstance.loop()
+    get_ui_instance().loop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
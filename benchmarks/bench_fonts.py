@@ -0,0 +1,65 @@
+"""Font glyph-range report: full Chinese range vs. the used-character subset.
+
+Uses the real Dear PyGui (headless, no viewport shown) to register the font both
+ways and prints the glyph count, the estimated font-atlas size and the
+registration time of each. Rasterisation happens on the first rendered frame;
+in the app `ui.font_report()["first_frame_ms"]` reports it for subset mode.
+
+    python benchmarks/bench_fonts.py                              # font found in fonts/
+    python benchmarks/bench_fonts.py C:/Windows/Fonts/msjh.ttc --corpus strings.txt
+"""
+import argparse
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("font", nargs="?", help="font file (default: the one UIHandle would load)")
+    parser.add_argument("--size", type=int, default=18)
+    parser.add_argument("--corpus", help="UTF-8 text file whose characters are added to the subset")
+    args = parser.parse_args(argv)
+
+    try:
+        import dearpygui.dearpygui as dpg
+    except ImportError:
+        print("bench_fonts needs the real dearpygui package")
+        return 2
+    import CustomWindow as cw
+
+    ui = cw.UIHandle()
+    font = args.font or ui._find_font()
+    if not font:
+        print("no font found")
+        return 2
+    dpg.create_context()
+
+    t0 = time.perf_counter()
+    with dpg.font_registry():
+        with dpg.font(font, args.size):
+            dpg.add_font_range_hint(dpg.mvFontRangeHint_Default)
+            dpg.add_font_range_hint(dpg.mvFontRangeHint_Chinese_Full)
+    full_ms = (time.perf_counter() - t0) * 1000.0
+
+    subset = cw.GlyphSubset(topup=False)
+    subset.add_text("Title bar text", "-", "口", "x", "■", "0")
+    if args.corpus:
+        subset.add_file(args.corpus)
+    subset.build(font, args.size)
+    report = subset.report()
+
+    print(f"font: {font} @ {args.size}px")
+    print(f"{'mode':8s} {'glyphs':>8s} {'atlas (est.)':>14s} {'atlas MB':>9s} {'register ms':>12s}")
+    print(f"{'full':8s} {report['full_glyphs']:8d} {'%dx%d' % tuple(report['full_atlas']):>14s} "
+          f"{report['full_atlas_bytes'] / 2 ** 20:9.1f} {full_ms:12.2f}")
+    print(f"{'subset':8s} {report['glyphs']:8d} {'%dx%d' % tuple(report['atlas']):>14s} "
+          f"{report['atlas_bytes'] / 2 ** 20:9.1f} {report['register_ms']:12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
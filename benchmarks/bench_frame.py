@@ -0,0 +1,391 @@
+"""Headless benchmarks for CustomWindow's per-frame hot paths.
+
+Runs against `recording_dpg` (a recording stand-in for dearpygui) and
+`FakeBackend` (scripted cursor + synthetic monitor), so it needs neither a
+display nor Windows. For every scenario it reports ns per frame/call and the
+number of Dear PyGui calls per frame, and exits non-zero when either exceeds
+the stored baseline (ns are scaled by a fixed calibration workload timed next
+to each scenario, so the baseline stays meaningful on a different or busier
+machine) or when a call listed in `EXACT_CALLS` is not made exactly the
+required number of times per frame.
+
+    python benchmarks/bench_frame.py                    # compare with baseline.json
+    python benchmarks/bench_frame.py --update-baseline  # rewrite baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import recording_dpg
+
+FAKE = recording_dpg.install()
+
+import CustomWindow as cw  # noqa: E402  (must follow recording_dpg.install())
+
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+SCREEN = {"x": 0, "y": 0, "w": 1920, "h": 1080}
+WORK_AREA = {"x": 0, "y": 0, "w": 1920, "h": 1040}
+VIEWPORT = (200, 140, 800, 600)
+
+
+class BenchUserUI(cw.UserUI):
+    """不含除錯 HUD 的最小佈局：HUD 依時間限頻，會讓每幀呼叫數不穩定。"""
+
+    def create_layout(self):
+        dpg = FAKE
+        dpg.add_button(label="0", tag="toggle_btn")
+
+
+def make_ui():
+    """建立一個已完成佈局、位於 VIEWPORT 的 UIHandle 與其 FakeBackend。"""
+    x, y, w, h = VIEWPORT
+    FAKE.items.clear()
+    FAKE.hovered.clear()
+    FAKE.viewport.update({"x_pos": x, "y_pos": y, "width": w, "height": h})
+    ui = cw.UIHandle()
+    ui.user_ui = BenchUserUI(ui)
+    ui.image_cache = None
+    fb = cw.FakeBackend((x + w // 2, y + h // 2), cw.FakeMonitorSource([(SCREEN, WORK_AREA)]))
+    ui.set_platform_backend(fb)
+    ui._init_win_cursors()
+    ui._load_resources()
+    ui.create_layout()
+    ui.sync_ui()
+    for _ in range(3):
+        ui.handler()
+    return ui, fb
+
+
+# --------------------------------------------------------------------- scenarios
+# 每個情境回傳 step(i)；一次 step 即為量測的一幀/一次呼叫
+
+def scenario_idle(ui, fb):
+    def step(i):
+        ui.handler()
+    return step
+
+
+class NoCursorBackend(cw.FakeBackend):
+    """平台不提供游標座標（Linux/macOS）：滑鼠螢幕座標改由 Dear PyGui 的 viewport 設定換算。"""
+
+    def get_cursor_pos(self):
+        return None
+
+
+def scenario_idle_no_cursor_api(ui, fb):
+    ui.set_platform_backend(NoCursorBackend(monitors=fb.monitors))
+
+    def step(i):
+        ui.handler()
+    return step
+
+
+def scenario_drag(ui, fb):
+    x, y, w, h = VIEWPORT
+    fb.cursor_pos = [x + w // 2, y + 20]
+    ui.snapshot.capture()
+    ui.ui_event.on_title_press(None, None, None)
+
+    def step(i):
+        fb.cursor_pos[0] += 1 if i & 1 else -1
+        ui.handler()
+    return step
+
+
+def make_resize_scenario(direction, mode="live"):
+    def scenario(ui, fb):
+        ui.live_resize = mode
+        ui.snapshot.capture()
+        snap = ui.snapshot
+        ui.ui_event._start_resize(direction, snap.mouse_screen, snap.viewport_pos,
+                                  [snap.viewport_w, snap.viewport_h])
+
+        def step(i):
+            d = 2 if i & 1 else -2
+            fb.cursor_pos[0] += d
+            fb.cursor_pos[1] += d
+            ui.handler()
+        return step
+    return scenario
+
+
+def scenario_sync_ui(ui, fb):
+    def step(i):
+        ui.snapshot.set_viewport_rect(VIEWPORT[0], VIEWPORT[1], VIEWPORT[2] + (i & 1), VIEWPORT[3])
+        ui.sync_ui()
+        ui.geometry.flush()
+    return step
+
+
+def scenario_clamp(ui, fb):
+    def step(i):
+        # 交替：超出工作區（需夾取）/ 已在工作區內（不需送出）
+        FAKE.viewport["x_pos"] = 1500 if i & 1 else VIEWPORT[0]
+        ui.snapshot.capture()
+        ui.clamp_viewport_to_work_area()
+    return step
+
+
+MONITORS_3 = [
+    ({"x": -1280, "y": 0, "w": 1280, "h": 1024}, {"x": -1280, "y": 0, "w": 1280, "h": 1024}),
+    (SCREEN, WORK_AREA),
+    ({"x": 1920, "y": 0, "w": 2560, "h": 1440}, {"x": 1920, "y": 0, "w": 2560, "h": 1400}),
+]
+
+
+def scenario_clamp_span(ui, fb):
+    # 三螢幕：交替跨越兩螢幕（可保留）/ 落在工作區外（需夾取）
+    ui.sys.set_monitor_source(cw.FakeMonitorSource(MONITORS_3, [96, 96, 144]))
+
+    def step(i):
+        FAKE.viewport["x_pos"] = 1700 if i & 1 else 4200
+        ui.snapshot.capture()
+        ui.clamp_viewport_to_work_area()
+    return step
+
+
+def scenario_mouse_click(ui, fb):
+    x, y, w, h = VIEWPORT
+    fb.cursor_pos = [x + w - 2, y + h // 2]
+
+    def step(i):
+        ui.snapshot.capture()
+        ui.ui_event.on_mouse_click()
+        ui.state["resizing"] = False
+    return step
+
+
+def scenario_toggle_maximize(ui, fb):
+    def step(i):
+        ui.snapshot.capture()
+        ui.ui_event.toggle_maximize()
+    return step
+
+
+def scenario_panel_click(ui, fb):
+    # 60 個重疊面板：每次點擊經空間索引找出最上層面板並分類區域
+    for i in range(60):
+        ui.panels.create(f"p{i}", rect=(20 + (i % 10) * 60, 40 + (i // 10) * 80, 200, 150))
+    ui.geometry.flush()
+    x, y, w, h = VIEWPORT
+
+    def step(i):
+        fb.cursor_pos = [x + 20 + (i * 37) % 740, y + 40 + (i * 53) % 540]
+        ui.snapshot.capture()
+        ui.panels.on_mouse_click()
+        ui.panels.on_mouse_release()
+    return step
+
+
+def scenario_layout_resize(ui, fb):
+    # 300 個元件的儀表板（三欄 x 100 列，anchor + 百分比）：每幀改變 viewport 寬度
+    layout = ui.layout
+    for col, dock in enumerate(("left", "right", "fill")):
+        column = f"col{col}"
+        FAKE.add_child_window(tag=column)
+        layout.add(column, dock=dock, size="33%" if dock != "fill" else None)
+        for row in range(100):
+            tag = f"w{col}_{row}"
+            FAKE.add_button(tag=tag)
+            layout.add(tag, parent=column, left=4, right=4, top=row * 26, height=24)
+    ui.sync_ui()
+    ui.geometry.flush()
+
+    def step(i):
+        ui.snapshot.set_viewport_rect(VIEWPORT[0], VIEWPORT[1], VIEWPORT[2] + (i & 7), VIEWPORT[3])
+        ui.sync_ui()
+        ui.geometry.flush()
+    return step
+
+
+SCENARIOS = {
+    "update_logic_idle": scenario_idle,
+    "update_logic_idle_no_cursor_api": scenario_idle_no_cursor_api,
+    "update_logic_drag": scenario_drag,
+}
+for _direction in cw.HitTester.RESIZE_REGIONS:
+    SCENARIOS[f"update_logic_resize_{_direction}"] = make_resize_scenario(_direction)
+# 延後內容重排的縮放模式（只以右下角 corner 量測）
+SCENARIOS["update_logic_resize_corner_outline"] = make_resize_scenario("corner", "outline")
+SCENARIOS["update_logic_resize_corner_hybrid"] = make_resize_scenario("corner", "hybrid")
+SCENARIOS.update({
+    "sync_ui": scenario_sync_ui,
+    "clamp_viewport_to_work_area": scenario_clamp,
+    "clamp_span_3_monitors": scenario_clamp_span,
+    "on_mouse_click": scenario_mouse_click,
+    "toggle_maximize": scenario_toggle_maximize,
+    "panel_click_60": scenario_panel_click,
+    "layout_resize_300": scenario_layout_resize,
+})
+
+# 每幀必須剛好呼叫這些 DPG 函式這麼多次（不受 baseline 更新影響）
+EXACT_CALLS = {
+    # 快照每幀只查詢一次 viewport 設定，滑鼠換算共用同一份結果
+    "update_logic_idle_no_cursor_api": {"get_viewport_configuration": 1, "get_mouse_pos": 1},
+}
+
+
+# ------------------------------------------------------------------------ runner
+
+def measure(name, frames, repeats, block=100):
+    """回傳 (ns/frame, DPG 呼叫數/frame, 各函式呼叫數/frame)。
+
+    ns/frame 取所有 repeat 中最快的 block（每 block 個 frame 計時一次），
+    降低共用機器上排程干擾的影響；呼叫數則以整段量測平均。
+    """
+    best_ns = None
+    calls = None
+    by_name = {}
+    for _ in range(repeats):
+        ui, fb = make_ui()
+        step = SCENARIOS[name](ui, fb)
+        for i in range(min(frames, 50)):
+            step(i)
+        FAKE.reset_calls()
+        i = 0
+        while i < frames:
+            n = min(block, frames - i)
+            t0 = time.perf_counter_ns()
+            for j in range(i, i + n):
+                step(j)
+            per_frame = (time.perf_counter_ns() - t0) / n
+            best_ns = per_frame if best_ns is None else min(best_ns, per_frame)
+            i += n
+        run_calls = FAKE.total_calls() / frames
+        calls = run_calls if calls is None else max(calls, run_calls)
+        for func, count in FAKE.calls.items():
+            by_name[func] = max(by_name.get(func, 0.0), count / frames)
+    return best_ns, calls, by_name
+
+
+def calibrate(rounds=20):
+    """固定的純 Python 工作量（ns/次），用來把 baseline 換算到目前機器的速度。"""
+    def work():
+        d = {}
+        for k in range(200):
+            d[k & 15] = d.get(k & 15, 0) + k
+        return d
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        for _ in range(50):
+            work()
+        per = (time.perf_counter_ns() - t0) / 50
+        best = per if best is None else min(best, per)
+    return best
+
+
+def compare(results, baseline, ns_tolerance):
+    failures = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        # 以同時量測的校準工作量換算 baseline，讓不同機器/負載下的 ns 比較仍有意義
+        limit = base["ns_per_frame"]
+        if base.get("calibration_ns"):
+            limit *= res["calibration_ns"] / base["calibration_ns"]
+        if res["ns_per_frame"] > limit * (1.0 + ns_tolerance):
+            failures.append(f"{name}: {res['ns_per_frame']:.0f} ns/frame > baseline "
+                            f"{limit:.0f} (+{ns_tolerance:.0%})")
+        if res["dpg_calls_per_frame"] > base["dpg_calls_per_frame"] + 1e-9:
+            failures.append(f"{name}: {res['dpg_calls_per_frame']:.2f} DPG calls/frame > baseline "
+                            f"{base['dpg_calls_per_frame']:.2f}")
+    return failures
+
+
+def check_exact(name, res):
+    failures = []
+    for func, expected in EXACT_CALLS.get(name, {}).items():
+        got = res["calls_by_name"].get(func, 0.0)
+        if abs(got - expected) > 1e-9:
+            failures.append(f"{name}: {func} called {got:.2f} times/frame, expected exactly {expected}")
+    return failures
+
+
+def run_scenario(name, frames, repeats):
+    calibration = calibrate()
+    ns, calls, by_name = measure(name, frames, repeats)
+    return {"ns_per_frame": round(ns, 1), "dpg_calls_per_frame": round(calls, 3),
+            "calibration_ns": round(calibration, 1),
+            "calls_by_name": {func: round(by_name.get(func, 0.0), 3) for func in EXACT_CALLS.get(name, {})}}
+
+
+def relative(res):
+    return res["ns_per_frame"] / res["calibration_ns"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--ns-tolerance", type=float, default=0.5,
+                        help="allowed ns/frame growth over baseline (0.5 = +50%%)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="re-measure a scenario this many times before reporting a ns regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--passes", type=int, default=3,
+                        help="with --update-baseline: keep the slowest of this many passes per scenario")
+    parser.add_argument("-k", dest="only", default=None, help="only run scenarios containing this text")
+    args = parser.parse_args(argv)
+    names = [name for name in SCENARIOS if not args.only or args.only in name]
+
+    baseline = {}
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = []
+    print(f"{'scenario':40s} {'ns/frame':>10s} {'dpg calls/frame':>16s}")
+    for name in names:
+        res = run_scenario(name, args.frames, args.repeats)
+        if args.update_baseline:
+            # baseline 取多次中（換算後）最慢的一次，避免一次幸運的量測讓之後的比較誤報
+            for _ in range(args.passes - 1):
+                again = run_scenario(name, args.frames, args.repeats)
+                if relative(again) > relative(res):
+                    res = again
+        elif name in baseline:
+            found = compare({name: res}, baseline, args.ns_tolerance)
+            for _ in range(args.retries):
+                if not found:
+                    break
+                # 計時受排程干擾時重量測；呼叫數是確定值，重測也不會改變
+                again = run_scenario(name, args.frames, args.repeats)
+                if relative(again) < relative(res):
+                    res = again
+                found = compare({name: res}, baseline, args.ns_tolerance)
+            failures.extend(found)
+        failures.extend(check_exact(name, res))
+        res.pop("calls_by_name")
+        results[name] = res
+        print(f"{name:40s} {res['ns_per_frame']:10.0f} {res['dpg_calls_per_frame']:16.2f}")
+
+    if args.update_baseline:
+        if failures:
+            for line in failures:
+                print("REGRESSION " + line)
+            return 1
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("no baseline found; run with --update-baseline")
+    for line in failures:
+        print("REGRESSION " + line)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
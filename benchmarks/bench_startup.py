@@ -0,0 +1,147 @@
+"""Startup resource-loading benchmark: no cache vs cold vs warm decoded-image cache.
+
+Every measurement runs in a fresh process (so the peak RSS is its own) with the
+real Dear PyGui, loads the title-bar resources synchronously and reports the
+load time and the peak resident set size.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --synthetic 24 --size 512   # add 24 generated 512x512 PNGs
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def peak_rss_kb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 回報 bytes，Linux 回報 KB
+        return peak // 1024 if sys.platform == "darwin" else peak
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset // 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def current_rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        return None
+
+
+def child(mode, cache_dir, images_dir):
+    sys.path.insert(0, ROOT)
+    import dearpygui.dearpygui as dpg
+    import CustomWindow as cw
+
+    dpg.create_context()
+    ui = cw.UIHandle()
+    if images_dir:
+        ui.images_dir = images_dir
+    ui.image_cache = cw.ImageCache(cache_dir) if mode != "nocache" else None
+    rss_before = peak_rss_kb()
+    t0 = time.perf_counter()
+    ui._load_resources()
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    result = {
+        "mode": mode,
+        "load_ms": elapsed * 1000.0,
+        "rss_before_kb": rss_before,
+        "peak_rss_kb": peak_rss_kb(),
+        "rss_after_kb": current_rss_kb(),
+        "sprites": len(ui.atlas.rects) if ui.atlas else 0,
+        "cache": ui.image_cache.get_stats() if ui.image_cache else None,
+    }
+    # 無 viewport 時 destroy_context 會使 Dear PyGui 崩潰；子行程直接結束即可
+    print(json.dumps(result))
+
+
+def make_synthetic(images_dir, count, size):
+    """複製內建圖片並產生 count 張 size x size 的 PNG（模擬大量自訂按鈕圖）。"""
+    import dearpygui.dearpygui as dpg
+    from array import array
+
+    shutil.copytree(os.path.join(ROOT, "images"), images_dir)
+    dpg.create_context()
+    for i in range(count):
+        pixels = array("f", ((x * 7 + i * 13) % 256 for x in range(size * size * 4)))
+        dpg.save_image(os.path.join(images_dir, f"Synthetic_{i:03d}.png"), size, size, pixels, components=4)
+
+
+def run(mode, cache_dir, images_dir):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, "--cache-dir", cache_dir,
+                          "--images-dir", images_dir or ""], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, default=0, help="number of generated PNGs to add")
+    parser.add_argument("--size", type=int, default=256, help="edge length of generated PNGs")
+    parser.add_argument("--child", choices=("nocache", "cold", "warm"))
+    parser.add_argument("--cache-dir", default="")
+    parser.add_argument("--images-dir", default="")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.cache_dir, args.images_dir or None)
+        return 0
+
+    try:
+        import dearpygui.dearpygui  # noqa: F401
+    except ImportError:
+        print("bench_startup needs the real dearpygui package")
+        return 2
+
+    work = tempfile.mkdtemp(prefix="customwindow-bench-")
+    try:
+        images_dir = ""
+        if args.synthetic:
+            images_dir = os.path.join(work, "images")
+            make_synthetic(images_dir, args.synthetic, args.size)
+        cache_dir = os.path.join(work, "cache")
+        rows = {"nocache": [], "cold": [], "warm": []}
+        for _ in range(args.runs):
+            rows["nocache"].append(run("nocache", cache_dir, images_dir))
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            rows["cold"].append(run("cold", cache_dir, images_dir))
+            rows["warm"].append(run("warm", cache_dir, images_dir))
+
+        print(f"{'mode':8s} {'load ms (median)':>17s} {'peak RSS MB':>12s} {'peak growth MB':>15s} "
+              f"{'RSS after MB':>13s} {'sprites':>8s}")
+        for mode, results in rows.items():
+            load = sorted(r["load_ms"] for r in results)[len(results) // 2]
+            peak = max(r["peak_rss_kb"] or 0 for r in results) / 1024.0
+            growth = max((r["peak_rss_kb"] or 0) - (r["rss_before_kb"] or 0) for r in results) / 1024.0
+            after = max(r["rss_after_kb"] or 0 for r in results) / 1024.0
+            print(f"{mode:8s} {load:17.2f} {peak:12.1f} {growth:15.1f} {after:13.1f} {results[0]['sprites']:8d}")
+        print(f"warm cache hits: {rows['warm'][-1]['cache']['hits']}, misses: {rows['warm'][-1]['cache']['misses']}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Recording stand-in for `dearpygui.dearpygui` used by the headless benchmarks.
+
+It keeps just enough state (viewport rect, item properties, mouse position)
+for CustomWindow's per-frame paths to run without a GPU or display, and counts
+every call so the benchmarks can report DPG calls per frame.
+"""
+import itertools
+import sys
+import types
+from collections import Counter
+
+
+class _Context:
+    """`with dpg.window(...)` style containers: create the item and do nothing else."""
+
+    def __init__(self, owner, tag):
+        self.owner = owner
+        self.tag = tag
+
+    def __enter__(self):
+        return self.tag
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RecordingDPG(types.ModuleType):
+    """Module object that records calls and answers the queries CustomWindow makes."""
+
+    # Functions used as `with dpg.xxx(...):`
+    CONTAINERS = {
+        "window", "child_window", "group", "table", "table_row", "table_cell",
+        "theme", "theme_component", "handler_registry", "item_handler_registry",
+        "texture_registry", "font_registry", "font", "plot", "plot_axis", "viewport_drawlist",
+    }
+
+    def __init__(self):
+        super().__init__("dearpygui.dearpygui")
+        self.calls = Counter()
+        self.items = {}
+        self.viewport = {"x_pos": 0, "y_pos": 0, "width": 800, "height": 600}
+        self.mouse_pos = [0, 0]
+        self.hovered = set()
+        self.maximized = False
+        self.frames_left = 0
+        self._ids = itertools.count(1000)
+        self._constants = {}
+
+    # ------------------------------------------------------------------ infra
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    def _record(self, name):
+        self.calls[name] += 1
+
+    def _new_item(self, kwargs):
+        tag = kwargs.get("tag") or next(self._ids)
+        props = {"show": True, "pos": [0, 0], "width": 0, "height": 0}
+        props.update(kwargs)
+        self.items[tag] = props
+        return tag
+
+    def __getattr__(self, name):
+        # mv* 常數：回傳穩定的整數
+        if name.startswith("mv"):
+            return self._constants.setdefault(name, len(self._constants) + 1)
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        if name in RecordingDPG.CONTAINERS:
+            def container(*args, **kwargs):
+                self._record(name)
+                return _Context(self, self._new_item(kwargs))
+            func = container
+        elif name.startswith(("add_", "draw_")):
+            def add(*args, **kwargs):
+                self._record(name)
+                return self._new_item(kwargs)
+            func = add
+        else:
+            def generic(*args, **kwargs):
+                self._record(name)
+                return None
+            func = generic
+        setattr(self, name, func)
+        return func
+
+    # --------------------------------------------------------------- viewport
+    def create_viewport(self, **kwargs):
+        self._record("create_viewport")
+        self.viewport["width"] = kwargs.get("width", self.viewport["width"])
+        self.viewport["height"] = kwargs.get("height", self.viewport["height"])
+
+    def get_viewport_configuration(self, item=0):
+        self._record("get_viewport_configuration")
+        return dict(self.viewport)
+
+    def configure_viewport(self, item=0, **kwargs):
+        self._record("configure_viewport")
+        self.viewport.update(kwargs)
+
+    def get_viewport_pos(self):
+        self._record("get_viewport_pos")
+        return [self.viewport["x_pos"], self.viewport["y_pos"]]
+
+    def get_viewport_width(self):
+        self._record("get_viewport_width")
+        return self.viewport["width"]
+
+    def get_viewport_height(self):
+        self._record("get_viewport_height")
+        return self.viewport["height"]
+
+    def get_viewport_platform_handle(self):
+        self._record("get_viewport_platform_handle")
+        return 0
+
+    def maximize_viewport(self):
+        self._record("maximize_viewport")
+        self.maximized = True
+        self.viewport.update({"x_pos": 0, "y_pos": 0, "width": 1920, "height": 1040})
+
+    def is_dearpygui_running(self):
+        self._record("is_dearpygui_running")
+        self.frames_left -= 1
+        return self.frames_left >= 0
+
+    # ------------------------------------------------------------------ items
+    def does_item_exist(self, item):
+        self._record("does_item_exist")
+        return item in self.items
+
+    def configure_item(self, item, **kwargs):
+        self._record("configure_item")
+        self.items.setdefault(item, {}).update(kwargs)
+
+    def get_item_configuration(self, item):
+        self._record("get_item_configuration")
+        return dict(self.items.get(item, {}))
+
+    def get_item_width(self, item):
+        self._record("get_item_width")
+        return self.items.get(item, {}).get("width", 0)
+
+    def get_item_height(self, item):
+        self._record("get_item_height")
+        return self.items.get(item, {}).get("height", 0)
+
+    def get_item_pos(self, item):
+        self._record("get_item_pos")
+        return list(self.items.get(item, {}).get("pos", [0, 0]))
+
+    def is_item_shown(self, item):
+        self._record("is_item_shown")
+        return self.items.get(item, {}).get("show", True)
+
+    def is_item_hovered(self, item):
+        self._record("is_item_hovered")
+        return item in self.hovered
+
+    def show_item(self, item):
+        self._record("show_item")
+        self.items.setdefault(item, {})["show"] = True
+
+    def hide_item(self, item):
+        self._record("hide_item")
+        self.items.setdefault(item, {})["show"] = False
+
+    def set_value(self, item, value):
+        self._record("set_value")
+        self.items.setdefault(item, {})["value"] = value
+
+    def get_value(self, item):
+        self._record("get_value")
+        return self.items.get(item, {}).get("value")
+
+    def get_mouse_pos(self, local=True):
+        self._record("get_mouse_pos")
+        return list(self.mouse_pos)
+
+    def load_image(self, path):
+        self._record("load_image")
+        # 1x1 RGBA：讓圖片按鈕路徑（hover 貼圖切換）也被量測
+        return 1, 1, 4, [1.0, 1.0, 1.0, 1.0]
+
+
+def install():
+    """Register a fresh RecordingDPG as `dearpygui.dearpygui` and return it.
+
+    Must run before CustomWindow is imported.
+    """
+    fake = RecordingDPG()
+    package = types.ModuleType("dearpygui")
+    package.dearpygui = fake
+    sys.modules["dearpygui"] = package
+    sys.modules["dearpygui.dearpygui"] = fake
+    return fake
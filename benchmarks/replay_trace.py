@@ -0,0 +1,119 @@
+"""Replay a recorded input trace headlessly through the real handlers.
+
+A trace (see `InputTrace` in CustomWindow.py) is recorded by setting
+`CUSTOMWINDOW_TRACE_RECORD` or calling `ui.start_trace(path)`. Replaying it
+reports the replay time, the final viewport geometry and every viewport update
+issued; with `--check` it also acts as a golden test.
+
+    python benchmarks/replay_trace.py benchmarks/traces/drag_resize.cwtrace
+    python benchmarks/replay_trace.py benchmarks/traces/drag_resize.cwtrace --check benchmarks/traces/drag_resize.golden.json
+    python benchmarks/replay_trace.py benchmarks/traces/drag_resize.cwtrace --update-golden benchmarks/traces/drag_resize.golden.json
+    python benchmarks/replay_trace.py --make-sample benchmarks/traces/drag_resize.cwtrace
+"""
+import argparse
+import json
+import os
+import sys
+
+from bench_frame import FAKE, VIEWPORT, cw, make_ui
+
+
+def make_sample(path):
+    """以 FakeBackend 腳本化一段拖曳 + 右下角縮放 + 最大化/還原，並用 InputRecorder 錄下。"""
+    ui, fb = make_ui()
+    ui.start_trace(path)
+    x, y, w, h = VIEWPORT
+
+    def frames(n, dx=0, dy=0):
+        for _ in range(n):
+            fb.cursor_pos[0] += dx
+            fb.cursor_pos[1] += dy
+            ui.handler()
+
+    fb.cursor_pos = [x + w // 2, y + 20]
+    frames(3)
+    ui.ui_event.on_title_press(None, None, None)
+    frames(60, 3, 1)
+    ui.ui_event.on_mouse_release()
+    frames(5)
+    fb.cursor_pos = [int(ui.snapshot.viewport_pos[0]) + w - 2, int(ui.snapshot.viewport_pos[1]) + h - 2]
+    frames(2)
+    ui.ui_event.on_mouse_click()
+    frames(40, 4, 3)
+    ui.ui_event.on_mouse_release()
+    frames(5)
+    ui.ui_event.on_resize_press(None, None, "left")
+    frames(20, -2, 0)
+    ui.ui_event.on_mouse_release()
+    frames(3)
+    ui.ui_event.toggle_maximize()
+    frames(3)
+    ui.ui_event.toggle_maximize()
+    frames(3)
+    ui.stop_trace()
+    return path
+
+
+def replay(path):
+    records = cw.InputTrace.read(path)
+    ui, _ = make_ui()
+    FAKE.reset_calls()
+    result = cw.TraceReplayer(ui).run(records)
+    result["dpg_calls"] = FAKE.total_calls()
+    return result
+
+
+def golden_view(result):
+    """黃金比對只看確定性的部分（不含耗時）。"""
+    return {key: result[key] for key in ("frames", "events", "final_geometry", "viewport_updates", "mismatches")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", nargs="?")
+    parser.add_argument("--check", metavar="GOLDEN", help="fail if the replay differs from this golden JSON")
+    parser.add_argument("--update-golden", metavar="GOLDEN", help="write the replay result as golden JSON")
+    parser.add_argument("--make-sample", metavar="PATH", help="record a scripted drag/resize/maximize trace")
+    args = parser.parse_args(argv)
+
+    if args.make_sample:
+        make_sample(args.make_sample)
+        print(f"sample trace written: {args.make_sample} ({os.path.getsize(args.make_sample)} bytes)")
+        if not args.trace:
+            return 0
+    if not args.trace:
+        parser.error("trace path required")
+
+    result = replay(args.trace)
+    frames = max(result["frames"], 1)
+    print(f"records:          {result['records']}")
+    print(f"frames / events:  {result['frames']} / {result['events']}")
+    print(f"recorded time:    {result['recorded_s'] * 1000:.1f} ms")
+    print(f"replay time:      {result['elapsed_s'] * 1000:.2f} ms ({result['elapsed_s'] * 1e9 / frames:.0f} ns/frame)")
+    print(f"dpg calls:        {result['dpg_calls']} ({result['dpg_calls'] / frames:.2f}/frame)")
+    print(f"viewport updates: {len(result['viewport_updates'])}")
+    print(f"final geometry:   {result['final_geometry']}")
+    print(f"mismatches:       {result['mismatches']}")
+
+    if args.update_golden:
+        golden = golden_view(result)
+        updates = golden.pop("viewport_updates")
+        with open(args.update_golden, "w", encoding="utf-8") as f:
+            # 每筆 viewport 更新一行，方便 diff
+            body = json.dumps(golden, indent=1)[:-2]
+            f.write(body + ',\n "viewport_updates": [\n  ')
+            f.write(",\n  ".join(json.dumps(u) for u in updates))
+            f.write("\n ]\n}\n")
+        print(f"golden written: {args.update_golden}")
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            golden = json.load(f)
+        if golden_view(result) != golden:
+            print(f"GOLDEN MISMATCH against {args.check}")
+            return 1
+        print("golden ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
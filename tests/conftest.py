@@ -0,0 +1,66 @@
+"""Shared fixtures: every test runs against the recording Dear PyGui stand-in.
+
+`recording_dpg.install()` registers the stand-in as `dearpygui.dearpygui`
+before CustomWindow is imported, so the whole suite runs headless.
+`make_ui` builds a laid-out UIHandle on a FakeBackend with a single monitor.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import recording_dpg  # noqa: E402
+
+FAKE = recording_dpg.install()
+
+import CustomWindow as cw  # noqa: E402  (must follow recording_dpg.install())
+
+SCREEN = {"x": 0, "y": 0, "w": 1920, "h": 1080}
+WORK_AREA = {"x": 0, "y": 0, "w": 1920, "h": 1040}
+VIEWPORT = (200, 140, 800, 600)
+
+
+def area(x, y, w, h):
+    return {"x": x, "y": y, "w": w, "h": h}
+
+
+class MinimalUserUI(cw.UserUI):
+    """不含除錯 HUD 的最小佈局：HUD 依時間限頻，會讓呼叫數不穩定。"""
+
+    def create_layout(self):
+        FAKE.add_button(label="0", tag="toggle_btn")
+
+
+def make_ui(user_ui=MinimalUserUI):
+    """建立一個已完成佈局、位於 VIEWPORT 的 UIHandle 與其 FakeBackend。"""
+    x, y, w, h = VIEWPORT
+    FAKE.items.clear()
+    FAKE.hovered.clear()
+    FAKE.viewport.update({"x_pos": x, "y_pos": y, "width": w, "height": h})
+    ui = cw.UIHandle()
+    ui.user_ui = user_ui(ui)
+    ui.image_cache = None
+    fb = cw.FakeBackend((x + w // 2, y + h // 2), cw.FakeMonitorSource([(SCREEN, WORK_AREA)]))
+    ui.set_platform_backend(fb)
+    ui._init_win_cursors()
+    ui._load_resources()
+    ui.create_layout()
+    ui.sync_ui()
+    for _ in range(3):
+        ui.handler()
+    return ui, fb
+
+
+@pytest.fixture
+def fake():
+    return FAKE
+
+
+@pytest.fixture
+def ui_fb():
+    """已完成佈局的 UIHandle 與其 FakeBackend（viewport 位於 VIEWPORT）。"""
+    return make_ui()
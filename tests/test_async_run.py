@@ -0,0 +1,115 @@
+"""UIHandle.run(): the frame budget is scoped to run(), the async hook is resolved once and,
+with vsync on, other tasks get the time left before the next vsync instead of a zero-length slice."""
+import asyncio
+import inspect
+import time
+
+import pytest
+
+from conftest import FAKE, cw
+
+
+class HookUI(cw.UserUI):
+    def __init__(self, ui_handle):
+        super().__init__(ui_handle)
+        self.caps = []
+
+    def create_layout(self):
+        FAKE.add_button(label="0", tag="toggle_btn")
+
+    async def update_logic_async(self):
+        self.caps.append(self.ui_handle.pacer.fps_cap)
+
+
+def run_frames(ui, frames, budget):
+    FAKE.frames_left = frames
+    asyncio.run(ui.run(frame_budget=budget))
+
+
+@pytest.fixture
+def ui(ui_fb):
+    ui, _ = ui_fb
+    ui.user_ui = HookUI(ui)
+    ui.initialized = True
+    ui.pacer.fps_cap = 0
+    FAKE.viewport.pop("vsync", None)
+    yield ui
+    FAKE.viewport.pop("vsync", None)
+
+
+def test_budget_cap_is_restored_after_run(ui):
+    run_frames(ui, 4, 1 / 500)
+    assert ui.user_ui.caps and ui.user_ui.caps[0] == pytest.approx(500)
+    assert ui.pacer.fps_cap == 0
+
+
+def test_user_cap_is_kept(ui):
+    ui.pacer.fps_cap = 400
+    run_frames(ui, 3, 1 / 500)
+    assert set(ui.user_ui.caps) == {400}
+    assert ui.pacer.fps_cap == 400
+
+
+def test_vsync_skips_budget_cap(ui):
+    FAKE.viewport["vsync"] = True
+    run_frames(ui, 3, 1 / 500)
+    assert set(ui.user_ui.caps) == {0}
+
+
+def test_vsync_gives_event_loop_a_slice(ui, monkeypatch):
+    period = 0.02
+    start = time.perf_counter()
+
+    def render_at_vsync():
+        # 模擬 vsync：render 阻塞到下一個 20ms 邊界
+        now = time.perf_counter()
+        time.sleep(period - (now - start) % period)
+
+    monkeypatch.setattr(FAKE, "render_dearpygui_frame", render_at_vsync)
+    FAKE.viewport["vsync"] = True
+    frames = 12
+    ticks = []
+
+    async def ticker():
+        while FAKE.frames_left >= 0:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.001)
+
+    async def main():
+        FAKE.frames_left = frames
+        await asyncio.gather(ui.run(frame_budget=1 / 30), ticker())
+
+    asyncio.run(main())
+    stats = ui.pacer.get_stats()
+    assert stats["vsync_slices"] >= frames // 2
+    assert ui.pacer.vsync_period == pytest.approx(period, abs=0.005)
+    # 每幀只讓出一次時約為一幀一個 tick；有時間片時每幀有多個
+    assert len(ticks) >= 3 * frames
+
+
+def test_render_reserve_grows_on_missed_vsync():
+    pacer = cw.FramePacer(fps_cap=0)
+    for _ in range(5):
+        pacer.vsync_frame_done(0.010)
+    assert pacer.vsync_period == pytest.approx(0.010)
+    assert pacer.render_reserve == pytest.approx(pacer.render_reserve_min)
+    pacer.vsync_frame_done(0.020)
+    assert pacer.vsync_misses == 1
+    grown = pacer.render_reserve
+    assert grown > pacer.render_reserve_min
+    assert pacer.vsync_slice_end(1.0, 1 / 30) == pytest.approx(1.010 - grown)
+    for _ in range(1000):
+        pacer.vsync_frame_done(0.010)
+    assert pacer.render_reserve == pytest.approx(pacer.render_reserve_min)
+    # FPS 上限或閒置時由 pacer 自己等待，不另給時間片
+    pacer.fps_cap = 60
+    assert pacer.vsync_slice_end(1.0, 1 / 30) is None
+
+
+def test_hook_resolved_once(ui, monkeypatch):
+    checks = []
+    real = inspect.iscoroutinefunction
+    monkeypatch.setattr(inspect, "iscoroutinefunction", lambda f: checks.append(f) or real(f))
+    run_frames(ui, 6, 0)
+    assert len(checks) == 1
+    assert len(ui.user_ui.caps) >= 2
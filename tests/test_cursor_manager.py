@@ -0,0 +1,46 @@
+"""CursorManager: change-only cursor application and backend selection."""
+from conftest import cw
+
+
+class RecordingCursorBackend:
+    def __init__(self):
+        self.set_calls = []
+        self.shown = None
+
+    def load_shapes(self):
+        return {key: i + 1 for i, key in enumerate(cw.PlatformCursorBackend.IDS)}
+
+    def set(self, handle):
+        self.set_calls.append(handle)
+        self.shown = handle
+
+    def current(self):
+        return self.shown
+
+
+def test_null_backend_without_platform(monkeypatch):
+    # 非 Windows（即使有 X11 DISPLAY）不切換游標
+    monkeypatch.setenv("DISPLAY", ":0")
+    backend = cw.create_cursor_backend(cw.NullBackend())
+    assert isinstance(backend, cw.NullCursorBackend)
+    assert backend.load_shapes() == {}
+
+
+def test_applies_only_on_change_or_reset():
+    backend = RecordingCursorBackend()
+    manager = cw.CursorManager(backend)
+    manager.set_shapes(backend.load_shapes())
+    ns = manager.shapes["ns"]
+    manager.apply("ns", True, 0.0)
+    manager.apply("ns", True, 0.1)
+    manager.apply("ns", False, 0.2)
+    assert backend.set_calls == [ns]
+    # 系統在滑鼠移動時重設游標：僅於移動的幀重套
+    backend.shown = manager.shapes["std"]
+    manager.apply("ns", False, 0.3)
+    manager.apply("ns", True, 0.4)
+    assert backend.set_calls == [ns, ns]
+    manager.apply("std", True, 0.5)
+    manager.apply("std", True, 0.6)
+    assert manager.get_stats()["switches"] == 2
+    assert manager.get_stats()["reapplies"] == 1
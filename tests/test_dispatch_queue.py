@@ -0,0 +1,60 @@
+"""UIDispatchQueue: the max_pending cap only drops coalescible writes, never posted calls
+(including the async resource apply step)."""
+import time
+
+from conftest import FAKE, cw
+
+
+def test_full_queue_drops_new_values_but_keeps_calls():
+    queue = cw.UIDispatchQueue(budget_ms=0, max_pending=2)
+    calls = []
+    assert queue.post_value("a", 1)
+    assert queue.post_configure("b", show=True)
+    assert not queue.post_value("c", 3)
+    # 已排入的 item 仍可合併
+    assert queue.post_value("a", 2)
+    assert queue.post(calls.append, "done")
+    assert queue.post(calls.append, "again")
+    assert queue.get_stats()["dropped"] == 1
+    assert queue.drain() == 4
+    assert calls == ["done", "again"]
+    assert FAKE.items.get("c") is None
+
+
+def test_worker_completion_survives_full_queue(ui_fb):
+    ui, _ = ui_fb
+    ui.dispatch.max_pending = 1
+    ui.dispatch.post_value("toggle_btn", "busy")
+    results = []
+    future = ui.run_in_worker(lambda x: x * 2, 21, on_done=results.append)
+    assert future.result(timeout=5) == 42
+    deadline = time.perf_counter() + 5
+    while ui.dispatch.depth < 2 and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    ui.dispatch.drain(0)
+    assert results == [42]
+    assert ui.dispatch.get_stats()["dropped"] == 0
+    ui._workers.shutdown(wait=True)
+    ui._workers = None
+
+
+def test_async_resources_default_off_and_always_applied(ui_fb, monkeypatch):
+    assert cw.CUSTOMWINDOW_ASYNC_RESOURCES is False
+    ui, _ = ui_fb
+    ui.resources_applied = False
+    ui.dispatch.max_pending = 1
+    ui.dispatch.post_value("toggle_btn", "busy")
+
+    def broken():
+        raise OSError("images unreadable")
+
+    monkeypatch.setattr(ui, "_read_resources", broken)
+    future = ui._load_resources_async()
+    future.result(timeout=5)
+    deadline = time.perf_counter() + 5
+    while ui.dispatch.depth < 2 and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    ui.dispatch.drain(0)
+    assert ui.resources_applied
+    ui._workers.shutdown(wait=True)
+    ui._workers = None
@@ -0,0 +1,28 @@
+"""FrameProfiler: the FramePacer wait is reported as "pace", not as frame time."""
+
+
+def run_frames(ui, n):
+    for _ in range(n):
+        ui.handler()
+        ui._pace(True)
+        ui.render_frame()
+
+
+def test_pacer_sleep_is_not_frame_time(ui_fb):
+    ui, _ = ui_fb
+    prof = ui.enable_profiler(capacity=64)
+    ui.pacer.fps_cap = 50  # 20 ms 週期：幾乎全是等待
+    run_frames(ui, 12)
+    summary = prof.summary()
+    assert summary["pace"]["p50"] > 10.0
+    assert summary["frame"]["p50"] < 10.0
+    assert summary["frame"]["p50"] > 0.0
+
+
+def test_uncapped_frames_record_no_pace(ui_fb):
+    ui, _ = ui_fb
+    prof = ui.enable_profiler(capacity=64)
+    ui.pacer.fps_cap = 0
+    run_frames(ui, 8)
+    assert max(prof.series("pace")) < 1.0
+    assert set(prof.summary()) == set(prof.SERIES)
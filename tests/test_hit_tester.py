@@ -0,0 +1,149 @@
+"""HitTester must classify exactly like the comparison chains it replaced.
+
+`old_click_dir` and `old_cursor_key` are the coordinate chains of the original
+`UIEvent.on_mouse_click` and of the cursor fallback in `update_logic`, copied
+verbatim (only reshaped into functions). Points are swept across every edge,
+corner, the title row and the title-bar buttons, including the pixels on and
+next to each threshold.
+"""
+import pytest
+
+from conftest import FAKE, cw
+
+BAR_W = 6
+CORNER = 20
+BUTTON = cw.CUSTOMWINDOW_TITLEBAR_HEIGHT
+SIZES = [(400, 300), (401, 301), (800, 600), (1366, 768), (1920, 1040)]
+
+
+def old_click_dir(x, y, vw, vh, bar_w=BAR_W, corner_sz=CORNER):
+    """原本 on_mouse_click 的座標判定（含右下角 25px 放寬區），回傳 resize_dir 或 None。"""
+    if x <= corner_sz and y <= corner_sz:
+        return "corner_top_left"
+    elif x <= corner_sz and y >= vh - corner_sz:
+        return "corner_left"
+    elif x >= vw - corner_sz and y >= vh - corner_sz:
+        return "corner"
+    elif y <= bar_w:
+        return "top"
+    elif x <= bar_w:
+        return "left"
+    elif x >= vw - bar_w:
+        return "right"
+    elif y >= vh - bar_w:
+        return "bottom"
+    elif x > vw - 25 and y > vh - 25:
+        return "corner"
+    return None
+
+
+def old_cursor_key(x, y, vw, vh, bar_w=BAR_W, corner_sz=CORNER):
+    """原本 update_logic 的游標座標回退判定。"""
+    if x <= corner_sz and y <= corner_sz:
+        return "nwse"
+    elif x <= corner_sz and y >= vh - corner_sz:
+        return "nesw"
+    elif x >= vw - corner_sz and y >= vh - corner_sz:
+        return "nwse"
+    elif x >= vw - corner_sz and y <= corner_sz:
+        return "nesw"
+    elif y <= bar_w or y >= vh - bar_w:
+        return "ns"
+    elif x <= bar_w or x >= vw - bar_w:
+        return "we"
+    return "std"
+
+
+def expected_title_region(x, y, vw):
+    """標題列（下移 bar_w）內非縮放區域：左側 icon，右側依序 min / max / close 按鈕。"""
+    if not BAR_W <= y < BAR_W + BUTTON:
+        return "content"
+    if x < BUTTON:
+        return "icon"
+    if x >= vw - BUTTON:
+        return "close_btn"
+    if x >= vw - 2 * BUTTON:
+        return "max_btn"
+    if x >= vw - 3 * BUTTON:
+        return "min_btn"
+    return "title"
+
+
+def around(values, lo, hi):
+    """每個門檻取 -1 / 0 / +1 三個像素，限制在 [lo, hi]。"""
+    return sorted({v + d for v in values for d in (-1, 0, 1) if lo <= v + d <= hi})
+
+
+def sweep(vw, vh):
+    xs = around([0, BAR_W, CORNER, BUTTON, vw - 3 * BUTTON, vw - 2 * BUTTON, vw - BUTTON,
+                 vw - 25, vw - CORNER, vw - BAR_W, vw // 2, vw - 1], -2, vw + 1)
+    ys = around([0, BAR_W, CORNER, BAR_W + BUTTON, vh - 25, vh - CORNER, vh - BAR_W, vh // 2, vh - 1],
+                -2, vh + 1)
+    xs += list(range(0, vw, 37))
+    ys += list(range(0, vh, 29))
+    return [(x, y) for x in xs for y in ys]
+
+
+@pytest.fixture
+def tester():
+    return cw.HitTester()
+
+
+@pytest.mark.parametrize("vw,vh", SIZES)
+def test_classify_matches_old_click_chain(tester, vw, vh):
+    tester.update(vw, vh, BAR_W, CORNER, [BUTTON, BUTTON], BAR_W)
+    for x, y in sweep(vw, vh):
+        region = tester.classify(x, y)
+        old = old_click_dir(x, y, vw, vh)
+        if old is not None:
+            assert region == old, (x, y)
+        else:
+            assert region not in cw.HitTester.RESIZE_REGIONS, (x, y)
+            assert region == expected_title_region(x, y, vw), (x, y)
+
+
+@pytest.mark.parametrize("vw,vh", SIZES)
+def test_cursor_key_matches_old_fallback(tester, vw, vh):
+    tester.update(vw, vh, BAR_W, CORNER, [BUTTON, BUTTON], BAR_W)
+    for x, y in sweep(vw, vh):
+        assert tester.cursor_key(x, y) == old_cursor_key(x, y, vw, vh), (x, y)
+
+
+@pytest.mark.parametrize("x,y,expected", [
+    (20, 20, "corner_top_left"), (20, 6, "corner_top_left"), (21, 6, "top"), (21, 7, "icon"), (30, 7, "title"), (6, 21, "left"), (7, 21, "icon"),
+    (400, 35, "title"), (400, 36, "content"), (709, 20, "title"), (710, 20, "min_btn"), (770, 20, "close_btn"),
+    (6, 150, "left"), (7, 150, "content"),
+    (794, 150, "right"), (793, 150, "content"),
+    (400, 594, "bottom"), (400, 593, "content"),
+    (780, 580, "corner"), (776, 576, "corner"), (775, 576, "content"), (776, 575, "content"),
+    (20, 580, "corner_left"), (21, 580, "content"),
+])
+def test_exact_boundary_pixels(tester, x, y, expected):
+    tester.update(800, 600, BAR_W, CORNER, [BUTTON, BUTTON], BAR_W)
+    assert tester.classify(x, y) == expected
+
+
+def test_table_rebuilt_only_on_size_change(tester):
+    assert tester.update(800, 600, BAR_W, CORNER, [BUTTON, BUTTON], BAR_W)
+    assert not tester.update(800, 600, BAR_W, CORNER, [BUTTON, BUTTON], BAR_W)
+    assert tester.update(801, 600, BAR_W, CORNER, [BUTTON, BUTTON], BAR_W)
+    assert tester.rebuild_count == 2
+
+
+@pytest.mark.parametrize("vw,vh", [(800, 600), (401, 301)])
+def test_on_mouse_click_starts_same_resize_as_old_chain(ui_fb, vw, vh):
+    ui, fb = ui_fb
+    x0, y0 = 200, 140
+    FAKE.viewport.update({"x_pos": x0, "y_pos": y0, "width": vw, "height": vh})
+    for x, y in sweep(vw, vh)[::7]:
+        fb.cursor_pos = [x0 + x, y0 + y]
+        ui.snapshot.capture()
+        ui.ui_event.on_mouse_click()
+        old = old_click_dir(x, y, vw, vh)
+        assert ui.state["resizing"] == (old is not None), (x, y)
+        assert ui.state["resize_dir"] == old, (x, y)
+        if old is not None:
+            assert ui.state["click_offset"] == [x0 + x, y0 + y]
+            assert ui.state["start_size"] == [vw, vh]
+            assert ui.state["start_pos"] == [x0, y0]
+        ui.state["resizing"], ui.state["resize_dir"] = False, None
@@ -0,0 +1,78 @@
+"""HoverTracker: late hover callbacks must not produce a false leave/enter (texture flicker),
+and callbacks from the callback thread only queue events for update() on the main thread."""
+import threading
+
+import pytest
+
+from conftest import FAKE, cw
+
+
+@pytest.fixture
+def tracker():
+    FAKE.hovered.clear()
+    tracker = cw.HoverTracker()
+    tracker.changes = []
+    tracker.register("btn", lambda tag, hovered: tracker.changes.append(hovered), bind=False)
+    yield tracker
+    FAKE.hovered.clear()
+
+
+def enter(tracker):
+    FAKE.hovered.add("btn")
+    tracker.update()
+    tracker._on_hover(None, None, "btn")
+    tracker.update()
+
+
+def test_enter_and_leave(tracker):
+    enter(tracker)
+    assert tracker.changes == [True]
+    FAKE.hovered.discard("btn")
+    tracker.update()
+    tracker.update()
+    assert tracker.changes == [True, False]
+    assert not tracker.is_hovered("btn")
+
+
+def test_late_callback_is_not_a_leave(tracker):
+    enter(tracker)
+    # 滑鼠仍在項目上，但這幾幀的 callback 尚在 callback 佇列中
+    for _ in range(3):
+        tracker.update()
+    tracker._on_hover(None, None, "btn")
+    tracker.update()
+    assert tracker.changes == [True]
+    assert tracker.is_hovered("btn")
+
+
+def test_stale_callback_after_leave_is_not_an_enter(tracker):
+    enter(tracker)
+    FAKE.hovered.discard("btn")
+    tracker.update()
+    tracker.update()
+    tracker._on_hover(None, None, "btn")
+    tracker.update()
+    assert tracker.changes == [True, False]
+    assert not tracker.is_hovered("btn")
+
+
+def test_idle_frames_make_no_dpg_calls(tracker):
+    FAKE.reset_calls()
+    for _ in range(10):
+        tracker.update()
+    assert FAKE.total_calls() == 0
+
+
+def test_callback_thread_only_queues(tracker):
+    threads = []
+    tracker.items["btn"] = lambda tag, hovered: threads.append(threading.current_thread())
+    FAKE.hovered.add("btn")
+    tracker.update()
+    worker = threading.Thread(target=tracker._on_hover, args=(None, None, "btn"))
+    worker.start()
+    worker.join()
+    # callback 執行緒上不改變狀態、不切換貼圖
+    assert not tracker.is_hovered("btn") and threads == []
+    tracker.update()
+    assert tracker.is_hovered("btn")
+    assert threads == [threading.current_thread()]
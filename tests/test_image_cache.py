@@ -0,0 +1,108 @@
+"""ImageCache: hits, corrupt entries and mmap handling."""
+import mmap
+from array import array
+
+import pytest
+
+from conftest import FAKE, cw
+
+
+@pytest.fixture(autouse=True)
+def decoder(monkeypatch):
+    # 與 dpg.load_image 相同：回傳支援 buffer 協定的 float32 資料（1x1 RGBA）
+    monkeypatch.setattr(FAKE, "load_image", lambda path: (1, 1, 4, array("f", [1.0, 1.0, 1.0, 1.0])))
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "Close_Normal.png"
+    path.write_bytes(b"not decoded by the stand-in")
+    return str(path)
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """記錄 ImageCache 開啟的每個 mmap，以檢查是否關閉。"""
+    maps = []
+    real = mmap.mmap
+
+    def tracking(*args, **kwargs):
+        mm = real(*args, **kwargs)
+        maps.append(mm)
+        return mm
+    monkeypatch.setattr(cw.mmap, "mmap", tracking)
+    return maps
+
+
+def test_miss_then_hit(tmp_path, image):
+    cache = cw.ImageCache(str(tmp_path / "cache"))
+    w, h, c, data = cache.load(image)
+    assert (w, h, c) == (1, 1, 4)
+    w, h, c, data = cache.load(image)
+    assert (w, h, c) == (1, 1, 4)
+    assert list(data) == [1.0, 1.0, 1.0, 1.0]
+    assert (cache.hits, cache.misses, cache.errors) == (1, 1, 0)
+
+
+@pytest.mark.parametrize("keep", [0, 3, cw.ImageCache.HEADER.size + 5])
+def test_truncated_entry_is_closed_deleted_and_redecoded(tmp_path, image, opened, keep):
+    cache = cw.ImageCache(str(tmp_path / "cache"))
+    cache.load(image)
+    entry = cache.entry_path(image)
+    with open(entry, "r+b") as f:
+        f.truncate(keep)
+    opened.clear()
+    w, h, c, data = cache.load(image)
+    assert (w, h, c) == (1, 1, 4)
+    assert all(mm.closed for mm in opened)
+    assert cache.errors == 1 and cache.misses == 2
+    # 重新解碼後已寫回完整的快取檔
+    assert cache.load(image)[:3] == (1, 1, 4)
+    assert cache.hits == 1
+
+
+def test_bad_magic_is_discarded(tmp_path, image, opened):
+    cache = cw.ImageCache(str(tmp_path / "cache"))
+    cache.load(image)
+    entry = cache.entry_path(image)
+    with open(entry, "r+b") as f:
+        f.write(b"XXXX")
+    opened.clear()
+    cache.load(image)
+    assert all(mm.closed for mm in opened)
+    assert cache.errors == 1
+
+
+def test_hit_is_closable(tmp_path, image, opened):
+    cache = cw.ImageCache(str(tmp_path / "cache"))
+    cache.load(image)
+    with cache.load(image) as hit:
+        assert list(hit.data) == [1.0, 1.0, 1.0, 1.0]
+        assert len(opened) == 1 and not opened[0].closed
+    assert hit.closed and opened[0].closed
+
+
+def test_load_texture_closes_mapping_after_upload(tmp_path, image, opened, ui_fb):
+    ui, _ = ui_fb
+    ui.images_dir = str(tmp_path)
+    ui.image_cache = cw.ImageCache(str(tmp_path / "cache"))
+    ui.image_cache.load(image).close()
+    opened.clear()
+    tex_id, w, h = ui.load_texture("Close_Normal.png")
+    assert tex_id is not None and (w, h) == (1, 1)
+    assert ui.image_cache.hits == 1
+    assert len(opened) == 1 and opened[0].closed
+
+
+def test_atlas_pack_closes_mappings(tmp_path, image, opened):
+    cache = cw.ImageCache(str(tmp_path / "cache"))
+    cache.load(image).close()
+    opened.clear()
+    images = {"a": cache.load(image), "b": cache.load(image)}
+    atlas = cw.TextureAtlas.pack(images)
+    assert not images and set(atlas.rects) == {"a", "b"}
+    assert len(opened) == 2 and all(mm.closed for mm in opened)
+
+
+def test_cache_is_opt_in():
+    assert cw.CUSTOMWINDOW_IMAGE_CACHE is False
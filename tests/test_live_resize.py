@@ -0,0 +1,125 @@
+"""Live-resize modes: the outline previews the target rect and UserUI.resize_callback fires once per resize.
+
+The recording Dear PyGui does not call the viewport resize callback, so
+`os_resize` emulates it: when the previous frame changed the viewport size it
+delivers `resize_window_callback` at the start of the next frame, like Dear
+PyGui does (the last one therefore arrives after the mouse release).
+"""
+import pytest
+
+from conftest import FAKE, VIEWPORT, MinimalUserUI
+
+X, Y, W, H = VIEWPORT
+
+
+class CountingUserUI(MinimalUserUI):
+    def __init__(self, ui):
+        super().__init__(ui)
+        self.calls = []
+
+    def resize_callback(self, sender, app_data):
+        self.calls.append(tuple(app_data[:2]))
+
+
+@pytest.fixture
+def drag(ui_fb):
+    ui, fb = ui_fb
+    ui.user_ui = CountingUserUI(ui)
+    last = [FAKE.viewport["width"], FAKE.viewport["height"]]
+
+    def os_resize():
+        size = [FAKE.viewport["width"], FAKE.viewport["height"]]
+        if size != last:
+            last[:] = size
+            ui.ui_event.resize_window_callback(0, size + size)
+            ui.geometry.flush()
+
+    def run(mode, direction, start, moves):
+        ui.live_resize = mode
+        fb.cursor_pos = list(start)
+        ui.snapshot.capture()
+        snap = ui.snapshot
+        ui.ui_event._start_resize(direction, snap.mouse_screen, snap.viewport_pos,
+                                  [snap.viewport_w, snap.viewport_h])
+        seen = []
+        for dx, dy in moves:
+            os_resize()
+            fb.cursor_pos = [fb.cursor_pos[0] + dx, fb.cursor_pos[1] + dy]
+            ui.handler()
+            seen.append(viewport())
+        ui.ui_event.on_mouse_release()
+        ui.geometry.flush()
+        os_resize()
+        ui.handler()
+        os_resize()
+        return seen
+
+    return ui, run
+
+
+def viewport():
+    v = FAKE.viewport
+    return [v["x_pos"], v["y_pos"], v["width"], v["height"]]
+
+
+def outline():
+    item = FAKE.items["resize_outline"]
+    return item["pmin"], item["pmax"], FAKE.items["resize_outline_layer"]["show"]
+
+
+SHRINK = [(-20, -10)] * 5
+
+
+def test_outline_applies_target_on_release(drag):
+    ui, run = drag
+    seen = run("outline", "corner_top_left", (X, Y), [(10, 6)] * 4)
+    # 拖曳中（縮小）viewport 不動；放開後套用目標矩形並只通知一次
+    assert all(rect == [X, Y, W, H] for rect in seen)
+    assert viewport() == [X + 40, Y + 24, W - 40, H - 24]
+    assert ui.user_ui.calls == [(W - 40, H - 24)]
+    assert outline()[2] is False
+
+
+def test_outline_preview_during_drag(ui_fb):
+    ui, fb = ui_fb
+    ui.user_ui = CountingUserUI(ui)
+    ui.live_resize = "outline"
+    fb.cursor_pos = [X, Y]
+    ui.snapshot.capture()
+    snap = ui.snapshot
+    ui.ui_event._start_resize("corner_top_left", snap.mouse_screen, snap.viewport_pos, [W, H])
+    fb.cursor_pos = [X + 50, Y + 30]
+    ui.handler()
+    ui.geometry.flush()
+    assert viewport() == [X, Y, W, H]
+    assert outline() == ([51, 31], [W - 1, H - 1], True)
+    # 放大：viewport 不動（拖曳中不做系統縮放），外框夾在 viewport 內
+    configures = FAKE.calls.get("configure_viewport", 0)
+    fb.cursor_pos = [X - 40, Y - 20]
+    ui.handler()
+    ui.geometry.flush()
+    assert viewport() == [X, Y, W, H]
+    assert outline() == ([1, 1], [W - 1, H - 1], True)
+    fb.cursor_pos = [X - 40, Y + 10]
+    ui.handler()
+    ui.geometry.flush()
+    assert outline() == ([1, 11], [W - 1, H - 1], True)
+    assert FAKE.calls.get("configure_viewport", 0) == configures
+    assert ui.user_ui.calls == []
+    ui.ui_event.on_mouse_release()
+    assert viewport() == [X - 40, Y + 10, W + 40, H - 10]
+    assert ui.user_ui.calls == [(W + 40, H - 10)]
+
+
+@pytest.mark.parametrize("mode", ["outline", "hybrid", "live"])
+def test_resize_callback_once_per_size(drag, mode):
+    ui, run = drag
+    run(mode, "corner", (X + W, Y + H), SHRINK)
+    sizes = ui.user_ui.calls
+    assert sizes[-1] == (W - 100, H - 50)
+    # 同一尺寸不重複通知（放開滑鼠後的重排與系統 resize callback 不會各呼叫一次）
+    assert len(sizes) == len(set(sizes))
+    if mode == "outline":
+        assert sizes == [(W - 100, H - 50)]
+    if mode == "live":
+        assert len(sizes) == len(SHRINK)
@@ -0,0 +1,192 @@
+"""MonitorTopology: lookups, spanning clamp, maximize on the cursor's monitor and reloads, on FakeMonitorSource.
+
+Layout (work areas in brackets), with negative coordinates and a 100 px gap:
+
+    LEFT  (-1280,    0, 1280, 1024)  [height 984]
+    MAIN  (    0,    0, 1920, 1080)  [height 1040]
+    RIGHT ( 1920, -200, 2560, 1440)  [height 1400], 144 dpi
+    FAR   ( 4580,    0, 1920, 1080)  [height 1040]
+"""
+import pytest
+
+from conftest import FAKE, area, cw
+
+LEFT = (area(-1280, 0, 1280, 1024), area(-1280, 0, 1280, 984))
+MAIN = (area(0, 0, 1920, 1080), area(0, 0, 1920, 1040))
+RIGHT = (area(1920, -200, 2560, 1440), area(1920, -200, 2560, 1400))
+FAR = (area(4580, 0, 1920, 1080), area(4580, 0, 1920, 1040))
+
+
+@pytest.fixture
+def source():
+    return cw.FakeMonitorSource([LEFT, MAIN, RIGHT, FAR], dpis=[96, 96, 144, 96])
+
+
+@pytest.fixture
+def topology(source):
+    topology = cw.MonitorTopology(source, poll=2.0)
+    topology.check(0.0)
+    return topology
+
+
+def test_lookup_with_negative_coordinates_and_gap(topology):
+    assert topology.monitor_at(-1, 500) == 0
+    assert topology.monitor_at(0, 500) == 1
+    assert topology.monitor_at(2000, -150) == 2
+    assert topology.monitor_at(4500, 100) is None
+    # 落在空隙中：取邊緣距離最近的螢幕
+    assert topology.work_area_at(4500, 100) == RIGHT[1]
+    assert topology.work_area_at(4560, 100) == FAR[1]
+    assert topology.overlapping([1800, 100, 400, 300]) == [2, 1]
+
+
+@pytest.mark.parametrize("rect,span,expected", [
+    # 完全落在相鄰工作區上的跨螢幕矩形保持不動
+    ([1800, 100, 400, 300], True, [1800, 100, 400, 300]),
+    ([-200, 100, 400, 300], True, [-200, 100, 400, 300]),
+    # 不允許跨螢幕：夾入重疊最多的螢幕
+    ([1800, 100, 400, 300], False, [1920, 100, 400, 300]),
+    ([-300, 100, 400, 300], False, [-400, 100, 400, 300]),
+    # 左螢幕工作區較矮：跨螢幕部分超出時退回重疊最多的單一螢幕
+    ([-200, 900, 400, 100], True, [0, 900, 400, 100]),
+    # 跨越空隙：不可停在空隙上
+    ([4400, 100, 300, 200], True, [4580, 100, 300, 200]),
+    # 負座標：右螢幕上緣為 -200
+    ([2000, -400, 400, 300], True, [2000, -200, 400, 300]),
+    # 完全不在任何螢幕上：夾入最近的螢幕
+    ([-3000, 2000, 400, 300], True, [-1280, 684, 400, 300]),
+    ([7000, 500, 400, 300], True, [6100, 500, 400, 300]),
+])
+def test_clamp(topology, rect, span, expected):
+    assert topology.clamp(rect, span) == expected
+
+
+def test_work_area_for_fast_path(topology):
+    assert topology.work_area_for([100, 100, 800, 600]) == MAIN[1]
+    assert topology.work_area_for([900, 100, 800, 600]) == MAIN[1]
+    assert topology.work_area_for([2500, -100, 800, 600]) == RIGHT[1]
+    assert (topology.hits, topology.misses) == (1, 2)
+    assert topology.dpi_for([2500, -100, 800, 600]) == 144
+    assert topology.get_stats()["dpi"] == [96, 96, 144, 96]
+
+
+def test_signature_change_reloads_after_poll(topology, source):
+    assert topology.loads == 1
+    assert not topology.check(1.0)
+    taskbar_moved = area(0, 40, 1920, 1040)
+    source.monitors[1] = (MAIN[0], taskbar_moved)
+    # 下次比對時間（1.0 + poll）之前不重新載入
+    assert not topology.check(2.5)
+    assert topology.work_area_at(100, 100) == MAIN[1]
+    assert topology.check(3.0)
+    assert topology.loads == 2
+    assert topology.work_area_at(100, 100) == taskbar_moved
+
+
+def test_unplugged_monitor_reloads(topology, source):
+    source.monitors.pop()
+    source.dpis.pop()
+    assert topology.check(10.0)
+    assert topology.get_stats()["monitors"] == 3
+    assert topology.clamp([4400, 100, 300, 200]) == [4180, 100, 300, 200]
+
+
+def test_invalidate_and_no_poll(source):
+    topology = cw.MonitorTopology(source, poll=0)
+    assert topology.check(0.0)
+    source.monitors[1] = (MAIN[0], area(0, 40, 1920, 1040))
+    # poll 為 0：不比對簽章，只在 invalidate() 後重新載入
+    assert not topology.check(100.0)
+    topology.work_area_for([100, 100, 800, 600])
+    topology.invalidate()
+    assert topology.check(100.0)
+    assert topology.loads == 2
+    assert topology.work_area_for([100, 100, 800, 600]) == area(0, 40, 1920, 1040)
+    assert topology.misses == 2
+
+
+def test_lookups_make_no_source_calls(topology, source):
+    calls = source.calls
+    for x in range(100, 1000, 100):
+        assert topology.work_area_for([x, 100, 800, 600]) == MAIN[1]
+    # 跨入其他螢幕再回來：只查記憶體內的清單
+    assert topology.work_area_for([2000, 100, 800, 600]) == RIGHT[1]
+    assert topology.work_area_for([-1000, 100, 800, 600]) == LEFT[1]
+    assert topology.work_area_for([2100, 100, 800, 600]) == RIGHT[1]
+    assert source.calls == calls
+    assert (topology.hits, topology.misses) == (8, 4)
+
+
+def test_nearest_monitor_for_rect_in_gap(topology):
+    # 右螢幕上緣為 -200：完全位於主螢幕上方、右螢幕左側的矩形取最近者
+    assert topology.work_area_for([1850, -190, 60, 100]) == RIGHT[1]
+    assert topology.work_area_for([1500, -190, 300, 100]) == MAIN[1]
+
+
+class Listless(cw.FakeMonitorSource):
+    """不提供螢幕清單的來源。"""
+
+    def enumerate_monitors(self):
+        return None
+
+
+def test_missing_monitor_list_is_unavailable():
+    topology = cw.MonitorTopology(Listless([MAIN]))
+    topology.check(0.0)
+    assert not topology.available
+
+
+@pytest.mark.parametrize("source", [cw.NullBackend(), Listless([MAIN, RIGHT])])
+def test_system_utils_without_monitor_list(source):
+    utils = cw.SystemUtils()
+    utils.set_monitor_source(source)
+    assert utils.get_viewport_work_area([2000, 100, 800, 600]) is None
+    assert not utils.topology.available
+    assert utils.get_work_area_at(100, 100) is None
+    assert utils.clamp_rect([3000, 0, 800, 600]) is None
+
+
+@pytest.fixture
+def ui(ui_fb, source):
+    ui, fb = ui_fb
+    ui.sys.set_monitor_source(source)
+    return ui, fb
+
+
+def viewport():
+    v = FAKE.viewport
+    return [v["x_pos"], v["y_pos"], v["width"], v["height"]]
+
+
+@pytest.mark.parametrize("cursor,monitor", [((-600, 300), LEFT), ((500, 300), MAIN), ((3000, -150), RIGHT),
+                                            ((5000, 900), FAR)])
+def test_maximize_on_cursor_monitor_and_restore(ui, cursor, monitor):
+    ui, fb = ui
+    start = viewport()
+    fb.cursor_pos = list(cursor)
+    ui.snapshot.capture()
+    ui.ui_event.toggle_maximize()
+    work = monitor[1]
+    assert viewport() == [work["x"], work["y"], work["w"], work["h"]]
+    ui.snapshot.capture()
+    ui.ui_event.toggle_maximize()
+    assert viewport() == start
+
+
+def test_viewport_clamp_spans_monitors(ui):
+    ui, _ = ui
+    ui.snapshot.set_viewport_rect(1700, 100, 800, 600)
+    assert not ui.clamp_viewport_to_work_area()
+    assert ui.snapshot.viewport_rect == [1700, 100, 800, 600]
+    # 主螢幕工作區只到 1040：改夾入重疊較多、較高的右螢幕
+    ui.snapshot.set_viewport_rect(1700, 800, 800, 600)
+    assert not ui.clamp_viewport_to_work_area()
+    assert ui.snapshot.viewport_rect == [1920, 600, 800, 600]
+
+
+def test_span_disabled(ui, monkeypatch):
+    ui, _ = ui
+    monkeypatch.setattr(cw, "CUSTOMWINDOW_SPAN_MONITORS", False)
+    ui.snapshot.set_viewport_rect(1700, 100, 800, 600)
+    ui.clamp_viewport_to_work_area()
+    assert ui.snapshot.viewport_rect == [1920, 100, 800, 600]
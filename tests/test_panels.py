@@ -0,0 +1,79 @@
+"""PanelManager: minimize and maximize are mutually exclusive and restore the right geometry."""
+import pytest
+
+from conftest import FAKE, cw
+
+RECT = [40, 60, 300, 200]
+
+
+@pytest.fixture
+def panels(ui_fb):
+    ui, _ = ui_fb
+    ui.panels.create("p", rect=RECT)
+    ui.geometry.flush()
+    return ui.panels
+
+
+def content_shown(panels):
+    panels.ui.geometry.flush()
+    return FAKE.items[panels.panels["p"].content]["show"]
+
+
+def test_minimize_then_maximize_then_restore(panels):
+    panel = panels.panels["p"]
+    panels.toggle_minimize("p")
+    assert panel.minimized and not content_shown(panels)
+    panels.toggle_maximize("p")
+    assert panel.maximized and not panel.minimized
+    assert panel.rect == panels._maximized_rect()
+    assert content_shown(panels)
+    panels.toggle_maximize("p")
+    assert not panel.maximized and not panel.minimized
+    assert panel.rect == RECT
+    assert content_shown(panels)
+
+
+def test_maximize_then_minimize_survives_viewport_resize(panels):
+    ui = panels.ui
+    panel = panels.panels["p"]
+    panels.toggle_maximize("p")
+    panels.toggle_minimize("p")
+    assert panel.minimized and not panel.maximized
+    collapsed = ui.button_size[1] + 2 * ui.resize_overlay.bar_w
+    assert panel.rect == RECT[:3] + [collapsed]
+    # viewport 尺寸改變：收合的面板不可被重新撐開成最大化尺寸
+    ui.snapshot.set_viewport_rect(200, 140, 1000, 700)
+    panels.sync()
+    assert panel.rect == RECT[:3] + [collapsed]
+    assert not content_shown(panels)
+    panels.toggle_minimize("p")
+    assert panel.rect == RECT
+    assert content_shown(panels)
+
+
+def test_restore_height_initialised():
+    panel = cw.Panel(None, "q", "Q", RECT)
+    assert panel.restore_height is None and panel.restore_rect is None
+
+
+def test_click_on_panel_at_viewport_edge_is_consumed(ui_fb):
+    ui, fb = ui_fb
+    ui.panels.create("edge", rect=[0, 100, 300, 200])
+    ui.geometry.flush()
+    x0, y0 = FAKE.viewport["x_pos"], FAKE.viewport["y_pos"]
+    # 面板左緣與主視窗左側縮放區重疊：只由面板處理
+    fb.cursor_pos = [x0 + 3, y0 + 150]
+    ui.snapshot.capture()
+    ui.ui_event.on_mouse_click()
+    assert not ui.state["resizing"] and not ui.state["dragging"]
+    assert ui.panels.active["panel"].name == "edge" and ui.panels.active["mode"] == "resize"
+    ui.ui_event.on_resize_press(None, None, "left")
+    assert not ui.state["resizing"]
+    ui.ui_event.on_mouse_release()
+    ui.panels.on_mouse_release()
+    # 面板外的同一邊緣仍由主視窗縮放
+    fb.cursor_pos = [x0 + 3, y0 + 400]
+    ui.snapshot.capture()
+    ui.ui_event.on_mouse_click()
+    assert ui.state["resizing"] and ui.state["resize_dir"] == "left"
+    assert ui.panels.active is None
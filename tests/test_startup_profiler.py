@@ -0,0 +1,15 @@
+"""StartupProfiler: nested phases and records at the current depth."""
+from conftest import cw
+
+
+def test_record_uses_current_depth():
+    prof = cw.StartupProfiler()
+    prof.record("init", 1.0)
+    with prof.phase("initialize_gui"):
+        assert prof.depth == 1
+        with prof.phase("layout"):
+            prof.record("apply_resources", 2.0)
+        prof.record("explicit", 3.0, depth=0)
+    assert prof.depth == 0
+    assert [(name, depth) for name, _ms, depth in prof.entries] == [
+        ("init", 0), ("initialize_gui", 0), ("layout", 1), ("apply_resources", 2), ("explicit", 0)]